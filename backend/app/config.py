@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -7,20 +7,123 @@ class Settings(BaseSettings):
     
     database_url: str = "sqlite:///./import_service.db"
     postgres_url: Optional[str] = None
+    # Defaults to the database above with its asyncio driver (aiosqlite / asyncpg)
+    async_database_url: Optional[str] = None
+    # Optional read replica for read-only endpoints (dashboard, job polling, items); the async
+    # URL defaults to the replica URL with its asyncio driver
+    replica_database_url: Optional[str] = None
+    async_replica_database_url: Optional[str] = None
+    # After a user creates/resumes a job or one of their jobs changes status, their reads
+    # stay on the primary this long so they never see the replica lag behind
+    replica_read_your_writes_seconds: float = 5.0
+    
+    # Engine profile: "auto" picks "sqlite" or "postgres" from the database URL; "default"
+    # keeps SQLAlchemy's stock settings
+    db_engine_profile: str = "auto"
+    # sqlite profile: pragmas run on every new connection (WAL lets readers run during imports)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size_bytes: int = 268_435_456  # 256 MiB
+    # postgres profile: connection pool per engine (API processes and workers each have one)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    # Compiled SQL cached per engine, and prepared statements cached per asyncpg connection
+    db_compiled_cache_size: int = 500
+    db_statement_cache_size: int = 500
     
     # API settings
     api_v1_prefix: str = "/api/v1"
     
     # External API
     dummyjson_base_url: str = "https://dummyjson.com"
+    upstream_page_size: int = 50
+    # Max items imported per source; 0 imports everything the upstream reports
+    import_source_limits: Dict[str, int] = {"products": 30, "carts": 20}
+    # Sources whose upstream records are never edited once published. Only these can end an
+    # incremental import early at the last job's highest id; other sources are read in full
+    # and rely on content hashes to skip unchanged records
+    import_append_only_sources: List[str] = []
+    
+    # Shared upstream HTTP client (one pool per process)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 5.0
+    http2_enabled: bool = False
+    
+    # Upstream retries (total attempts per request) with exponential backoff and full jitter
+    upstream_retry_attempts: int = 4
+    upstream_retry_base_delay_seconds: float = 0.5
+    upstream_retry_max_delay_seconds: float = 30.0
+    # Per-host circuit breaker: open after this many consecutive failures, probe again after the cooldown
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30.0
+    
+    # Job execution: "background" runs jobs inside the API process via BackgroundTasks,
+    # "worker" leaves them queued for standalone `python -m app.worker` processes
+    job_runner: str = "background"
+    job_lease_seconds: int = 60
+    # Leases a job may take before it is failed instead of reclaimed (stops crash loops)
+    job_max_attempts: int = 5
+    worker_concurrency: int = 4
+    worker_poll_interval_seconds: float = 1.0
+    
+    # Job events pushed to clients: "memory" reaches subscribers in this process only,
+    # "redis" relays them between processes so worker progress reaches every API instance
+    event_backend: str = "memory"
+    redis_url: Optional[str] = None
+    event_subscriber_queue_size: int = 100
+    event_stream_heartbeat_seconds: float = 15.0
+    job_long_poll_max_wait_seconds: float = 30.0
+    
+    # Dashboard stats cache: entries are dropped on the user's job events and after the TTL
+    # (the TTL bounds staleness when a worker's events cannot reach this process); 0 disables it
+    dashboard_cache_ttl_seconds: float = 60.0
+    dashboard_cache_max_users: int = 10000
+    
+    # Authentication caches: validated token claims (never kept past the token's expiry) and
+    # active-user snapshots; deactivating a user drops its snapshot in this process, and the
+    # user TTL bounds how long other processes keep accepting it; 0 disables a cache
+    auth_token_cache_ttl_seconds: float = 300.0
+    auth_user_cache_ttl_seconds: float = 30.0
+    auth_cache_max_entries: int = 10000
     
     # Simulation settings
     simulate_delay_seconds: float = 2.0
     
+    # Import write batching
+    import_batch_size: int = 100
+    import_batch_max_bytes: int = 1_048_576  # 1 MiB of serialized payload
+    # Postgres bulk load: chunks writing at least this many rows go through COPY and a staging
+    # table (0 disables it); where COPY is available the pipeline uses the larger chunks below
+    import_copy_min_rows: int = 1000
+    import_copy_batch_size: int = 5000
+    import_copy_batch_max_bytes: int = 16_777_216  # 16 MiB
+    
+    # Number of sources within one job fetched and ingested at the same time
+    import_source_concurrency: int = 2
+    # Upstream pages buffered between a source's fetcher and its DB writer
+    import_queue_max_pages: int = 2
+    
     # JWT settings
     secret_key: str = "your-secret-key-change-in-production-use-openssl-rand-hex-32"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 7 days
+    # Tokens for the job event stream travel in its URL (EventSource cannot set headers), so
+    # they are scoped to the stream and only need to live long enough to open it
+    stream_token_expire_seconds: int = 60
+    
+    # Password hashing: bcrypt cost (hashes at an older cost are upgraded on login), and a
+    # dedicated pool whose workers plus queue bound concurrent logins; excess requests get 503
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 16
     
     class Config:
         env_file = ".env"
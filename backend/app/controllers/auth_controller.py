@@ -1,39 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
 from ..schemas import UserRegisterRequest, UserLoginRequest, Token, UserResponse
 from ..services.auth_service import AuthService
-from ..repositories.user_repository import UserRepository
+from ..services.password_hasher import PasswordHasherBusy, get_password_hasher
+from ..repositories.user_repository import AsyncUserRepository
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
 
 
+def _busy() -> HTTPException:
+    """503 for a request shed because the password hashing pool is full"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, try again shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register(request: UserRegisterRequest, db: Session = Depends(get_db)):
+async def register(request: UserRegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
-    user_repo = UserRepository(db)
+    user_repo = AsyncUserRepository(db)
     
     # Check if username already exists
-    if user_repo.exists_by_username(request.username):
+    if await user_repo.exists_by_username(request.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
     # Check if email already exists
-    if user_repo.exists_by_email(request.email):
+    if await user_repo.exists_by_email(request.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Hash password and create user
-    hashed_password = AuthService.get_password_hash(request.password)
-    user = user_repo.create(
+    # Hash password (CPU-bound bcrypt, on its own bounded pool) and create user
+    try:
+        hashed_password = await get_password_hasher().hash(request.password)
+    except PasswordHasherBusy:
+        raise _busy()
+    user = await user_repo.create(
         email=request.email,
         username=request.username,
         hashed_password=hashed_password
@@ -48,12 +61,12 @@ def register(request: UserRegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(request: UserLoginRequest, db: Session = Depends(get_db)):
+async def login(request: UserLoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login user"""
-    user_repo = UserRepository(db)
+    user_repo = AsyncUserRepository(db)
     
     # Get user by username
-    user = user_repo.get_by_username(request.username)
+    user = await user_repo.get_by_username(request.username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,7 +75,13 @@ def login(request: UserLoginRequest, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not AuthService.verify_password(request.password, user.hashed_password):
+    hasher = get_password_hasher()
+    try:
+        verified = await hasher.verify(request.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _busy()
+    
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -76,6 +95,13 @@ def login(request: UserLoginRequest, db: Session = Depends(get_db)):
             detail="User account is inactive"
         )
     
+    # Upgrade hashes made at an older cost while the plaintext is at hand
+    if AuthService.needs_rehash(user.hashed_password):
+        try:
+            await user_repo.update_password(user.id, await hasher.hash(request.password))
+        except PasswordHasherBusy:
+            pass  # The login already succeeded; rehash on a later one
+    
     # Create access token
     access_token = AuthService.create_access_token(
         data={"user_id": user.id, "username": user.username}
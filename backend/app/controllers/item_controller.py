@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from ..dependencies import get_current_user, get_read_db
+from ..models import User
+from ..schemas import ImportedItemFields
+from ..services.item_service import ItemService
+
+router = APIRouter(prefix="/items", tags=["items"])
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated fields parameter"""
+    if fields is None:
+        return None
+    parsed = [field.strip() for field in fields.split(",") if field.strip()]
+    return parsed or None
+
+
+@router.get("", response_model=List[ImportedItemFields], response_model_exclude_unset=True)
+async def list_items(
+    limit: int = Query(50, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated fields; the payload is only included when listed"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List the current user's most recent imported items"""
+    
+    try:
+        return await ItemService(db).list_items(current_user.id, limit, _parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{item_id}", response_model=ImportedItemFields, response_model_exclude_unset=True)
+async def get_item(
+    item_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated fields; defaults to all, including the payload"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get one imported item, including its payload unless fields says otherwise"""
+    
+    try:
+        item = await ItemService(db).get_item(current_user.id, item_id, _parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if item is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    return item
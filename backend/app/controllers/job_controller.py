@@ -1,40 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import json
 
-from ..database import get_db
-from ..dependencies import get_current_user
-from ..models import User
+from ..config import settings
+from ..database import AsyncSessionLocal, get_async_db, has_replica
+from ..dependencies import get_current_user, get_read_db, get_stream_user
+from ..models import User, ImportJob
 from ..schemas import (
     CreateImportJobRequest,
     CreateImportJobResponse,
-    GetImportJobResponse
+    GetImportJobResponse,
+    SourceProgress,
+    StreamTokenResponse
 )
+from ..services.auth_service import AuthService
 from ..services.job_service import JobService
 from ..services.import_service import ImportService
+from ..services.event_broker import get_event_broker
+from ..services.read_routing import get_read_router
 
 router = APIRouter(prefix="/import_jobs", tags=["jobs"])
 
+# Most jobs one status request may ask for
+MAX_STATUS_IDS = 100
+
 
 @router.post("", response_model=CreateImportJobResponse, status_code=201)
 async def create_import_job(
     request: CreateImportJobRequest,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new import job and start processing immediately"""
     
     try:
         service = JobService(db)
-        job = service.create_job(current_user.id, request.selected_sources, request.credentials)
-        
-        # Start processing in background
-        background_tasks.add_task(
-            ImportService.process_import_job,
-            job.id,
-            request.selected_sources
+        job = await service.create_job(
+            current_user.id, request.selected_sources, request.credentials, request.mode
         )
+        get_read_router().note_write(current_user.id)
+        
+        # Start processing in background, unless standalone workers drain the queue
+        if settings.job_runner == "background":
+            background_tasks.add_task(
+                ImportService.process_import_job,
+                job.id,
+                request.selected_sources
+            )
         
         return CreateImportJobResponse(
             jobId=job.id,
@@ -45,16 +64,192 @@ async def create_import_job(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/events/token", response_model=StreamTokenResponse)
+async def create_import_job_events_token(current_user: User = Depends(get_current_user)):
+    """Issue a short-lived token for opening the event stream, whose URL cannot carry a header"""
+    return StreamTokenResponse(
+        token=AuthService.create_stream_token(current_user),
+        expiresIn=settings.stream_token_expire_seconds
+    )
+
+
+@router.get("/events")
+async def stream_import_job_events(
+    request: Request,
+    current_user: User = Depends(get_stream_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream status and progress changes of the current user's jobs as Server-Sent Events"""
+    
+    user_id = current_user.id
+    # A stream stays open for as long as the page does; do not hold a database connection for it
+    await db.close()
+    
+    return StreamingResponse(
+        _job_event_stream(request, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _job_event_stream(request: Request, user_id: int) -> AsyncIterator[str]:
+    """Format the user's job events as SSE messages, with heartbeats to keep proxies from timing out"""
+    async with get_event_broker().subscribe(user_id) as queue:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.event_stream_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@router.get("/status", response_model=List[GetImportJobResponse])
+async def get_import_job_statuses(
+    request: Request,
+    response: Response,
+    ids: Optional[str] = Query(None, description="Comma-separated job IDs"),
+    since: Optional[datetime] = Query(None, description="Only jobs changed after this time (a previous updatedAt)"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the status of several jobs at once; answers 304 when none changed since the ETag sent"""
+    
+    if ids is None and since is None:
+        raise HTTPException(status_code=400, detail="Provide ids and/or since")
+    job_ids = _parse_ids(ids) if ids is not None else None
+    
+    service = JobService(db)
+    versions = await service.get_job_versions(current_user.id, job_ids, since)
+    etag = _versions_etag(versions)
+    
+    # Unchanged poll: one index-only query and no body
+    if etag in _if_none_match(request):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    jobs = await service.get_jobs(current_user.id, [job_id for job_id, _ in versions])
+    progress_by_job = await service.calculate_progress_for_jobs(jobs)
+    
+    response.headers["ETag"] = etag
+    return [_job_response(job, progress_by_job[job.id]) for job in jobs]
+
+
+async def _wait_for_job_change(
+    db: AsyncSession,
+    service: JobService,
+    job: ImportJob,
+    version: datetime,
+    timeout: float
+) -> Tuple[ImportJob, bool]:
+    """Hold until the pipeline publishes a change to the job (or timeout), then reload it
+    
+    Also returns whether the reload came from a replica that has not caught up with the change.
+    """
+    job_id, user_id = job.id, job.user_id
+    
+    async with get_event_broker().subscribe(user_id) as events:
+        # Re-read once subscribed so a change made before the subscription is not missed
+        await db.close()
+        job = await service.get_job(job_id)
+        if job.updated_at <= version:
+            # Don't hold a pooled connection while waiting
+            await db.close()
+            changed = await _next_job_event(events, job_id, timeout)
+            job = await service.get_job(job_id)
+            # An event means the primary has the change even if the replica does not yet
+            return job, changed and job.updated_at <= version and has_replica()
+    
+    return job, False
+
+
+async def _next_job_event(events: asyncio.Queue, job_id: int, timeout: float) -> bool:
+    """Wait for an event about job_id; False if timeout seconds pass first"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        try:
+            event = await asyncio.wait_for(events.get(), timeout=remaining)
+        except asyncio.TimeoutError:
+            return False
+        if event.get("jobId") == job_id:
+            return True
+
+
+def _encode_cursor(key: Tuple[datetime, int]) -> str:
+    """Opaque page cursor for a (created_at, id) key"""
+    created_at, job_id = key
+    raw = json.dumps([created_at.isoformat(), job_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Parse a cursor made by _encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, job_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(job_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_ids(ids: str) -> List[int]:
+    """Parse a comma-separated ID list"""
+    try:
+        job_ids = sorted({int(value) for value in ids.split(",") if value.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not job_ids or len(job_ids) > MAX_STATUS_IDS:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {MAX_STATUS_IDS} ids")
+    return job_ids
+
+
+def _versions_etag(versions: List[Tuple[int, datetime]]) -> str:
+    """Strong ETag over the selected jobs and their last change"""
+    digest = hashlib.sha1(
+        ";".join(f"{job_id}:{updated_at.isoformat()}" for job_id, updated_at in versions).encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _if_none_match(request: Request) -> List[str]:
+    """ETags listed in If-None-Match"""
+    header = request.headers.get("if-none-match", "")
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def _job_response(job: ImportJob, progress: Dict[str, SourceProgress]) -> GetImportJobResponse:
+    """Build the API representation of a job"""
+    return GetImportJobResponse(
+        jobId=job.id,
+        status=job.status,
+        selectedSources=job.selected_sources,
+        mode=job.mode,
+        progress=progress,
+        error=job.error_message,
+        createdAt=job.created_at,
+        updatedAt=job.updated_at
+    )
+
+
 @router.get("/{job_id}", response_model=GetImportJobResponse)
-def get_import_job(
+async def get_import_job(
     job_id: int,
+    wait: Optional[float] = Query(
+        None, ge=0, le=settings.job_long_poll_max_wait_seconds,
+        description="Seconds to hold the request open until the job changes from version"
+    ),
+    version: Optional[datetime] = Query(None, description="The updatedAt the client last saw"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get import job details"""
+    """Get import job details, optionally waiting for the job to change"""
     
     service = JobService(db)
-    job = service.get_job(job_id)
+    job = await service.get_job(job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -63,43 +258,81 @@ def get_import_job(
     if job.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access forbidden")
     
-    progress = service.calculate_progress(job)
+    if wait and version is not None and job.updated_at <= version:
+        job, lagging = await _wait_for_job_change(db, service, job, version, wait)
+        if lagging:
+            async with AsyncSessionLocal() as primary:
+                primary_service = JobService(primary)
+                job = await primary_service.get_job(job_id)
+                return _job_response(job, await primary_service.calculate_progress(job))
     
-    return GetImportJobResponse(
+    progress = await service.calculate_progress(job)
+    
+    return _job_response(job, progress)
+
+
+@router.post("/{job_id}/resume", response_model=CreateImportJobResponse)
+async def resume_import_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Resume a failed import job from its last committed checkpoints"""
+    
+    service = JobService(db)
+    job = await service.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Check if job belongs to current user
+    if job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access forbidden")
+    
+    try:
+        job = await service.resume_job(job)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    get_read_router().note_write(current_user.id)
+    
+    if settings.job_runner == "background":
+        background_tasks.add_task(
+            ImportService.process_import_job,
+            job.id,
+            job.selected_sources
+        )
+    
+    return CreateImportJobResponse(
         jobId=job.id,
         status=job.status,
-        selectedSources=job.selected_sources,
-        progress=progress,
-        error=job.error_message,
-        createdAt=job.created_at,
-        updatedAt=job.updated_at
+        createdAt=job.created_at
     )
 
 
 @router.get("", response_model=List[GetImportJobResponse])
-def list_import_jobs(
-    skip: int = Query(0, ge=0),
+async def list_import_jobs(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging; prefer cursor"),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List all import jobs for the current user"""
+    """List all import jobs for the current user, newest first
+    
+    When more jobs follow, the X-Next-Cursor header holds the cursor for the next page.
+    """
+    
+    if cursor is not None and skip:
+        raise HTTPException(status_code=400, detail="Use either skip or cursor")
+    after = _decode_cursor(cursor) if cursor is not None else None
     
     service = JobService(db)
-    jobs = service.list_jobs(current_user.id, skip, limit)
+    jobs, next_key = await service.list_jobs_page(current_user.id, limit, after, skip)
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = _encode_cursor(next_key)
+    # Progress for the whole page comes from one query, however many jobs it holds
+    progress_by_job = await service.calculate_progress_for_jobs(jobs)
     
-    result = []
-    for job in jobs:
-        progress = service.calculate_progress(job)
-        
-        result.append(GetImportJobResponse(
-            jobId=job.id,
-            status=job.status,
-            selectedSources=job.selected_sources,
-            progress=progress,
-            error=job.error_message,
-            createdAt=job.created_at,
-            updatedAt=job.updated_at
-        ))
-    
-    return result
+    return [_job_response(job, progress_by_job[job.id]) for job in jobs]
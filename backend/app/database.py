@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
@@ -6,14 +10,119 @@ from .config import settings
 # Use postgres URL if provided, otherwise use SQLite
 DATABASE_URL = settings.postgres_url or settings.database_url
 
-# SQLite specific configuration
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# Engine profiles selectable with DB_ENGINE_PROFILE
+ENGINE_PROFILES = ("default", "sqlite", "postgres")
+
+
+def engine_profile(url: str) -> str:
+    """The configured profile, resolving "auto" from the URL's backend"""
+    profile = settings.db_engine_profile
+    if profile == "auto":
+        backend = make_url(url).get_backend_name()
+        return {"sqlite": "sqlite", "postgresql": "postgres"}.get(backend, "default")
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown engine profile: {profile}. Allowed: {', '.join(ENGINE_PROFILES)}")
+    return profile
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine keyword arguments for the URL under the configured profile"""
+    options: Dict[str, Any] = {}
+    if make_url(url).get_backend_name() == "sqlite" and not is_async:
+        options["connect_args"] = {"check_same_thread": False}
+    
+    if engine_profile(url) == "postgres":
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            query_cache_size=settings.db_compiled_cache_size
+        )
+        if is_async:
+            options["connect_args"] = {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    return options
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """Pragmas the sqlite profile sets on each connection"""
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -settings.sqlite_cache_size_kib,
+        "mmap_size": settings.sqlite_mmap_size_bytes
+    }
+
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+def _apply_profile(engine: Engine, url: str) -> None:
+    """Install per-connection setup the profile needs"""
+    if engine_profile(url) != "sqlite":
+        return
+    
+    pragmas = sqlite_pragmas()
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_db_engine(url: str, **kwargs: Any) -> Engine:
+    """Create a sync engine with the configured profile"""
+    engine = create_engine(url, **{**engine_options(url), **kwargs})
+    _apply_profile(engine, url)
+    return engine
+
+
+def create_async_db_engine(url: str, **kwargs: Any) -> AsyncEngine:
+    """Create an async engine with the configured profile"""
+    async_engine = create_async_engine(url, **{**engine_options(url, is_async=True), **kwargs})
+    _apply_profile(async_engine.sync_engine, url)
+    return async_engine
+
+
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Asyncio drivers for the same databases
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap a database URL's driver for its asyncio equivalent"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = settings.async_database_url or to_async_url(DATABASE_URL)
+
+async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+# Objects stay usable after commit; reloading expired attributes would need another await
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Read replica; without one, replica sessions use the primary
+ASYNC_REPLICA_URL = settings.async_replica_database_url or (
+    to_async_url(settings.replica_database_url) if settings.replica_database_url else None
+)
+async_replica_engine = create_async_db_engine(ASYNC_REPLICA_URL) if ASYNC_REPLICA_URL else None
+AsyncReplicaSessionLocal = async_sessionmaker(
+    async_replica_engine or async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+def has_replica() -> bool:
+    """Whether a read replica is configured"""
+    return async_replica_engine is not None
+
 Base = declarative_base()
 
 
@@ -26,6 +135,21 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Async database session dependency"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_replica_db():
+    """Async read-only session on the replica (the primary when none is configured)"""
+    async with AsyncReplicaSessionLocal() as db:
+        yield db
+
+
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    """Create missing tables and apply pending schema migrations"""
+    # Imported here: migrations need the models, which need Base from this module
+    from .migrations import migrate
+    
+    migrate(engine)
@@ -1,33 +1,93 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from .database import get_db
-from .services.auth_service import AuthService
-from .repositories.user_repository import UserRepository
+from .database import get_async_db, get_replica_db
+from .services.auth_service import STREAM_TOKEN_SCOPE, AuthService, get_auth_cache
+from .services.read_routing import get_read_router
+from .repositories.user_repository import AsyncUserRepository
 from .models import User
 
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Dependency to get current authenticated user"""
+    return await authenticate(credentials.credentials, db)
+
+
+async def get_read_db(
+    current_user: User = Depends(get_current_user),
+    replica: AsyncSession = Depends(get_replica_db),
+    primary: AsyncSession = Depends(get_async_db)
+) -> AsyncSession:
+    """Session for read-only endpoints: the replica, or the primary just after the user's data changed"""
+    if get_read_router().use_primary(current_user.id):
+        return primary
+    # Authenticating may have queried the primary (auth cache miss); hand that connection back
+    # now rather than holding it while the request reads, or long-polls, on the replica
+    await primary.close()
+    return replica
+
+
+async def get_stream_user(
+    token: Optional[str] = Query(None, description="Stream token, for clients such as EventSource that cannot set headers"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Dependency to get the authenticated user of a streaming request from the header or ?token=
     
-    token_data = AuthService.decode_access_token(credentials.credentials)
+    Only short-lived stream tokens are accepted in the query string, which ends up in access
+    logs and browser history; access tokens must come in the Authorization header.
+    """
+    if credentials is not None:
+        return await authenticate(credentials.credentials, db)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return await authenticate(token, db, scope=STREAM_TOKEN_SCOPE)
+
+
+async def authenticate(token: str, db: AsyncSession, scope: Optional[str] = None) -> User:
+    """Resolve a token of the given scope (None: a full access token) to an active user or raise 401"""
+    cache = get_auth_cache()
     
+    token_data = cache.get_token(token)
     if token_data is None:
+        token_data = AuthService.decode_access_token(token)
+        
+        if token_data is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        
+        cache.put_token(token, token_data)
+    
+    if token_data.scope != scope:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    user_repo = UserRepository(db)
-    user = user_repo.get_by_id(token_data.user_id)
+    user = cache.get_user(token_data.user_id)
+    if user is not None:
+        return user
+    
+    generation = cache.generation(token_data.user_id)
+    user_repo = AsyncUserRepository(db)
+    user = await user_repo.get_by_id(token_data.user_id)
     
     if user is None or not user.is_active:
         raise HTTPException(
@@ -36,4 +96,5 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
+    cache.put_user(user, generation)
     return user
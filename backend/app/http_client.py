@@ -0,0 +1,91 @@
+import importlib.util
+import logging
+from typing import Optional, Dict, Any
+
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Process-wide client shared by every import job; owned by the app lifespan
+_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build a pooled keep-alive client from settings"""
+    http2 = settings.http2_enabled
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds
+        ),
+        timeout=httpx.Timeout(
+            settings.http_timeout_seconds,
+            connect=settings.http_connect_timeout_seconds
+        )
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the shared client (called from the app lifespan)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client, creating it if the lifespan has not run (e.g. scripts)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+def http_pool_stats() -> Dict[str, Any]:
+    """Connection pool utilization of the shared client"""
+    stats: Dict[str, Any] = {
+        "started": _client is not None and not _client.is_closed,
+        "http2": settings.http2_enabled,
+        "maxConnections": settings.http_max_connections,
+        "maxKeepaliveConnections": settings.http_max_keepalive_connections,
+        "keepaliveExpirySeconds": settings.http_keepalive_expiry_seconds,
+        "openConnections": 0,
+        "activeConnections": 0,
+        "idleConnections": 0,
+        "queuedRequests": 0,
+        "utilization": 0.0
+    }
+    if not stats["started"]:
+        return stats
+
+    # httpx does not expose pool state publicly; read it from the httpcore pool
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    if pool is None:
+        return stats
+
+    connections = list(getattr(pool, "connections", []))
+    idle = sum(1 for connection in connections if connection.is_idle())
+    queued = sum(1 for request in getattr(pool, "_requests", []) if request.is_queued())
+
+    stats["openConnections"] = len(connections)
+    stats["idleConnections"] = idle
+    stats["activeConnections"] = len(connections) - idle
+    stats["queuedRequests"] = queued
+    stats["utilization"] = round(stats["activeConnections"] / settings.http_max_connections, 3)
+    return stats
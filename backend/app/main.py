@@ -1,17 +1,62 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
 from .database import init_db
-from .controllers import job_router, dashboard_router, auth_router
+from .http_client import start_http_client, close_http_client, http_pool_stats
+from .services.resilience import resilience_stats
+from .services.event_broker import close_event_broker, event_broker_stats
+from .services.dashboard_service import dashboard_cache_stats
+from .services.auth_service import auth_cache_stats
+from .services.password_hasher import close_password_hasher, password_hasher_stats
+from .services.read_routing import read_routing_stats
+from .services.job_reclaimer import reclaim_abandoned_jobs
+from .controllers import job_router, dashboard_router, auth_router, item_router
+
+logger = logging.getLogger(__name__)
 
 # Initialize database
 init_db()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open process-wide resources on startup and release them on shutdown"""
+    if settings.job_runner == "worker" and settings.event_backend != "redis":
+        logger.warning(
+            "JOB_RUNNER=worker with EVENT_BACKEND=%s: worker job events cannot reach this API "
+            "process, so clients only see job changes through their fallback poll. "
+            "Set EVENT_BACKEND=redis for live updates.",
+            settings.event_backend
+        )
+    await start_http_client()
+    
+    # Without standalone workers, this process is what resumes jobs a previous one abandoned
+    stop_reclaimer = asyncio.Event()
+    reclaimer = None
+    if settings.job_runner == "background":
+        reclaimer = asyncio.ensure_future(reclaim_abandoned_jobs(
+            stop_reclaimer, settings.worker_concurrency, settings.job_lease_seconds
+        ))
+    
+    yield
+    
+    if reclaimer is not None:
+        stop_reclaimer.set()
+        await reclaimer
+    await close_http_client()
+    await close_event_broker()
+    close_password_hasher()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Import Service API",
     description="Self-service data import API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -21,12 +66,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Readable by browser clients: status polling and job list paging
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Include routers
 app.include_router(auth_router, prefix=settings.api_v1_prefix)
 app.include_router(job_router, prefix=settings.api_v1_prefix)
 app.include_router(dashboard_router, prefix=settings.api_v1_prefix)
+app.include_router(item_router, prefix=settings.api_v1_prefix)
 
 
 @app.get("/")
@@ -43,3 +91,17 @@ def root():
 def health():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics for shared resources"""
+    return {
+        "httpClient": http_pool_stats(),
+        "upstream": resilience_stats(),
+        "events": event_broker_stats(),
+        "dashboardCache": dashboard_cache_stats(),
+        "authCache": auth_cache_stats(),
+        "passwordHasher": password_hasher_stats(),
+        "readRouting": read_routing_stats()
+    }
@@ -0,0 +1,204 @@
+"""
+Versioned schema migrations
+
+create_all creates missing tables but never changes existing ones, so every change to an
+existing table is a numbered migration here. Applied versions are recorded in the
+schema_version table. A brand-new database is built from the models and stamped with the
+latest version; an existing one gets whatever migrations it has not applied yet.
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .database import Base
+from .models import ImportJob, ImportJobSource, ImportedItem, User
+from .repositories.item_repository import canonical_json, content_hash
+from .repositories.user_stats_repository import UserStatsRepository
+
+logger = logging.getLogger(__name__)
+
+# Kept off Base.metadata so dropping the app's tables leaves the version history alone
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+
+def _add_columns(connection: Connection, table_name: str, *columns: Tuple[str, str]) -> None:
+    """Add (name, constraints) columns missing from a table, typed as the model declares them"""
+    table = Base.metadata.tables[table_name]
+    existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+    for name, constraints in columns:
+        if name in existing:
+            continue
+        column_type = table.c[name].type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type} {constraints}".rstrip()))
+
+
+def _create_indexes(connection: Connection, *names: str) -> None:
+    """Create model-declared indexes that are missing"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                index.create(connection, checkfirst=True)
+
+
+def _drop_indexes(connection: Connection, *names: str) -> None:
+    """Drop indexes the models no longer declare"""
+    for name in names:
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _upgrade_baseline(connection: Connection) -> None:
+    """Bring a database created by the original schema up to the upsert/checkpoint schema"""
+    _add_columns(
+        connection,
+        "import_jobs",
+        ("mode", "NOT NULL DEFAULT 'full'"),
+        ("lease_owner", ""),
+        ("lease_expires_at", ""),
+        ("attempts", "NOT NULL DEFAULT 0")
+    )
+    _add_columns(
+        connection,
+        "imported_items",
+        ("user_id", "REFERENCES users (id)"),
+        ("content_hash", ""),
+        ("payload_bytes", ""),
+        ("updated_at", "")
+    )
+    
+    # Items were owned through their job; they now carry the owner and are unique per record
+    connection.execute(text(
+        "UPDATE imported_items SET user_id = "
+        "(SELECT user_id FROM import_jobs WHERE import_jobs.id = imported_items.job_id) "
+        "WHERE user_id IS NULL"
+    ))
+    connection.execute(text("UPDATE imported_items SET updated_at = created_at WHERE updated_at IS NULL"))
+    connection.execute(text(
+        "DELETE FROM imported_items WHERE id NOT IN "
+        "(SELECT MAX(id) FROM imported_items GROUP BY user_id, source, remote_id)"
+    ))
+    inspector = inspect(connection)
+    unique_names = {c["name"] for c in inspector.get_unique_constraints("imported_items")}
+    unique_names |= {i["name"] for i in inspector.get_indexes("imported_items")}
+    if "uq_imported_items_user_source_remote" not in unique_names:
+        connection.execute(text(
+            "CREATE UNIQUE INDEX uq_imported_items_user_source_remote "
+            "ON imported_items (user_id, source, remote_id)"
+        ))
+    
+    session = Session(bind=connection)
+    
+    # Hashes and sizes drive unchanged-record skipping and the user_stats byte counts
+    while True:
+        items = session.execute(
+            select(ImportedItem.id, ImportedItem.payload).where(ImportedItem.content_hash.is_(None)).limit(1000)
+        ).all()
+        if not items:
+            break
+        for item_id, payload in items:
+            session.execute(
+                ImportedItem.__table__.update().where(ImportedItem.id == item_id).values(
+                    content_hash=content_hash(payload),
+                    payload_bytes=len(canonical_json(payload))
+                )
+            )
+    
+    # Jobs from before per-source state: everything they wrote counts as committed progress
+    legacy_jobs = session.execute(
+        select(ImportJob.id, ImportJob.status, ImportJob.selected_sources).where(~ImportJob.sources.any())
+    ).all()
+    for job_id, status, selected_sources in legacy_jobs:
+        for source in selected_sources or []:
+            written = session.execute(
+                select(func.count()).select_from(ImportedItem).where(
+                    ImportedItem.job_id == job_id,
+                    ImportedItem.source == source
+                )
+            ).scalar()
+            session.execute(ImportJobSource.__table__.insert().values(
+                job_id=job_id,
+                source=source,
+                status=status if status in ("Completed", "Failed") else "Pending",
+                total=written if status == "Completed" else None,
+                checkpoint_offset=written,
+                inserted_count=written,
+                updated_count=0,
+                unchanged_count=0,
+                updated_at=datetime.utcnow()
+            ))
+    
+    stats = UserStatsRepository(session)
+    for (user_id,) in session.execute(select(User.id)).all():
+        stats.rebuild(user_id, commit=False)
+    session.flush()
+
+
+def _composite_indexes(connection: Connection) -> None:
+    """Indexes matching the hot job and item queries"""
+    _create_indexes(
+        connection,
+        "ix_import_jobs_user_updated",
+        "ix_import_jobs_user_created_id",
+        "ix_import_jobs_user_status",
+        "ix_import_jobs_status_created",
+        "ix_imported_items_job_source",
+        "ix_imported_items_user_created"
+    )
+    # Both are prefixes of the composites above
+    _drop_indexes(connection, "ix_import_jobs_user_id", "ix_imported_items_job_id")
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Item ownership, upsert keys, job leases and per-source state", _upgrade_baseline),
+    (2, "Composite indexes for job listing, polling, counts, queue claims and recent items", _composite_indexes),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(connection: Connection) -> int:
+    """Highest applied migration, 0 for a database that has none"""
+    _metadata.create_all(connection)
+    return connection.execute(select(func.coalesce(func.max(schema_version.c.version), 0))).scalar()
+
+
+def _record(connection: Connection, number: int, description: str) -> None:
+    """Mark a migration as applied"""
+    connection.execute(schema_version.insert().values(
+        version=number,
+        description=description,
+        applied_at=datetime.utcnow()
+    ))
+
+
+def migrate(engine: Engine) -> int:
+    """Create missing tables and bring the schema up to date; returns the schema version"""
+    fresh = not inspect(engine).has_table(ImportJob.__tablename__)
+    Base.metadata.create_all(bind=engine)
+    
+    with engine.begin() as connection:
+        version = current_version(connection)
+        if fresh:
+            # Built from the current models: nothing to migrate
+            for number, description, _ in MIGRATIONS:
+                _record(connection, number, description)
+            return LATEST_VERSION
+    
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        logger.info("Applying migration %s: %s", number, description)
+        with engine.begin() as connection:
+            step(connection)
+            _record(connection, number, description)
+        version = number
+    return version
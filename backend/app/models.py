@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Boolean, UniqueConstraint, Index
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from .database import Base
 
@@ -22,32 +22,97 @@ class User(Base):
 class ImportJob(Base):
     """Import job entity"""
     __tablename__ = "import_jobs"
+    __table_args__ = (
+        # Status polling: a user's jobs and their versions without touching the table
+        Index("ix_import_jobs_user_updated", "user_id", "updated_at"),
+        # Job listing: keyset pages newest first, by (created_at, id)
+        Index("ix_import_jobs_user_created_id", "user_id", "created_at", "id"),
+        # Per-user status counts and the incremental baseline lookup
+        Index("ix_import_jobs_user_status", "user_id", "status"),
+        # Queue claims: unfinished jobs, oldest first
+        Index("ix_import_jobs_status_created", "status", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Leads every composite index above
     status = Column(String(50), nullable=False, default="Pending")  # Pending, Running, Completed, Failed
     selected_sources = Column(JSON, nullable=False)  # List of sources: ["products", "carts"]
+    mode = Column(String(20), nullable=False, default="full")  # full, incremental
     credentials = Column(JSON)  # Credentials per source
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Bumped on status and progress changes
+    
+    # Queue lease: the worker currently processing the job and when its claim lapses
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
     
     # Relationships
     user = relationship("User", back_populates="import_jobs")
     imported_items = relationship("ImportedItem", back_populates="job", cascade="all, delete-orphan")
+    sources = relationship("ImportJobSource", back_populates="job", cascade="all, delete-orphan")
+
+
+class ImportJobSource(Base):
+    """Per-source state of an import job, including its resume checkpoint"""
+    __tablename__ = "import_job_sources"
+    
+    job_id = Column(Integer, ForeignKey("import_jobs.id"), primary_key=True)
+    source = Column(String(50), primary_key=True)
+    status = Column(String(50), nullable=False, default="Pending")  # Pending, Running, Completed, Failed
+    total = Column(Integer, nullable=True)  # Records the upstream reports for the source; unknown until the first page
+    checkpoint_offset = Column(Integer, nullable=False, default=0)  # Upstream records committed so far
+    checkpoint_remote_id = Column(Integer, nullable=True)  # remote_id of the last committed record
+    max_remote_id = Column(Integer, nullable=True)  # Highest remote_id seen; the next incremental job's baseline
+    inserted_count = Column(Integer, nullable=False, default=0)  # New records written
+    updated_count = Column(Integer, nullable=False, default=0)  # Existing records whose payload changed
+    unchanged_count = Column(Integer, nullable=False, default=0)  # Existing records skipped without a write
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationship
+    job = relationship("ImportJob", back_populates="sources")
 
 
 class ImportedItem(Base):
-    """Imported item entity"""
+    """Imported item entity, one row per user, source and remote record"""
     __tablename__ = "imported_items"
+    __table_args__ = (
+        UniqueConstraint("user_id", "source", "remote_id", name="uq_imported_items_user_source_remote"),
+        # Per-job counts and deletes
+        Index("ix_imported_items_job_source", "job_id", "source"),
+        # Recent items for the dashboard
+        Index("ix_imported_items_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    job_id = Column(Integer, ForeignKey("import_jobs.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Owner; leads the unique key
+    job_id = Column(Integer, ForeignKey("import_jobs.id"), nullable=False)  # Last job that wrote it
     source = Column(String(50), nullable=False)  # "products" or "carts"
     remote_id = Column(Integer, nullable=False)  # ID from external API
-    payload = Column(JSON, nullable=False)  # Full item data
+    payload = deferred(Column(JSON, nullable=False))  # Full item data; loaded only when a read asks for it
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the canonical payload
+    payload_bytes = Column(Integer, nullable=True)  # Size of the canonical payload, summed into user_stats
     status = Column(String(50), nullable=False, default="Success")  # Success, Failed
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship
     job = relationship("ImportJob", back_populates="imported_items")
+
+
+class UserStats(Base):
+    """Per-user rollup behind the dashboard, kept up to date by the writes it summarizes"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    jobs_total = Column(Integer, nullable=False, default=0)
+    jobs_pending = Column(Integer, nullable=False, default=0)
+    jobs_running = Column(Integer, nullable=False, default=0)
+    jobs_completed = Column(Integer, nullable=False, default=0)
+    jobs_failed = Column(Integer, nullable=False, default=0)
+    items_products = Column(Integer, nullable=False, default=0)
+    items_carts = Column(Integer, nullable=False, default=0)
+    bytes_imported = Column(Integer, nullable=False, default=0)  # Canonical payload bytes currently stored
+    last_import_at = Column(DateTime, nullable=True)  # Last time a chunk wrote items
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,13 @@
-from .job_repository import JobRepository
-from .item_repository import ItemRepository
+from .job_repository import JobRepository, AsyncJobRepository
+from .item_repository import ItemRepository, AsyncItemRepository
+from .job_source_repository import JobSourceRepository, AsyncJobSourceRepository
+from .dashboard_repository import DashboardRepository, AsyncDashboardRepository
+from .user_stats_repository import UserStatsRepository, AsyncUserStatsRepository
 
-__all__ = ['JobRepository', 'ItemRepository']
+__all__ = [
+    'JobRepository', 'AsyncJobRepository',
+    'ItemRepository', 'AsyncItemRepository',
+    'JobSourceRepository', 'AsyncJobSourceRepository',
+    'DashboardRepository', 'AsyncDashboardRepository',
+    'UserStatsRepository', 'AsyncUserStatsRepository'
+]
@@ -0,0 +1,28 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Callable
+
+# INSERT constructs with ON CONFLICT support, by dialect
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+class AsyncRepository:
+    """Async adapter over a sync repository
+    
+    Each call runs the sync repository method on the AsyncSession's underlying session via
+    run_sync, so the queries are defined once while the I/O goes through the asyncio driver
+    and never blocks the event loop.
+    """
+    
+    repository_class: type
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _run(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Invoke a sync repository method against this async session"""
+        return await self.db.run_sync(
+            lambda session: method(self.repository_class(session), *args, **kwargs)
+        )
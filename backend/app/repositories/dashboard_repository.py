@@ -0,0 +1,41 @@
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+from typing import Dict
+
+from ..models import ImportJob, ImportedItem
+from .base import AsyncRepository
+
+
+class DashboardRepository:
+    """Read-only aggregates behind the dashboard"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_counts(self, user_id: int) -> Dict[str, Dict[str, int]]:
+        """Job counts by status and item counts by source for a user, in one grouped query"""
+        jobs = select(
+            literal("jobs").label("kind"),
+            ImportJob.status.label("key"),
+            func.count().label("count")
+        ).where(ImportJob.user_id == user_id).group_by(ImportJob.status)
+        items = select(
+            literal("items"),
+            ImportedItem.source,
+            func.count()
+        ).where(ImportedItem.user_id == user_id).group_by(ImportedItem.source)
+        
+        counts: Dict[str, Dict[str, int]] = {"jobs": {}, "items": {}}
+        for kind, key, count in self.db.execute(union_all(jobs, items)):
+            counts[kind][key] = count
+        return counts
+
+
+class AsyncDashboardRepository(AsyncRepository):
+    """Async variant of DashboardRepository"""
+    
+    repository_class = DashboardRepository
+    
+    async def get_counts(self, user_id: int) -> Dict[str, Dict[str, int]]:
+        """Job counts by status and item counts by source for a user"""
+        return await self._run(DashboardRepository.get_counts, user_id)
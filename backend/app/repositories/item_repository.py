@@ -1,8 +1,73 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import Column, DateTime, Integer, JSON, MetaData, String, Table, func, select
+from sqlalchemy.engine import Dialect, Row
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.util import await_only
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from datetime import datetime
+import csv
+import hashlib
+import io
+import json
 
 from ..models import ImportedItem, ImportJob
+from .base import AsyncRepository, UPSERT_INSERTS
+from .user_stats_repository import UserStatsRepository
+
+
+# Columns item reads can be projected to
+ITEM_FIELDS = ("id", "job_id", "source", "remote_id", "status", "created_at", "updated_at", "payload")
+
+# Columns an upsert writes, in COPY order
+UPSERT_COLUMNS = (
+    "user_id", "job_id", "source", "remote_id", "payload", "content_hash",
+    "payload_bytes", "status", "created_at", "updated_at"
+)
+
+# Per-connection Postgres staging table that COPY loads before one INSERT ... SELECT merges it
+COPY_STAGE = Table(
+    "imported_items_stage",
+    MetaData(),
+    Column("user_id", Integer, nullable=False),
+    Column("job_id", Integer, nullable=False),
+    Column("source", String(50), nullable=False),
+    Column("remote_id", Integer, nullable=False),
+    Column("payload", JSON, nullable=False),
+    Column("content_hash", String(64)),
+    Column("payload_bytes", Integer),
+    Column("status", String(50), nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DELETE ROWS"
+)
+
+# Drivers with a COPY FROM STDIN path: asyncpg streams binary, psycopg2 streams CSV
+COPY_DRIVERS = ("asyncpg", "psycopg2")
+
+
+def supports_copy(dialect: Dialect) -> bool:
+    """Whether upserts on this dialect can bulk-load with COPY"""
+    return dialect.name == "postgresql" and dialect.driver in COPY_DRIVERS
+
+
+def canonical_json(payload: Any) -> bytes:
+    """A payload's canonical JSON form, so key order does not matter"""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def content_hash(payload: Any) -> str:
+    """SHA-256 of a payload's canonical JSON form"""
+    return hashlib.sha256(canonical_json(payload)).hexdigest()
+
+
+@dataclass
+class UpsertResult:
+    """How the records of one upsert were applied"""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
 
 
 class ItemRepository:
@@ -11,24 +76,196 @@ class ItemRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, job_id: int, source: str, remote_id: int, payload: dict) -> ImportedItem:
-        """Create a new imported item"""
+    def create(
+        self,
+        job_id: int,
+        source: str,
+        remote_id: int,
+        payload: dict,
+        user_id: Optional[int] = None
+    ) -> ImportedItem:
+        """Create a new imported item, owned by the job's user unless user_id is given"""
+        if user_id is None:
+            user_id = self.db.query(ImportJob.user_id).filter(ImportJob.id == job_id).scalar()
+        now = datetime.utcnow()
+        canonical = canonical_json(payload)
         item = ImportedItem(
+            user_id=user_id,
             job_id=job_id,
             source=source,
             remote_id=remote_id,
             payload=payload,
+            content_hash=hashlib.sha256(canonical).hexdigest(),
+            payload_bytes=len(canonical),
             status="Success",
-            created_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
         self.db.add(item)
+        UserStatsRepository(self.db).record_items(user_id, source, 1, len(canonical), now)
         return item
     
     def bulk_create(self, items: List[ImportedItem]) -> None:
-        """Bulk create items"""
+        """Bulk create items, filling in their hashes and counting them in the user's rollup"""
+        now = datetime.utcnow()
+        added: Dict[Tuple[int, str], List[int]] = {}
+        for item in items:
+            canonical = canonical_json(item.payload)
+            item.content_hash = hashlib.sha256(canonical).hexdigest()
+            item.payload_bytes = len(canonical)
+            item.created_at = item.created_at or now
+            item.updated_at = item.updated_at or now
+            counts = added.setdefault((item.user_id, item.source), [0, 0])
+            counts[0] += 1
+            counts[1] += item.payload_bytes
         self.db.add_all(items)
+        stats_repo = UserStatsRepository(self.db)
+        for (user_id, source), (inserted, payload_bytes) in added.items():
+            stats_repo.record_items(user_id, source, inserted, payload_bytes, now)
         self.db.commit()
     
+    def upsert(
+        self,
+        user_id: int,
+        job_id: int,
+        source: str,
+        records: List[Dict[str, Any]],
+        commit: bool = True,
+        copy_min_rows: int = 0
+    ) -> UpsertResult:
+        """Insert new records and update changed ones keyed by (user, source, remote_id)
+        
+        Stored content hashes are read first so unchanged records are skipped without a
+        write; the rest go out as one multi-row INSERT ... ON CONFLICT DO UPDATE, or on
+        Postgres, when at least copy_min_rows (> 0) need writing, are COPYed into a staging
+        table and merged with one INSERT ... SELECT ... ON CONFLICT DO UPDATE.
+        """
+        result = UpsertResult()
+        if not records:
+            return result
+        
+        # Last occurrence wins if the upstream repeats a record within one chunk
+        canonical: Dict[Any, bytes] = {}
+        latest: Dict[Any, Dict[str, Any]] = {}
+        for record in records:
+            canonical[record.get("id")] = canonical_json(record)
+            latest[record.get("id")] = record
+        hashes = {remote_id: hashlib.sha256(value).hexdigest() for remote_id, value in canonical.items()}
+        
+        stored = {
+            remote_id: (stored_hash, stored_bytes)
+            for remote_id, stored_hash, stored_bytes in self.db.execute(
+                select(ImportedItem.remote_id, ImportedItem.content_hash, ImportedItem.payload_bytes).where(
+                    ImportedItem.user_id == user_id,
+                    ImportedItem.source == source,
+                    ImportedItem.remote_id.in_(list(latest))
+                )
+            )
+        }
+        
+        now = datetime.utcnow()
+        rows = []
+        bytes_delta = 0
+        for remote_id, record in latest.items():
+            size = len(canonical[remote_id])
+            if remote_id not in stored:
+                result.inserted += 1
+                bytes_delta += size
+            elif stored[remote_id][0] != hashes[remote_id]:
+                result.updated += 1
+                bytes_delta += size - (stored[remote_id][1] or 0)
+            else:
+                result.unchanged += 1
+                continue
+            rows.append({
+                "user_id": user_id,
+                "job_id": job_id,
+                "source": source,
+                "remote_id": remote_id,
+                "payload": record,
+                "content_hash": hashes[remote_id],
+                "payload_bytes": size,
+                "status": "Success",
+                "created_at": now,
+                "updated_at": now
+            })
+        result.unchanged += len(records) - len(latest)
+        
+        if rows:
+            dialect = self.db.get_bind().dialect
+            if copy_min_rows > 0 and len(rows) >= copy_min_rows and supports_copy(dialect):
+                self._copy_upsert(rows, canonical)
+            else:
+                insert = UPSERT_INSERTS[dialect.name]
+                self.db.execute(self._on_conflict_update(insert(ImportedItem)), rows)
+            # Same transaction as the rows, so the rollup never counts an uncommitted chunk
+            UserStatsRepository(self.db).record_items(user_id, source, result.inserted, bytes_delta, now)
+        if commit:
+            self.db.commit()
+        return result
+    
+    @staticmethod
+    def _on_conflict_update(statement):
+        """Make an INSERT overwrite existing items whose content changed"""
+        return statement.on_conflict_do_update(
+            index_elements=["user_id", "source", "remote_id"],
+            set_={
+                "job_id": statement.excluded.job_id,
+                "payload": statement.excluded.payload,
+                "content_hash": statement.excluded.content_hash,
+                "payload_bytes": statement.excluded.payload_bytes,
+                "status": statement.excluded.status,
+                "updated_at": statement.excluded.updated_at
+            },
+            # A concurrent job may already have written the same content
+            where=ImportedItem.content_hash.is_distinct_from(statement.excluded.content_hash)
+        )
+    
+    @staticmethod
+    def _copy_merge_statement():
+        """INSERT ... SELECT that merges the staging table into imported_items"""
+        insert = UPSERT_INSERTS["postgresql"]
+        return ItemRepository._on_conflict_update(
+            insert(ImportedItem).from_select(
+                list(UPSERT_COLUMNS), select(*(COPY_STAGE.c[column] for column in UPSERT_COLUMNS))
+            )
+        )
+    
+    def _copy_upsert(self, rows: List[Dict[str, Any]], canonical: Dict[Any, bytes]) -> None:
+        """Stream rows into the staging table with COPY, then merge them in one statement"""
+        connection = self.db.connection()
+        connection.execute(CreateTable(COPY_STAGE, if_not_exists=True))
+        # The already-serialized canonical JSON is sent as is, rather than re-encoding each payload
+        values = [
+            tuple(
+                canonical[row["remote_id"]].decode("utf-8") if column == "payload" else row[column]
+                for column in UPSERT_COLUMNS
+            )
+            for row in rows
+        ]
+        
+        driver_connection = connection.connection.driver_connection
+        if connection.dialect.driver == "asyncpg":
+            # Binary COPY; runs inside the transaction SQLAlchemy has open on this connection
+            await_only(driver_connection.copy_records_to_table(
+                COPY_STAGE.name, records=values, columns=list(UPSERT_COLUMNS)
+            ))
+        else:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in values
+            )
+            buffer.seek(0)
+            with driver_connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {COPY_STAGE.name} ({', '.join(UPSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+        
+        self.db.execute(self._copy_merge_statement())
+        # Several chunks can share a transaction, so clear the stage rather than wait for commit
+        self.db.execute(COPY_STAGE.delete())
+    
     def count_by_job_and_source(self, job_id: int, source: str) -> int:
         """Count items for a job and source"""
         return self.db.query(ImportedItem).filter(
@@ -44,22 +281,125 @@ class ItemRepository:
     
     def count_by_source_and_user(self, user_id: int, source: str) -> int:
         """Count items by source for a specific user"""
-        return self.db.query(ImportedItem).join(ImportJob).filter(
-            ImportJob.user_id == user_id,
+        return self.db.query(ImportedItem).filter(
+            ImportedItem.user_id == user_id,
             ImportedItem.source == source
         ).count()
     
-    def get_recent(self, user_id: int, limit: int = 50) -> List[ImportedItem]:
-        """Get recent items for a specific user"""
-        return self.db.query(ImportedItem).join(ImportJob).filter(
-            ImportJob.user_id == user_id
+    def get_recent(self, user_id: int, limit: int = 50, fields: Optional[Sequence[str]] = None) -> List[ImportedItem]:
+        """Get recent items for a specific user, loading only fields if given (payload is deferred)"""
+        query = self.db.query(ImportedItem).filter(
+            ImportedItem.user_id == user_id
         ).order_by(
             ImportedItem.created_at.desc()
-        ).limit(limit).all()
+        )
+        return self._project(query, fields).limit(limit).all()
+    
+    def get_for_user(
+        self,
+        user_id: int,
+        item_id: int,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[ImportedItem]:
+        """Get one of a user's items with its payload, or only fields if given"""
+        query = self.db.query(ImportedItem).filter(
+            ImportedItem.id == item_id,
+            ImportedItem.user_id == user_id
+        )
+        if fields is None:
+            fields = ITEM_FIELDS
+        return self._project(query, fields).first()
+    
+    def get_recent_summaries(self, user_id: int, limit: int = 50) -> List[Row]:
+        """Recent items as compact rows: title, total and item count are extracted in SQL, not the payload"""
+        return self.db.execute(
+            select(
+                ImportedItem.id,
+                ImportedItem.source,
+                ImportedItem.remote_id,
+                ImportedItem.status,
+                ImportedItem.created_at,
+                ImportedItem.payload["title"].as_string().label("title"),
+                ImportedItem.payload["total"].as_float().label("total"),
+                ImportedItem.payload["totalProducts"].as_integer().label("item_count")
+            ).where(
+                ImportedItem.user_id == user_id
+            ).order_by(
+                ImportedItem.created_at.desc()
+            ).limit(limit)
+        ).all()
+    
+    @staticmethod
+    def _project(query, fields: Optional[Sequence[str]]):
+        """Restrict a query to the given ITEM_FIELDS columns"""
+        if fields is None:
+            return query
+        unknown = set(fields) - set(ITEM_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown item fields: {', '.join(sorted(unknown))}")
+        return query.options(load_only(*(getattr(ImportedItem, field) for field in fields)))
     
     def delete_by_job(self, job_id: int) -> None:
-        """Delete all items for a job"""
+        """Delete all items for a job, taking them out of their users' rollups"""
+        removed = self.db.query(
+            ImportedItem.user_id,
+            ImportedItem.source,
+            func.count(ImportedItem.id),
+            func.coalesce(func.sum(ImportedItem.payload_bytes), 0)
+        ).filter(
+            ImportedItem.job_id == job_id
+        ).group_by(ImportedItem.user_id, ImportedItem.source).all()
         self.db.query(ImportedItem).filter(
             ImportedItem.job_id == job_id
         ).delete()
+        stats_repo = UserStatsRepository(self.db)
+        for user_id, source, count, payload_bytes in removed:
+            stats_repo.record_items(user_id, source, -count, -payload_bytes)
         self.db.commit()
+
+
+class AsyncItemRepository(AsyncRepository):
+    """Async variant of ItemRepository"""
+    
+    repository_class = ItemRepository
+    
+    async def upsert(
+        self,
+        user_id: int,
+        job_id: int,
+        source: str,
+        records: List[Dict[str, Any]],
+        commit: bool = True,
+        copy_min_rows: int = 0
+    ) -> UpsertResult:
+        """Insert new records and update changed ones keyed by (user, source, remote_id)"""
+        return await self._run(ItemRepository.upsert, user_id, job_id, source, records, commit, copy_min_rows)
+    
+    async def count_by_job_and_source(self, job_id: int, source: str) -> int:
+        """Count items for a job and source"""
+        return await self._run(ItemRepository.count_by_job_and_source, job_id, source)
+    
+    async def count_by_source_and_user(self, user_id: int, source: str) -> int:
+        """Count items by source for a specific user"""
+        return await self._run(ItemRepository.count_by_source_and_user, user_id, source)
+    
+    async def get_recent(self, user_id: int, limit: int = 50, fields: Optional[Sequence[str]] = None) -> List[ImportedItem]:
+        """Get recent items for a specific user, loading only fields if given"""
+        return await self._run(ItemRepository.get_recent, user_id, limit, fields)
+    
+    async def get_for_user(
+        self,
+        user_id: int,
+        item_id: int,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[ImportedItem]:
+        """Get one of a user's items with its payload, or only fields if given"""
+        return await self._run(ItemRepository.get_for_user, user_id, item_id, fields)
+    
+    async def get_recent_summaries(self, user_id: int, limit: int = 50) -> List[Row]:
+        """Recent items as compact rows"""
+        return await self._run(ItemRepository.get_recent_summaries, user_id, limit)
+    
+    async def delete_by_job(self, job_id: int) -> None:
+        """Delete all items for a job, taking them out of their users' rollups"""
+        await self._run(ItemRepository.delete_by_job, job_id)
@@ -1,8 +1,11 @@
+from sqlalchemy import and_, or_, select, tuple_, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
 
 from ..models import ImportJob
+from .base import AsyncRepository
+from .user_stats_repository import UserStatsRepository
 
 
 class JobRepository:
@@ -11,43 +14,223 @@ class JobRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, user_id: int, selected_sources: List[str], credentials: dict) -> ImportJob:
+    def create(self, user_id: int, selected_sources: List[str], credentials: dict, mode: str = "full") -> ImportJob:
         """Create a new import job"""
         job = ImportJob(
             user_id=user_id,
             status="Pending",
             selected_sources=selected_sources,
+            mode=mode,
             credentials=credentials,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
         self.db.add(job)
+        UserStatsRepository(self.db).record_job_status(user_id, None, job.status)
         self.db.commit()
         self.db.refresh(job)
         return job
     
+    def claim_next(self, lease_owner: str, lease_seconds: int, max_attempts: Optional[int] = None) -> Optional[ImportJob]:
+        """Lease the oldest claimable job to a worker, or return None if the queue is empty"""
+        now = datetime.utcnow()
+        candidate = select(ImportJob.id).where(
+            self._claimable(now, max_attempts)
+        ).order_by(
+            ImportJob.created_at, ImportJob.id
+        ).limit(1)
+        
+        # Postgres: skip rows other workers are claiming. SQLite serializes writers, so the
+        # single UPDATE below (which re-checks the predicate) is already atomic.
+        if self.db.get_bind().dialect.name == "postgresql":
+            candidate = candidate.with_for_update(skip_locked=True)
+        
+        expires_at = now + timedelta(seconds=lease_seconds)
+        claimed = self._lease(
+            and_(ImportJob.id == candidate.scalar_subquery(), self._claimable(now, max_attempts)),
+            lease_owner,
+            expires_at
+        )
+        if not claimed:
+            return None
+        
+        # The status filter is implied, but lets the lookup use the queue index
+        return self.db.query(ImportJob).filter(
+            ImportJob.status.in_(["Pending", "Running"]),
+            ImportJob.lease_owner == lease_owner,
+            ImportJob.lease_expires_at == expires_at
+        ).first()
+    
+    def claim(self, job_id: int, lease_owner: str, lease_seconds: int, max_attempts: Optional[int] = None) -> bool:
+        """Lease a specific job if no other worker holds a live lease on it"""
+        now = datetime.utcnow()
+        return self._lease(
+            and_(ImportJob.id == job_id, self._claimable(now, max_attempts)),
+            lease_owner,
+            now + timedelta(seconds=lease_seconds)
+        )
+    
+    def fail_exhausted(self, max_attempts: int, job_id: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Fail claimable jobs already leased max_attempts times; returns their (job id, user id)
+        
+        A job that keeps killing its worker would otherwise be reclaimed forever. job_id
+        limits the sweep to one job.
+        """
+        now = datetime.utcnow()
+        exhausted = and_(self._claimable(now), ImportJob.attempts >= max_attempts)
+        query = select(ImportJob.id, ImportJob.user_id, ImportJob.status).where(exhausted)
+        if job_id is not None:
+            query = query.where(ImportJob.id == job_id)
+        
+        failed = []
+        stats_repo = UserStatsRepository(self.db)
+        for found_id, user_id, old_status in self.db.execute(query).all():
+            # Re-check the predicate so a job another worker just failed or leased is left alone
+            result = self.db.execute(
+                update(ImportJob).where(ImportJob.id == found_id, exhausted).values(
+                    status="Failed",
+                    error_message=f"Gave up after {max_attempts} attempts",
+                    updated_at=now
+                ).execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                stats_repo.record_job_status(user_id, old_status, "Failed")
+                failed.append((found_id, user_id))
+        self.db.commit()
+        return failed
+    
+    def renew_lease(self, job_id: int, lease_owner: str, lease_seconds: int) -> bool:
+        """Extend a held lease; returns False if the lease was lost to another worker"""
+        result = self.db.execute(
+            update(ImportJob).where(
+                ImportJob.id == job_id,
+                ImportJob.lease_owner == lease_owner
+            ).values(
+                lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds),
+                updated_at=ImportJob.updated_at
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+    
+    def release_lease(self, job_id: int, lease_owner: str) -> None:
+        """Drop a held lease once the worker is done with the job"""
+        self.db.execute(
+            update(ImportJob).where(
+                ImportJob.id == job_id,
+                ImportJob.lease_owner == lease_owner
+            ).values(
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=ImportJob.updated_at
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+    
+    def _lease(self, condition, lease_owner: str, expires_at: datetime) -> bool:
+        """Atomically stamp a lease on the row matching condition"""
+        result = self.db.execute(
+            update(ImportJob).where(condition).values(
+                lease_owner=lease_owner,
+                lease_expires_at=expires_at,
+                attempts=ImportJob.attempts + 1,
+                # Lease bookkeeping is not a change clients need to see
+                updated_at=ImportJob.updated_at
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+    
+    @staticmethod
+    def _claimable(now: datetime, max_attempts: Optional[int] = None):
+        """Unfinished jobs with no live lease: new ones, and ones whose worker died"""
+        condition = and_(
+            ImportJob.status.in_(["Pending", "Running"]),
+            or_(ImportJob.lease_expires_at.is_(None), ImportJob.lease_expires_at < now)
+        )
+        if max_attempts is not None:
+            condition = and_(condition, ImportJob.attempts < max_attempts)
+        return condition
+    
     def get_by_id(self, job_id: int) -> Optional[ImportJob]:
         """Get job by ID"""
         return self.db.query(ImportJob).filter(ImportJob.id == job_id).first()
     
-    def list_jobs(self, user_id: int, skip: int = 0, limit: int = 20) -> List[ImportJob]:
-        """List jobs for a user with pagination"""
+    def get_by_ids(self, user_id: int, job_ids: List[int]) -> List[ImportJob]:
+        """Get a user's jobs by ID, ordered by ID"""
         return self.db.query(ImportJob).filter(
-            ImportJob.user_id == user_id
-        ).order_by(
-            ImportJob.created_at.desc()
-        ).offset(skip).limit(limit).all()
+            ImportJob.user_id == user_id,
+            ImportJob.id.in_(job_ids)
+        ).order_by(ImportJob.id).all()
+    
+    def get_versions(
+        self,
+        user_id: int,
+        job_ids: Optional[List[int]] = None,
+        since: Optional[datetime] = None
+    ) -> List[Tuple[int, datetime]]:
+        """Get (id, updated_at) of a user's jobs, by ID and/or changed after since, from the index alone"""
+        query = select(ImportJob.id, ImportJob.updated_at).where(ImportJob.user_id == user_id)
+        if job_ids is not None:
+            query = query.where(ImportJob.id.in_(job_ids))
+        if since is not None:
+            query = query.where(ImportJob.updated_at > since)
+        return [(job_id, updated_at) for job_id, updated_at in self.db.execute(query.order_by(ImportJob.id))]
+    
+    def touch(self, job_id: int, commit: bool = True) -> None:
+        """Bump updated_at so clients see the job as changed (e.g. after a progress write)"""
+        self.db.execute(
+            update(ImportJob).where(ImportJob.id == job_id).values(
+                updated_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+        )
+        if commit:
+            self.db.commit()
+    
+    def list_jobs(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[ImportJob]:
+        """List jobs for a user, newest first
+        
+        after is the (created_at, id) of the last job of the previous page; seeking past it
+        on the (user_id, created_at, id) index costs the same on every page, unlike skip.
+        """
+        query = self.db.query(ImportJob).filter(ImportJob.user_id == user_id)
+        if after is not None:
+            query = query.filter(tuple_(ImportJob.created_at, ImportJob.id) < tuple_(*after))
+        query = query.order_by(ImportJob.created_at.desc(), ImportJob.id.desc())
+        if skip:
+            query = query.offset(skip)
+        return query.limit(limit).all()
     
     def update_status(self, job_id: int, status: str, error_message: str = None) -> None:
         """Update job status"""
         job = self.get_by_id(job_id)
         if job:
+            UserStatsRepository(self.db).record_job_status(job.user_id, job.status, status)
             job.status = status
             if error_message:
                 job.error_message = error_message
             job.updated_at = datetime.utcnow()
             self.db.commit()
     
+    def requeue(self, job_id: int) -> None:
+        """Put a job back in the queue so it resumes from its checkpoints"""
+        job = self.get_by_id(job_id)
+        if job:
+            UserStatsRepository(self.db).record_job_status(job.user_id, job.status, "Pending")
+            job.status = "Pending"
+            job.error_message = None
+            job.attempts = 0
+            job.lease_owner = None
+            job.lease_expires_at = None
+            job.updated_at = datetime.utcnow()
+            self.db.commit()
+    
     def count_by_status(self, user_id: int, status: str) -> int:
         """Count jobs by status for a user"""
         return self.db.query(ImportJob).filter(
@@ -58,3 +241,80 @@ class JobRepository:
     def count_all(self, user_id: int) -> int:
         """Count all jobs for a user"""
         return self.db.query(ImportJob).filter(ImportJob.user_id == user_id).count()
+
+
+class AsyncJobRepository(AsyncRepository):
+    """Async variant of JobRepository"""
+    
+    repository_class = JobRepository
+    
+    async def create(self, user_id: int, selected_sources: List[str], credentials: dict, mode: str = "full") -> ImportJob:
+        """Create a new import job"""
+        return await self._run(JobRepository.create, user_id, selected_sources, credentials, mode)
+    
+    async def claim_next(self, lease_owner: str, lease_seconds: int, max_attempts: Optional[int] = None) -> Optional[ImportJob]:
+        """Lease the oldest claimable job to a worker"""
+        return await self._run(JobRepository.claim_next, lease_owner, lease_seconds, max_attempts)
+    
+    async def claim(self, job_id: int, lease_owner: str, lease_seconds: int, max_attempts: Optional[int] = None) -> bool:
+        """Lease a specific job"""
+        return await self._run(JobRepository.claim, job_id, lease_owner, lease_seconds, max_attempts)
+    
+    async def fail_exhausted(self, max_attempts: int, job_id: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Fail claimable jobs already leased max_attempts times"""
+        return await self._run(JobRepository.fail_exhausted, max_attempts, job_id)
+    
+    async def renew_lease(self, job_id: int, lease_owner: str, lease_seconds: int) -> bool:
+        """Extend a held lease"""
+        return await self._run(JobRepository.renew_lease, job_id, lease_owner, lease_seconds)
+    
+    async def release_lease(self, job_id: int, lease_owner: str) -> None:
+        """Drop a held lease"""
+        await self._run(JobRepository.release_lease, job_id, lease_owner)
+    
+    async def get_by_id(self, job_id: int) -> Optional[ImportJob]:
+        """Get job by ID"""
+        return await self._run(JobRepository.get_by_id, job_id)
+    
+    async def get_by_ids(self, user_id: int, job_ids: List[int]) -> List[ImportJob]:
+        """Get a user's jobs by ID, ordered by ID"""
+        return await self._run(JobRepository.get_by_ids, user_id, job_ids)
+    
+    async def get_versions(
+        self,
+        user_id: int,
+        job_ids: Optional[List[int]] = None,
+        since: Optional[datetime] = None
+    ) -> List[Tuple[int, datetime]]:
+        """Get (id, updated_at) of a user's jobs, by ID and/or changed after since"""
+        return await self._run(JobRepository.get_versions, user_id, job_ids, since)
+    
+    async def touch(self, job_id: int, commit: bool = True) -> None:
+        """Bump updated_at so clients see the job as changed"""
+        await self._run(JobRepository.touch, job_id, commit)
+    
+    async def list_jobs(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[ImportJob]:
+        """List jobs for a user, newest first"""
+        return await self._run(JobRepository.list_jobs, user_id, skip, limit, after)
+    
+    async def update_status(self, job_id: int, status: str, error_message: str = None) -> None:
+        """Update job status"""
+        await self._run(JobRepository.update_status, job_id, status, error_message)
+    
+    async def requeue(self, job_id: int) -> None:
+        """Put a job back in the queue so it resumes from its checkpoints"""
+        await self._run(JobRepository.requeue, job_id)
+    
+    async def count_by_status(self, user_id: int, status: str) -> int:
+        """Count jobs by status for a user"""
+        return await self._run(JobRepository.count_by_status, user_id, status)
+    
+    async def count_all(self, user_id: int) -> int:
+        """Count all jobs for a user"""
+        return await self._run(JobRepository.count_all, user_id)
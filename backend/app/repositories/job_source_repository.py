@@ -0,0 +1,192 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from ..models import ImportJob, ImportJobSource
+from .base import AsyncRepository
+
+
+class JobSourceRepository:
+    """Repository for per-source job state and checkpoints"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def ensure_sources(self, job_id: int, sources: List[str]) -> Dict[str, ImportJobSource]:
+        """Create missing state rows for a job's sources and return all of them by source"""
+        existing = self.get_by_job(job_id)
+        for source in sources:
+            if source not in existing:
+                state = ImportJobSource(
+                    job_id=job_id,
+                    source=source,
+                    status="Pending",
+                    checkpoint_offset=0,
+                    inserted_count=0,
+                    updated_count=0,
+                    unchanged_count=0,
+                    updated_at=datetime.utcnow()
+                )
+                self.db.add(state)
+                existing[source] = state
+        self.db.commit()
+        return existing
+    
+    def get_by_job(self, job_id: int) -> Dict[str, ImportJobSource]:
+        """Get state rows for a job keyed by source"""
+        rows = self.db.query(ImportJobSource).filter(ImportJobSource.job_id == job_id).all()
+        return {row.source: row for row in rows}
+    
+    def get_by_jobs(self, job_ids: List[int]) -> Dict[int, Dict[str, ImportJobSource]]:
+        """Get state rows for several jobs in one query, keyed by job and then source"""
+        states: Dict[int, Dict[str, ImportJobSource]] = {job_id: {} for job_id in job_ids}
+        if not job_ids:
+            return states
+        
+        rows = self.db.query(ImportJobSource).filter(ImportJobSource.job_id.in_(job_ids)).all()
+        for row in rows:
+            states[row.job_id][row.source] = row
+        return states
+    
+    def get(self, job_id: int, source: str) -> Optional[ImportJobSource]:
+        """Get the state row for one source of a job"""
+        return self.db.get(ImportJobSource, (job_id, source))
+    
+    def get_baseline(self, user_id: int, source: str, before_job_id: int) -> Optional[ImportJobSource]:
+        """Get the source state of the user's latest completed job before before_job_id"""
+        return self.db.query(ImportJobSource).join(ImportJob).filter(
+            ImportJob.user_id == user_id,
+            ImportJob.status == "Completed",
+            ImportJob.id < before_job_id,
+            ImportJobSource.source == source
+        ).order_by(
+            ImportJob.id.desc()
+        ).first()
+    
+    def update_progress(
+        self,
+        job_id: int,
+        source: str,
+        status: Optional[str] = None,
+        total: Optional[int] = None,
+        commit: bool = True
+    ) -> None:
+        """Set a source's status and/or upstream total"""
+        values = {"updated_at": datetime.utcnow()}
+        if status is not None:
+            values["status"] = status
+        if total is not None:
+            values["total"] = total
+        self.db.execute(
+            update(ImportJobSource).where(
+                ImportJobSource.job_id == job_id,
+                ImportJobSource.source == source
+            ).values(**values).execution_options(synchronize_session=False)
+        )
+        if commit:
+            self.db.commit()
+    
+    def fail_unfinished(self, job_id: int) -> None:
+        """Mark every source of a job that has not completed as Failed"""
+        self.db.execute(
+            update(ImportJobSource).where(
+                ImportJobSource.job_id == job_id,
+                ImportJobSource.status != "Completed"
+            ).values(
+                status="Failed",
+                updated_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+    
+    def save_checkpoint(
+        self,
+        job_id: int,
+        source: str,
+        offset: int,
+        remote_id: Optional[int],
+        inserted: int = 0,
+        updated: int = 0,
+        unchanged: int = 0,
+        max_remote_id: Optional[int] = None,
+        commit: bool = True
+    ) -> None:
+        """Record how far a source has been durably imported and add the chunk's write counts"""
+        values = {
+            "checkpoint_offset": offset,
+            "checkpoint_remote_id": remote_id,
+            "inserted_count": ImportJobSource.inserted_count + inserted,
+            "updated_count": ImportJobSource.updated_count + updated,
+            "unchanged_count": ImportJobSource.unchanged_count + unchanged,
+            "updated_at": datetime.utcnow()
+        }
+        if max_remote_id is not None:
+            values["max_remote_id"] = max_remote_id
+        self.db.execute(
+            update(ImportJobSource).where(
+                ImportJobSource.job_id == job_id,
+                ImportJobSource.source == source
+            ).values(**values).execution_options(synchronize_session=False)
+        )
+        if commit:
+            self.db.commit()
+
+
+class AsyncJobSourceRepository(AsyncRepository):
+    """Async variant of JobSourceRepository"""
+    
+    repository_class = JobSourceRepository
+    
+    async def ensure_sources(self, job_id: int, sources: List[str]) -> Dict[str, ImportJobSource]:
+        """Create missing state rows for a job's sources and return all of them by source"""
+        return await self._run(JobSourceRepository.ensure_sources, job_id, sources)
+    
+    async def get_by_job(self, job_id: int) -> Dict[str, ImportJobSource]:
+        """Get state rows for a job keyed by source"""
+        return await self._run(JobSourceRepository.get_by_job, job_id)
+    
+    async def get_by_jobs(self, job_ids: List[int]) -> Dict[int, Dict[str, ImportJobSource]]:
+        """Get state rows for several jobs in one query, keyed by job and then source"""
+        return await self._run(JobSourceRepository.get_by_jobs, job_ids)
+    
+    async def get(self, job_id: int, source: str) -> Optional[ImportJobSource]:
+        """Get the state row for one source of a job"""
+        return await self._run(JobSourceRepository.get, job_id, source)
+    
+    async def get_baseline(self, user_id: int, source: str, before_job_id: int) -> Optional[ImportJobSource]:
+        """Get the source state of the user's latest completed job before before_job_id"""
+        return await self._run(JobSourceRepository.get_baseline, user_id, source, before_job_id)
+    
+    async def update_progress(
+        self,
+        job_id: int,
+        source: str,
+        status: Optional[str] = None,
+        total: Optional[int] = None,
+        commit: bool = True
+    ) -> None:
+        """Set a source's status and/or upstream total"""
+        await self._run(JobSourceRepository.update_progress, job_id, source, status, total, commit)
+    
+    async def fail_unfinished(self, job_id: int) -> None:
+        """Mark every source of a job that has not completed as Failed"""
+        await self._run(JobSourceRepository.fail_unfinished, job_id)
+    
+    async def save_checkpoint(
+        self,
+        job_id: int,
+        source: str,
+        offset: int,
+        remote_id: Optional[int],
+        inserted: int = 0,
+        updated: int = 0,
+        unchanged: int = 0,
+        max_remote_id: Optional[int] = None,
+        commit: bool = True
+    ) -> None:
+        """Record how far a source has been durably imported and add the chunk's write counts"""
+        await self._run(
+            JobSourceRepository.save_checkpoint,
+            job_id, source, offset, remote_id, inserted, updated, unchanged, max_remote_id, commit
+        )
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 
 from ..models import User
+from .base import AsyncRepository
 
 
 class UserRepository:
@@ -34,6 +35,23 @@ class UserRepository:
         """Get user by email"""
         return self.db.query(User).filter(User.email == email).first()
     
+    def set_active(self, user_id: int, is_active: bool) -> Optional[User]:
+        """Activate or deactivate a user"""
+        user = self.get_by_id(user_id)
+        if user is None:
+            return None
+        user.is_active = is_active
+        self.db.commit()
+        self.db.refresh(user)
+        return user
+    
+    def update_password(self, user_id: int, hashed_password: str) -> None:
+        """Replace a user's password hash"""
+        self.db.query(User).filter(User.id == user_id).update(
+            {User.hashed_password: hashed_password}, synchronize_session=False
+        )
+        self.db.commit()
+    
     def exists_by_username(self, username: str) -> bool:
         """Check if username exists"""
         return self.db.query(User).filter(User.username == username).count() > 0
@@ -41,3 +59,41 @@ class UserRepository:
     def exists_by_email(self, email: str) -> bool:
         """Check if email exists"""
         return self.db.query(User).filter(User.email == email).count() > 0
+
+
+class AsyncUserRepository(AsyncRepository):
+    """Async variant of UserRepository"""
+    
+    repository_class = UserRepository
+    
+    async def create(self, email: str, username: str, hashed_password: str) -> User:
+        """Create a new user"""
+        return await self._run(UserRepository.create, email, username, hashed_password)
+    
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        return await self._run(UserRepository.get_by_id, user_id)
+    
+    async def get_by_username(self, username: str) -> Optional[User]:
+        """Get user by username"""
+        return await self._run(UserRepository.get_by_username, username)
+    
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Get user by email"""
+        return await self._run(UserRepository.get_by_email, email)
+    
+    async def set_active(self, user_id: int, is_active: bool) -> Optional[User]:
+        """Activate or deactivate a user"""
+        return await self._run(UserRepository.set_active, user_id, is_active)
+    
+    async def update_password(self, user_id: int, hashed_password: str) -> None:
+        """Replace a user's password hash"""
+        await self._run(UserRepository.update_password, user_id, hashed_password)
+    
+    async def exists_by_username(self, username: str) -> bool:
+        """Check if username exists"""
+        return await self._run(UserRepository.exists_by_username, username)
+    
+    async def exists_by_email(self, email: str) -> bool:
+        """Check if email exists"""
+        return await self._run(UserRepository.exists_by_email, email)
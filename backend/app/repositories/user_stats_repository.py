@@ -0,0 +1,153 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional, Tuple
+from datetime import datetime
+
+from ..models import ImportedItem, UserStats
+from .base import AsyncRepository, UPSERT_INSERTS
+from .dashboard_repository import DashboardRepository
+
+# Rollup column for each job status and item source
+STATUS_COLUMNS = {
+    "Pending": "jobs_pending",
+    "Running": "jobs_running",
+    "Completed": "jobs_completed",
+    "Failed": "jobs_failed"
+}
+SOURCE_COLUMNS = {
+    "products": "items_products",
+    "carts": "items_carts"
+}
+
+
+class UserStatsRepository:
+    """Repository for the user_stats rollup
+    
+    The record_* methods add deltas inside the caller's transaction, so the rollup commits
+    (or rolls back) together with the job or item writes it summarizes.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get(self, user_id: int) -> Optional[UserStats]:
+        """Get a user's rollup row"""
+        return self.db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    
+    def record_job_status(self, user_id: int, old_status: Optional[str], new_status: str) -> None:
+        """Move a job between status counters; old_status is None for a new job"""
+        if old_status == new_status:
+            return
+        deltas: Dict[str, int] = {}
+        if old_status is None:
+            deltas["jobs_total"] = 1
+        elif old_status in STATUS_COLUMNS:
+            deltas[STATUS_COLUMNS[old_status]] = -1
+        if new_status in STATUS_COLUMNS:
+            deltas[STATUS_COLUMNS[new_status]] = 1
+        self._add(user_id, deltas)
+    
+    def record_items(
+        self,
+        user_id: int,
+        source: str,
+        inserted: int,
+        bytes_delta: int,
+        imported_at: Optional[datetime] = None
+    ) -> None:
+        """Count newly stored (or, negative, removed) items and the change in stored payload bytes"""
+        deltas = {"bytes_imported": bytes_delta}
+        if source in SOURCE_COLUMNS:
+            deltas[SOURCE_COLUMNS[source]] = inserted
+        self._add(user_id, deltas, last_import_at=imported_at)
+    
+    def _add(self, user_id: int, deltas: Dict[str, int], last_import_at: Optional[datetime] = None) -> None:
+        """Add deltas to the user's row in one statement, creating the row on first use"""
+        insert = UPSERT_INSERTS[self.db.get_bind().dialect.name]
+        statement = insert(UserStats).values(
+            user_id=user_id,
+            last_import_at=last_import_at,
+            updated_at=datetime.utcnow(),
+            **deltas
+        )
+        set_ = {column: getattr(UserStats, column) + getattr(statement.excluded, column) for column in deltas}
+        set_["updated_at"] = statement.excluded.updated_at
+        if last_import_at is not None:
+            set_["last_import_at"] = statement.excluded.last_import_at
+        self.db.execute(statement.on_conflict_do_update(index_elements=["user_id"], set_=set_))
+    
+    def compute(self, user_id: int) -> Dict[str, Any]:
+        """Rollup values aggregated from the jobs and items tables"""
+        counts = DashboardRepository(self.db).get_counts(user_id)
+        bytes_imported, last_import_at = self.db.execute(
+            select(
+                func.coalesce(func.sum(ImportedItem.payload_bytes), 0),
+                func.max(ImportedItem.updated_at)
+            ).where(ImportedItem.user_id == user_id)
+        ).one()
+        
+        values: Dict[str, Any] = {"jobs_total": sum(counts["jobs"].values())}
+        for status, column in STATUS_COLUMNS.items():
+            values[column] = counts["jobs"].get(status, 0)
+        for source, column in SOURCE_COLUMNS.items():
+            values[column] = counts["items"].get(source, 0)
+        values["bytes_imported"] = bytes_imported
+        values["last_import_at"] = last_import_at
+        return values
+    
+    def verify(self, user_id: int) -> Dict[str, Tuple[Any, Any]]:
+        """Columns whose stored value drifted from the source tables, as (stored, actual)"""
+        row = self.get(user_id)
+        drift = {}
+        for column, actual in self.compute(user_id).items():
+            stored = getattr(row, column) if row is not None else (None if column == "last_import_at" else 0)
+            if stored != actual:
+                drift[column] = (stored, actual)
+        return drift
+    
+    def rebuild(self, user_id: int, commit: bool = True) -> None:
+        """Overwrite the user's row with values aggregated from the source tables
+        
+        The row is locked before aggregating, so a delta committing meanwhile waits for the
+        rebuild and is applied on top of it instead of being overwritten by it.
+        """
+        self._lock(user_id)
+        self.db.execute(
+            update(UserStats).where(UserStats.user_id == user_id).values(
+                updated_at=datetime.utcnow(),
+                **self.compute(user_id)
+            ).execution_options(synchronize_session=False)
+        )
+        if commit:
+            self.db.commit()
+    
+    def _lock(self, user_id: int) -> None:
+        """Create the user's row if missing and hold its row lock until the transaction ends"""
+        dialect = self.db.get_bind().dialect.name
+        # On SQLite this write also takes the database write lock, which serializes the rest
+        self.db.execute(
+            UPSERT_INSERTS[dialect](UserStats).values(
+                user_id=user_id,
+                updated_at=datetime.utcnow()
+            ).on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        if dialect == "postgresql":
+            self.db.execute(select(UserStats.user_id).where(UserStats.user_id == user_id).with_for_update())
+
+
+class AsyncUserStatsRepository(AsyncRepository):
+    """Async variant of UserStatsRepository"""
+    
+    repository_class = UserStatsRepository
+    
+    async def get(self, user_id: int) -> Optional[UserStats]:
+        """Get a user's rollup row"""
+        return await self._run(UserStatsRepository.get, user_id)
+    
+    async def verify(self, user_id: int) -> Dict[str, Tuple[Any, Any]]:
+        """Columns whose stored value drifted from the source tables"""
+        return await self._run(UserStatsRepository.verify, user_id)
+    
+    async def rebuild(self, user_id: int, commit: bool = True) -> None:
+        """Overwrite the user's row with values aggregated from the source tables"""
+        await self._run(UserStatsRepository.rebuild, user_id, commit)
@@ -43,6 +43,17 @@ class TokenData(BaseModel):
     """Data stored in JWT token"""
     user_id: int
     username: str
+    expires_at: Optional[datetime] = None
+    scope: Optional[str] = None
+
+
+class StreamTokenResponse(BaseModel):
+    """Short-lived token for opening the job event stream"""
+    token: str
+    expires_in: int = Field(..., alias="expiresIn")
+    
+    class Config:
+        populate_by_name = True
 
 
 # ===== Import Job Schemas =====
@@ -51,6 +62,13 @@ class CreateImportJobRequest(BaseModel):
     """Request to create an import job"""
     selected_sources: List[str] = Field(..., description="List of data sources to import", alias="selectedSources")
     credentials: Dict[str, Dict[str, str]] = Field(..., description="Credentials per source")
+    mode: str = Field(
+        "full",
+        description=(
+            "full re-reads every source; incremental stops at data the last completed job already saw, "
+            "for uncapped sources listed in IMPORT_APPEND_ONLY_SOURCES only"
+        )
+    )
     
     class Config:
         populate_by_name = True
@@ -71,6 +89,9 @@ class SourceProgress(BaseModel):
     completed: int
     total: int
     status: str
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
 
 
 class GetImportJobResponse(BaseModel):
@@ -78,6 +99,7 @@ class GetImportJobResponse(BaseModel):
     job_id: int = Field(..., alias="jobId")
     status: str
     selected_sources: List[str] = Field(..., alias="selectedSources")
+    mode: str = "full"
     progress: Dict[str, SourceProgress]
     error: Optional[str]
     created_at: datetime = Field(..., alias="createdAt")
@@ -121,6 +143,35 @@ class ImportedItemResponse(BaseModel):
         from_attributes = True
 
 
+class ImportedItemFields(BaseModel):
+    """An imported item projected to the requested fields"""
+    id: Optional[int] = None
+    source: Optional[str] = None
+    remote_id: Optional[int] = Field(None, alias="remoteId")
+    status: Optional[str] = None
+    created_at: Optional[datetime] = Field(None, alias="createdAt")
+    payload: Optional[Dict[str, Any]] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class ImportedItemSummary(BaseModel):
+    """Compact imported item for listings; fetch the payload from /items/{id}"""
+    id: int
+    source: str
+    remote_id: int = Field(..., alias="remoteId")
+    status: str
+    created_at: datetime = Field(..., alias="createdAt")
+    title: Optional[str] = None  # Products
+    total: Optional[float] = None  # Carts
+    item_count: Optional[int] = Field(None, alias="itemCount")  # Carts
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+
 class DashboardStats(BaseModel):
     """Dashboard statistics"""
     total_jobs: int = Field(..., alias="totalJobs")
@@ -128,7 +179,9 @@ class DashboardStats(BaseModel):
     failed_jobs: int = Field(..., alias="failedJobs")
     total_products: int = Field(..., alias="totalProducts")
     total_carts: int = Field(..., alias="totalCarts")
-    recent_items: List[ImportedItemResponse] = Field(..., alias="recentItems")
+    bytes_imported: int = Field(0, alias="bytesImported")
+    last_import_at: Optional[datetime] = Field(None, alias="lastImportAt")
+    recent_items: List[ImportedItemSummary] = Field(..., alias="recentItems")
 
     class Config:
         populate_by_name = True
@@ -1,5 +1,8 @@
 from .job_service import JobService
 from .import_service import ImportService
 from .external_api_service import ExternalApiService
+from .dashboard_service import DashboardService
+from .item_service import ItemService
+from .user_service import UserService
 
-__all__ = ['JobService', 'ImportService', 'ExternalApiService']
+__all__ = ['JobService', 'ImportService', 'ExternalApiService', 'DashboardService', 'ItemService', 'UserService']
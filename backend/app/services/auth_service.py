@@ -1,10 +1,22 @@
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 import bcrypt
+import time
 
 from ..config import settings
+from ..models import User
 from ..schemas import TokenData
+from .event_broker import EventBroker, get_event_broker
+
+V = TypeVar("V")
+
+# User columns kept in the cache; everything an authenticated endpoint reads, minus the password hash
+USER_SNAPSHOT_COLUMNS = ("id", "email", "username", "is_active", "created_at")
+
+# Scope of tokens that only open the job event stream
+STREAM_TOKEN_SCOPE = "events"
 
 
 class AuthService:
@@ -23,10 +35,19 @@ class AuthService:
         """Hash a password"""
         # Encode and truncate to 72 bytes for bcrypt
         password_bytes = password.encode('utf-8')[:72]
-        salt = bcrypt.gensalt(rounds=12)
+        salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
         hashed = bcrypt.hashpw(password_bytes, salt)
         return hashed.decode('utf-8')
     
+    @classmethod
+    def needs_rehash(cls, hashed_password: str) -> bool:
+        """Whether a hash was made at a different cost than the configured one"""
+        # bcrypt hashes look like $2b$12$<salt+digest>
+        try:
+            return int(hashed_password.split("$")[2]) != settings.bcrypt_rounds
+        except (IndexError, ValueError):
+            return True
+    
     @classmethod
     def create_access_token(cls, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token"""
@@ -41,6 +62,14 @@ class AuthService:
         encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
         return encoded_jwt
     
+    @classmethod
+    def create_stream_token(cls, user: User) -> str:
+        """Create a short-lived token that is only accepted by the job event stream"""
+        return cls.create_access_token(
+            data={"user_id": user.id, "username": user.username, "scope": STREAM_TOKEN_SCOPE},
+            expires_delta=timedelta(seconds=settings.stream_token_expire_seconds)
+        )
+    
     @classmethod
     def decode_access_token(cls, token: str) -> Optional[TokenData]:
         """Decode and validate JWT token"""
@@ -52,6 +81,159 @@ class AuthService:
             if user_id is None or username is None:
                 return None
             
-            return TokenData(user_id=user_id, username=username)
+            exp = payload.get("exp")
+            expires_at = datetime.utcfromtimestamp(exp) if exp is not None else None
+            return TokenData(user_id=user_id, username=username, expires_at=expires_at, scope=payload.get("scope"))
         except JWTError:
             return None
+
+
+class TtlCache(Generic[V]):
+    """Bounded LRU of values that each expire at their own deadline"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.counters: Counter = Counter()
+    
+    def get(self, key: Hashable) -> Optional[V]:
+        """The value for key, if present and not expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.counters["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return entry[1]
+    
+    def put(self, key: Hashable, value: V, ttl_seconds: float) -> None:
+        """Store value for ttl_seconds, evicting the least recently used entries past max_entries"""
+        if ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+    
+    def pop(self, key: Hashable) -> bool:
+        """Drop key; True if it was cached"""
+        return self._entries.pop(key, None) is not None
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit counters"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.counters["hits"],
+            "misses": self.counters["misses"],
+            "evictions": self.counters["evictions"]
+        }
+
+
+class AuthCache:
+    """Validated token claims and active-user snapshots, so repeat requests skip JWT decoding and the user query
+    
+    Users are dropped on "user" events, so a change made by any process reaches every API process.
+    """
+    
+    def __init__(self, token_ttl_seconds: float, user_ttl_seconds: float, max_entries: int):
+        self.token_ttl_seconds = token_ttl_seconds
+        self.user_ttl_seconds = user_ttl_seconds
+        self.tokens: TtlCache[TokenData] = TtlCache(max_entries)
+        self.users: TtlCache[Dict[str, Any]] = TtlCache(max_entries)
+        # Bumped on every invalidation so a user loaded before a deactivation is not stored
+        self._generations: Counter = Counter()
+        self.invalidations = 0
+        self._broker: Optional[EventBroker] = None
+    
+    def get_token(self, token: str) -> Optional[TokenData]:
+        """Claims of a token that was already validated"""
+        return self.tokens.get(token)
+    
+    def put_token(self, token: str, token_data: TokenData) -> None:
+        """Remember a validated token until the TTL or its own expiry, whichever is first"""
+        ttl = self.token_ttl_seconds
+        if token_data.expires_at is not None:
+            ttl = min(ttl, (token_data.expires_at - datetime.utcnow()).total_seconds())
+        self.tokens.put(token, token_data, ttl)
+    
+    def get_user(self, user_id: int) -> Optional[User]:
+        """A detached copy of the cached active user"""
+        self._watch_events()
+        snapshot = self.users.get(user_id)
+        return User(**snapshot) if snapshot is not None else None
+    
+    def generation(self, user_id: int) -> int:
+        """Invalidation count for the user; pass it back to put_user"""
+        return self._generations[user_id]
+    
+    def put_user(self, user: User, generation: int) -> None:
+        """Cache an active user loaded while its generation was generation"""
+        self._watch_events()
+        if not user.is_active or self._generations[user.id] != generation:
+            return
+        snapshot = {column: getattr(user, column) for column in USER_SNAPSHOT_COLUMNS}
+        self.users.put(user.id, snapshot, self.user_ttl_seconds)
+    
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget the user so its next request re-reads it (deactivation, profile changes)"""
+        self._generations[user_id] += 1
+        if self.users.pop(user_id):
+            self.invalidations += 1
+    
+    def _watch_events(self) -> None:
+        """Follow the current broker; users cached before a broker change cannot be trusted"""
+        broker = get_event_broker()
+        if broker is not self._broker:
+            broker.watch(self._on_event)
+            if self._broker is not None:
+                self.users.clear()
+            self._broker = broker
+    
+    def _on_event(self, user_id: int, event: Dict[str, Any]) -> None:
+        """Drop the user when any process reports a change to the account"""
+        if event.get("type") == "user":
+            self.invalidate_user(user_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache sizes and hit rates for metrics"""
+        return {
+            "tokens": self.tokens.stats(),
+            "users": self.users.stats(),
+            "invalidations": self.invalidations
+        }
+
+
+# Process-wide cache shared by every authenticated request
+_auth_cache: Optional[AuthCache] = None
+
+
+def get_auth_cache() -> AuthCache:
+    """Get the shared cache, creating it on first use"""
+    global _auth_cache
+    if _auth_cache is None:
+        _auth_cache = AuthCache(
+            settings.auth_token_cache_ttl_seconds,
+            settings.auth_user_cache_ttl_seconds,
+            settings.auth_cache_max_entries
+        )
+    return _auth_cache
+
+
+def reset_auth_cache() -> None:
+    """Forget the shared cache (settings changes, tests)"""
+    global _auth_cache
+    _auth_cache = None
+
+
+def auth_cache_stats() -> Dict[str, Any]:
+    """Stats of the shared cache"""
+    return get_auth_cache().stats()
@@ -0,0 +1,51 @@
+import json
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+class BatchWriter:
+    """Buffers fetched records and flushes them in chunks bounded by row count and byte size"""
+    
+    def __init__(
+        self,
+        flush: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        max_rows: int,
+        max_bytes: int
+    ):
+        if max_rows < 1:
+            raise ValueError("max_rows must be at least 1")
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        
+        self._flush = flush
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_bytes = 0
+        self.rows_written = 0
+        self.batches_written = 0
+    
+    async def add(self, record: Dict[str, Any]) -> None:
+        """Buffer a record, flushing first if it would push the chunk over the byte budget"""
+        size = len(json.dumps(record, default=str))
+        
+        if self._pending and self._pending_bytes + size > self.max_bytes:
+            await self.flush()
+        
+        self._pending.append(record)
+        self._pending_bytes += size
+        
+        if len(self._pending) >= self.max_rows or self._pending_bytes >= self.max_bytes:
+            await self.flush()
+    
+    async def flush(self) -> None:
+        """Write out whatever is buffered as a single chunk"""
+        if not self._pending:
+            return
+        
+        batch = self._pending
+        self._pending = []
+        self._pending_bytes = 0
+        
+        await self._flush(batch)
+        self.rows_written += len(batch)
+        self.batches_written += 1
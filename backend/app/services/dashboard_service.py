@@ -0,0 +1,135 @@
+import time
+from collections import Counter, OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+from ..schemas import DashboardStats, ImportedItemSummary
+from ..repositories.item_repository import AsyncItemRepository
+from ..repositories.user_stats_repository import AsyncUserStatsRepository
+from .event_broker import EventBroker, get_event_broker
+
+
+class DashboardCache:
+    """Per-user DashboardStats, invalidated by the user's job events and expired after a TTL"""
+    
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._entries: "OrderedDict[int, Tuple[float, DashboardStats]]" = OrderedDict()
+        # Bumped on every invalidation so a computation that raced an event is not stored
+        self._generations: Counter = Counter()
+        self._broker: Optional[EventBroker] = None
+        self.counters: Counter = Counter()
+    
+    def get(self, user_id: int) -> Optional[DashboardStats]:
+        """Cached stats for the user, if still valid"""
+        self._watch_events()
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(user_id, None)
+            self.counters["misses"] += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.counters["hits"] += 1
+        return entry[1]
+    
+    def generation(self, user_id: int) -> int:
+        """Invalidation count for the user; pass it back to put"""
+        return self._generations[user_id]
+    
+    def put(self, user_id: int, stats: DashboardStats, generation: int) -> None:
+        """Store stats computed while the user's generation was generation"""
+        self._watch_events()
+        if self.ttl_seconds <= 0 or self._generations[user_id] != generation:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, stats)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: int) -> None:
+        """Drop the user's stats"""
+        self._generations[user_id] += 1
+        if self._entries.pop(user_id, None) is not None:
+            self.counters["invalidations"] += 1
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        for user_id in list(self._entries):
+            self.invalidate(user_id)
+    
+    def _watch_events(self) -> None:
+        """Follow the current broker; entries from before a broker change cannot be trusted"""
+        broker = get_event_broker()
+        if broker is not self._broker:
+            broker.watch(lambda user_id, event: self.invalidate(user_id))
+            if self._broker is not None:
+                self.clear()
+            self._broker = broker
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit rates for metrics"""
+        return {
+            "users": len(self._entries),
+            "hits": self.counters["hits"],
+            "misses": self.counters["misses"],
+            "invalidations": self.counters["invalidations"]
+        }
+
+
+# Process-wide cache shared by every dashboard request
+_cache: Optional[DashboardCache] = None
+
+
+def get_dashboard_cache() -> DashboardCache:
+    """Get the shared cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        _cache = DashboardCache(settings.dashboard_cache_ttl_seconds, settings.dashboard_cache_max_users)
+    return _cache
+
+
+def reset_dashboard_cache() -> None:
+    """Forget the shared cache (settings changes, tests)"""
+    global _cache
+    _cache = None
+
+
+def dashboard_cache_stats() -> Dict[str, Any]:
+    """Stats of the shared cache"""
+    return get_dashboard_cache().stats()
+
+
+class DashboardService:
+    """Service for the dashboard summary"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.stats_repo = AsyncUserStatsRepository(db)
+        self.item_repo = AsyncItemRepository(db)
+    
+    async def get_stats(self, user_id: int) -> DashboardStats:
+        """Dashboard statistics for a user, served from the cache between job changes"""
+        cache = get_dashboard_cache()
+        stats = cache.get(user_id)
+        if stats is not None:
+            return stats
+        
+        generation = cache.generation(user_id)
+        # The rollup row costs the same however much history the user has
+        rollup = await self.stats_repo.get(user_id)
+        recent_items = await self.item_repo.get_recent_summaries(user_id, limit=50)
+        
+        stats = DashboardStats(
+            totalJobs=rollup.jobs_total if rollup else 0,
+            completedJobs=rollup.jobs_completed if rollup else 0,
+            failedJobs=rollup.jobs_failed if rollup else 0,
+            totalProducts=rollup.items_products if rollup else 0,
+            totalCarts=rollup.items_carts if rollup else 0,
+            bytesImported=rollup.bytes_imported if rollup else 0,
+            lastImportAt=rollup.last_import_at if rollup else None,
+            recentItems=[ImportedItemSummary.model_validate(item) for item in recent_items]
+        )
+        cache.put(user_id, stats, generation)
+        return stats
@@ -0,0 +1,183 @@
+import asyncio
+import importlib.util
+import json
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "import_jobs:user:"
+
+
+class RedisEventBackend:
+    """Relays events between processes (API instances and workers) over Redis pub/sub"""
+    
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+    
+    async def publish(self, user_id: int, message: str) -> None:
+        """Send an event to every process subscribed to the user"""
+        await self.redis.publish(f"{CHANNEL_PREFIX}{user_id}", message)
+    
+    async def listen(self, deliver: Callable[[int, str], None]) -> None:
+        """Hand every event published by any process to deliver until cancelled"""
+        pubsub = self.redis.pubsub()
+        await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                deliver(int(channel[len(CHANNEL_PREFIX):]), message["data"])
+        finally:
+            await pubsub.aclose()
+    
+    async def close(self) -> None:
+        """Close the Redis connection pool"""
+        await self.redis.aclose()
+
+
+class EventBroker:
+    """Per-user pub/sub for job events; in-process unless given a cross-process backend"""
+    
+    def __init__(self, backend: Optional[Any] = None, queue_size: int = 100):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._watchers: List[Callable[[int, Dict[str, Any]], None]] = []
+        self._listener: Optional[asyncio.Task] = None
+        self.counters: Counter = Counter()
+    
+    async def publish(self, user_id: int, event: Dict[str, Any]) -> None:
+        """Publish an event to the user's subscribers; best effort, never raises"""
+        self.counters["published"] += 1
+        if self.backend is None:
+            self._deliver(user_id, event)
+            return
+        try:
+            await self.backend.publish(user_id, json.dumps(event, default=str))
+        except Exception:
+            self.counters["publishErrors"] += 1
+            logger.warning("Could not publish event for user %s", user_id, exc_info=True)
+    
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Receive the user's events on a bounded queue for the duration of the block"""
+        if self.backend is not None:
+            self._ensure_listener()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+    
+    def watch(self, callback: Callable[[int, Dict[str, Any]], None]) -> None:
+        """Call callback(user_id, event) for every event of every user seen by this process"""
+        self._watchers.append(callback)
+        if self.backend is not None:
+            self._ensure_listener()
+    
+    def _deliver(self, user_id: int, event: Dict[str, Any]) -> None:
+        """Hand an event to every local subscriber, dropping their oldest event if they fall behind"""
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.counters["dropped"] += 1
+            queue.put_nowait(event)
+            self.counters["delivered"] += 1
+        for callback in self._watchers:
+            try:
+                callback(user_id, event)
+            except Exception:
+                logger.warning("Event watcher failed for user %s", user_id, exc_info=True)
+    
+    def _deliver_message(self, user_id: int, message: str) -> None:
+        """Deliver an event relayed by the backend"""
+        if user_id in self._subscribers or self._watchers:
+            self._deliver(user_id, json.loads(message))
+    
+    def _ensure_listener(self) -> None:
+        """Start relaying backend events into this process (once, on first subscriber)"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.ensure_future(self._listen())
+    
+    async def _listen(self) -> None:
+        """Keep the backend listener running, reconnecting after errors"""
+        while True:
+            try:
+                await self.backend.listen(self._deliver_message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.counters["listenerErrors"] += 1
+                logger.warning("Event listener failed; reconnecting", exc_info=True)
+                await asyncio.sleep(1)
+    
+    async def close(self) -> None:
+        """Stop the backend listener and release the backend"""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self.backend is not None:
+            await self.backend.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Subscriber and delivery counts for metrics"""
+        return {
+            "backend": "redis" if self.backend is not None else "memory",
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.counters["published"],
+            "delivered": self.counters["delivered"],
+            "dropped": self.counters["dropped"],
+            "publishErrors": self.counters["publishErrors"]
+        }
+
+
+# Process-wide broker shared by the import pipeline and the event stream endpoint
+_broker: Optional[EventBroker] = None
+
+
+def create_event_broker() -> EventBroker:
+    """Build a broker from settings"""
+    backend = None
+    if settings.event_backend == "redis":
+        if not settings.redis_url:
+            logger.warning("EVENT_BACKEND=redis but REDIS_URL is not set; using in-process events")
+        elif importlib.util.find_spec("redis") is None:
+            logger.warning("Redis events requested but the redis package is not installed; using in-process events")
+        else:
+            backend = RedisEventBackend(settings.redis_url)
+    return EventBroker(backend, queue_size=settings.event_subscriber_queue_size)
+
+
+def get_event_broker() -> EventBroker:
+    """Get the shared broker, creating it on first use"""
+    global _broker
+    if _broker is None:
+        _broker = create_event_broker()
+    return _broker
+
+
+async def close_event_broker() -> None:
+    """Close the shared broker (called from the app lifespan and worker shutdown)"""
+    global _broker
+    if _broker is not None:
+        await _broker.close()
+        _broker = None
+
+
+def event_broker_stats() -> Dict[str, Any]:
+    """Stats of the shared broker"""
+    return get_event_broker().stats()
@@ -1,33 +1,95 @@
 import httpx
-from typing import List, Dict, Any
+from dataclasses import dataclass
+from typing import List, Dict, Any, AsyncIterator, Optional
 
 from ..config import settings
+from ..http_client import get_http_client
+from .resilience import request_with_retry
+
+
+@dataclass
+class Page:
+    """One page of records returned by the upstream API"""
+    items: List[Dict[str, Any]]
+    skip: int
+    total: int
 
 
 class ExternalApiService:
     """Service for fetching data from external APIs"""
     
-    def __init__(self):
+    # Sources the upstream can list newest first (sortBy=id&order=desc)
+    NEWEST_FIRST_SOURCES = frozenset({"products"})
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.base_url = settings.dummyjson_base_url
+        # Defaults to the process-wide pooled client so connections are reused across jobs
+        self.client = client or get_http_client()
+    
+    def supports_newest_first(self, source: str) -> bool:
+        """Whether iter_pages can list a source newest first, so an incremental import can stop early"""
+        return source in self.NEWEST_FIRST_SOURCES
     
     async def fetch_products(self, limit: int = 30) -> List[Dict[str, Any]]:
         """Fetch products from dummyjson API"""
         url = f"{self.base_url}/products"
         params = {"limit": limit}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("products", [])
+        response = await request_with_retry(self.client, "GET", url, params=params)
+        data = response.json()
+        return data.get("products", [])
     
     async def fetch_carts(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Fetch carts from dummyjson API"""
         url = f"{self.base_url}/carts"
         params = {"limit": limit}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
+        response = await request_with_retry(self.client, "GET", url, params=params)
+        data = response.json()
+        return data.get("carts", [])
+    
+    def iter_products(self, page_size: Optional[int] = None, max_items: Optional[int] = None) -> AsyncIterator[Page]:
+        """Stream products page by page"""
+        return self.iter_pages("products", page_size=page_size, max_items=max_items)
+    
+    def iter_carts(self, page_size: Optional[int] = None, max_items: Optional[int] = None) -> AsyncIterator[Page]:
+        """Stream carts page by page"""
+        return self.iter_pages("carts", page_size=page_size, max_items=max_items)
+    
+    async def iter_pages(
+        self,
+        source: str,
+        skip: int = 0,
+        page_size: Optional[int] = None,
+        max_items: Optional[int] = None,
+        newest_first: bool = False
+    ) -> AsyncIterator[Page]:
+        """Walk the upstream skip/limit pagination, yielding pages until the reported total is reached"""
+        url = f"{self.base_url}/{source}"
+        page_size = page_size or settings.upstream_page_size
+        ordering = {"sortBy": "id", "order": "desc"} if newest_first else {}
+        
+        while True:
+            limit = page_size
+            if max_items is not None:
+                limit = min(limit, max_items - skip)
+            if limit <= 0:
+                return
+            
+            response = await request_with_retry(
+                self.client, "GET", url, params={"skip": skip, "limit": limit, **ordering}
+            )
             data = response.json()
-            return data.get("carts", [])
+            items = data.get(source, [])
+            total = data.get("total", skip + len(items))
+            if max_items is not None:
+                total = min(total, max_items)
+            
+            if not items:
+                return
+            
+            yield Page(items=items, skip=skip, total=total)
+            
+            skip += len(items)
+            if skip >= total:
+                return
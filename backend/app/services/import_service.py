@@ -1,76 +1,279 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Awaitable, Callable, Coroutine, Optional
+from contextlib import aclosing
 import asyncio
 import random
 
-from ..database import SessionLocal
+from ..database import AsyncSessionLocal
 from ..config import settings
-from ..repositories.job_repository import JobRepository
-from ..repositories.item_repository import ItemRepository
+from ..repositories.job_repository import AsyncJobRepository
+from ..repositories.item_repository import AsyncItemRepository, supports_copy
+from ..repositories.job_source_repository import AsyncJobSourceRepository
+from ..models import ImportJobSource
 from .external_api_service import ExternalApiService
+from .batch_writer import BatchWriter
+from .streaming import bounded_prefetch
+from .job_queue import JobQueue
+from .event_broker import get_event_broker
 
 
 class ImportService:
     """Service for handling data import operations"""
     
     @staticmethod
-    async def process_import_job(job_id: int, sources: List[str]) -> None:
-        """Background task to process import job"""
-        db = SessionLocal()
-        job_repo = JobRepository(db)
+    async def process_import_job(job_id: int, sources: List[str], lease_owner: Optional[str] = None) -> None:
+        """Process an import job while holding its queue lease
         
-        try:
-            item_repo = ItemRepository(db)
-            external_api = ExternalApiService()
-            
-            job = job_repo.get_by_id(job_id)
-            if not job:
+        Queue workers pass the lease_owner they claimed the job with. Without one (the
+        BackgroundTasks path) the job is claimed here, so a worker cannot run it concurrently.
+        """
+        if lease_owner is None:
+            lease_owner = JobQueue.new_lease_owner()
+            if not await JobQueue.claim(job_id, lease_owner):
                 return
+        
+        try:
+            work = asyncio.ensure_future(ImportService._run_import(job_id, sources))
+            await JobQueue.hold_lease(job_id, lease_owner, work)
+        finally:
+            await JobQueue.release(job_id, lease_owner)
+    
+    @staticmethod
+    async def _run_import(job_id: int, sources: List[str]) -> None:
+        """Fetch every source of a job and record the outcome on the job"""
+        async with AsyncSessionLocal() as db:
+            job_repo = AsyncJobRepository(db)
+            source_repo = AsyncJobSourceRepository(db)
+            job = None
             
-            job_repo.update_status(job_id, "Running")
-            
-            # Simulate random failure - 1 in 10 jobs fail
-            if random.randint(1, 10) == 1:
-                await asyncio.sleep(2)
-                raise Exception("Random test failure - 10% chance simulation")
+            try:
+                external_api = ExternalApiService()
+                
+                job = await job_repo.get_by_id(job_id)
+                if not job:
+                    return
+                
+                # Each source resumes from its last committed checkpoint (zero for a fresh job),
+                # which covers resumed failures and jobs reclaimed from a dead worker alike
+                checkpoints = await source_repo.ensure_sources(job_id, sources)
+                
+                # Incremental jobs list eligible sources newest first and stop once they reach the
+                # highest remote_id of the last completed job; every other source is read in full
+                # and relies on content hashes alone to skip unchanged records
+                stop_at: Dict[str, Optional[int]] = {}
+                if job.mode == "incremental":
+                    for source in sources:
+                        if ImportService._can_stop_early(source, external_api):
+                            baseline = await source_repo.get_baseline(job.user_id, source, job.id)
+                            stop_at[source] = baseline.max_remote_id if baseline else None
+                
+                await job_repo.update_status(job_id, "Running")
+                await ImportService._publish_status(job.user_id, job_id, "Running")
+                
+                # Simulate random failure - 1 in 10 jobs fail
+                if random.randint(1, 10) == 1:
+                    await asyncio.sleep(2)
+                    raise Exception("Random test failure - 10% chance simulation")
+                
+                # Simulate delay
+                await asyncio.sleep(settings.simulate_delay_seconds)
+                
+                # Fetch and ingest sources concurrently, bounded per job
+                semaphore = asyncio.Semaphore(settings.import_source_concurrency)
+                await ImportService._gather_or_cancel([
+                    ImportService._import_source(
+                        job.id,
+                        job.user_id,
+                        source,
+                        checkpoints[source],
+                        external_api,
+                        semaphore,
+                        newest_first=source in stop_at,
+                        stop_at_remote_id=stop_at.get(source)
+                    )
+                    for source in sources
+                ])
+                
+                await job_repo.update_status(job_id, "Completed")
+                await ImportService._publish_status(job.user_id, job_id, "Completed")
             
-            # Simulate delay
-            await asyncio.sleep(settings.simulate_delay_seconds)
+            except Exception as e:
+                # Rollback any pending transaction before updating status. Committed items and
+                # checkpoints are kept so a resume only redoes the uncommitted chunk.
+                await db.rollback()
+                await source_repo.fail_unfinished(job_id)
+                await job_repo.update_status(job_id, "Failed", str(e))
+                if job:
+                    await ImportService._publish_status(job.user_id, job_id, "Failed", str(e))
+    
+    @staticmethod
+    def _can_stop_early(source: str, external_api: ExternalApiService) -> bool:
+        """Whether an incremental import of source may stop at the last job's highest id
+        
+        Only sound when the upstream lists the source newest first, never edits published
+        records (an edit below the stop point would be missed) and the source is uncapped
+        (a capped window read newest first is a different set of records than the baseline's).
+        """
+        return (
+            external_api.supports_newest_first(source)
+            and source in settings.import_append_only_sources
+            and not settings.import_source_limits.get(source)
+        )
+    
+    @staticmethod
+    async def _import_source(
+        job_id: int,
+        user_id: int,
+        source: str,
+        checkpoint: ImportJobSource,
+        external_api: ExternalApiService,
+        semaphore: asyncio.Semaphore,
+        newest_first: bool = False,
+        stop_at_remote_id: Optional[int] = None
+    ) -> None:
+        """Stream one source from its checkpoint into batched writes using its own session"""
+        async with semaphore, AsyncSessionLocal() as db:
+            source_repo = AsyncJobSourceRepository(db)
+            progress = {"completed": checkpoint.checkpoint_offset, "total": checkpoint.total or 0, "status": "Running"}
             
-            # Process each source
-            for source in sources:
-                if source == "products":
-                    products = await external_api.fetch_products(limit=30)
-                    for product in products:
-                        item_repo.create(
-                            job_id=job.id,
-                            source="products",
-                            remote_id=product.get("id"),
-                            payload=product
-                        )
-                        db.commit()
-                        # Add delay between items to show progress
-                        await asyncio.sleep(0.2)
-                elif source == "carts":
-                    carts = await external_api.fetch_carts(limit=20)
-                    for cart in carts:
-                        item_repo.create(
-                            job_id=job.id,
-                            source="carts",
-                            remote_id=cart.get("id"),
-                            payload=cart
-                        )
-                        db.commit()
-                        # Add delay between items to show progress
-                        await asyncio.sleep(0.2)
+            async def report(**changes) -> None:
+                progress.update(changes)
+                await ImportService._publish(user_id, {"type": "progress", "jobId": job_id, "source": source, **progress})
             
-            job_repo.update_status(job_id, "Completed")
+            await source_repo.update_progress(job_id, source, status="Running")
+            await report()
             
-        except Exception as e:
-            # Rollback any pending transaction before updating status
-            db.rollback()
-            # Delete any partially imported items from failed attempt
-            item_repo.delete_by_job(job_id)
-            job_repo.update_status(job_id, "Failed", str(e))
-        finally:
-            db.close()
+            writer = ImportService._source_writer(
+                db,
+                job_id,
+                user_id,
+                source,
+                checkpoint.checkpoint_offset,
+                checkpoint.max_remote_id,
+                on_commit=lambda offset: report(completed=offset)
+            )
+            pages = external_api.iter_pages(
+                source,
+                skip=checkpoint.checkpoint_offset,
+                max_items=settings.import_source_limits.get(source) or None,
+                newest_first=newest_first
+            )
+            # Keep downloading the next page while the current one is written
+            async with aclosing(bounded_prefetch(pages, settings.import_queue_max_pages)) as stream:
+                async for page in stream:
+                    if page.total != progress["total"]:
+                        await source_repo.update_progress(job_id, source, total=page.total)
+                        await report(total=page.total)
+                    
+                    for record in page.items:
+                        await writer.add(record)
+                    
+                    # Newest first, everything past this page was already seen by the baseline job
+                    if stop_at_remote_id is not None and any(
+                        (record.get("id") or 0) <= stop_at_remote_id for record in page.items
+                    ):
+                        break
+            await writer.flush()
+            await source_repo.update_progress(job_id, source, status="Completed")
+            await report(status="Completed")
+    
+    @staticmethod
+    def _source_writer(
+        db: AsyncSession,
+        job_id: int,
+        user_id: int,
+        source: str,
+        start_offset: int,
+        max_remote_id: Optional[int] = None,
+        on_commit: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> BatchWriter:
+        """Batch writer for one source that advances its checkpoint with every committed chunk"""
+        position = {"offset": start_offset, "max_remote_id": max_remote_id}
+        
+        async def flush(records: List[Dict[str, Any]]) -> None:
+            offset = position["offset"] + len(records)
+            remote_ids = [record.get("id") for record in records if record.get("id") is not None]
+            if position["max_remote_id"] is not None:
+                remote_ids.append(position["max_remote_id"])
+            highest = max(remote_ids, default=None)
+            await ImportService._finish_if_cancelled(
+                ImportService._write_batch(db, job_id, user_id, source, records, offset, highest)
+            )
+            position["offset"] = offset
+            position["max_remote_id"] = highest
+            if on_commit is not None:
+                await on_commit(offset)
+        
+        # Where COPY can bulk-load, bigger chunks let each one take that path
+        if settings.import_copy_min_rows > 0 and supports_copy(db.get_bind().dialect):
+            max_rows = max(settings.import_copy_batch_size, settings.import_batch_size)
+            max_bytes = max(settings.import_copy_batch_max_bytes, settings.import_batch_max_bytes)
+        else:
+            max_rows, max_bytes = settings.import_batch_size, settings.import_batch_max_bytes
+        
+        return BatchWriter(flush=flush, max_rows=max_rows, max_bytes=max_bytes)
+    
+    @staticmethod
+    async def _publish_status(user_id: int, job_id: int, status: str, error: Optional[str] = None) -> None:
+        """Tell the user's subscribers a job changed status"""
+        await ImportService._publish(user_id, {"type": "job", "jobId": job_id, "status": status, "error": error})
+    
+    @staticmethod
+    async def _publish(user_id: int, event: Dict[str, Any]) -> None:
+        """Push an event to the user's live job streams"""
+        await get_event_broker().publish(user_id, event)
+    
+    @staticmethod
+    async def _finish_if_cancelled(coroutine: Coroutine[Any, Any, None]) -> None:
+        """Await a chunk write that a cancellation cannot interrupt part way
+        
+        An abandoned statement leaves its transaction open (on SQLite, holding the write
+        lock), so a cancelled source lets its in-flight chunk commit before it stops.
+        """
+        task = asyncio.ensure_future(coroutine)
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            await asyncio.wait({task})
+            raise
+    
+    @staticmethod
+    async def _gather_or_cancel(coroutines: List[Coroutine[Any, Any, None]]) -> None:
+        """Run coroutines concurrently; on the first failure cancel the rest and re-raise it"""
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    
+    @staticmethod
+    async def _write_batch(
+        db: AsyncSession,
+        job_id: int,
+        user_id: int,
+        source: str,
+        records: List[Dict[str, Any]],
+        offset: int,
+        max_remote_id: Optional[int] = None
+    ) -> None:
+        """Upsert one chunk and record its checkpoint and counts in one transaction"""
+        result = await AsyncItemRepository(db).upsert(
+            user_id, job_id, source, records, commit=False, copy_min_rows=settings.import_copy_min_rows
+        )
+        await AsyncJobSourceRepository(db).save_checkpoint(
+            job_id,
+            source,
+            offset,
+            records[-1].get("id"),
+            inserted=result.inserted,
+            updated=result.updated,
+            unchanged=result.unchanged,
+            max_remote_id=max_remote_id,
+            commit=False
+        )
+        # Progress is a change too: status pollers compare updated_at
+        await AsyncJobRepository(db).touch(job_id, commit=False)
+        await db.commit()
@@ -0,0 +1,53 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from ..repositories.item_repository import AsyncItemRepository
+from ..schemas import ImportedItemFields
+
+# API field names clients may request with fields=, mapped to ImportedItem columns
+ITEM_API_FIELDS = {
+    "id": "id",
+    "source": "source",
+    "remoteId": "remote_id",
+    "status": "status",
+    "createdAt": "created_at",
+    "payload": "payload"
+}
+
+# Listings leave the payload out unless it is asked for
+DEFAULT_LIST_FIELDS = ["id", "source", "remoteId", "status", "createdAt"]
+
+
+class ItemService:
+    """Service for reading imported items"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.item_repo = AsyncItemRepository(db)
+    
+    async def get_item(self, user_id: int, item_id: int, fields: Optional[List[str]] = None) -> Optional[ImportedItemFields]:
+        """Get one of a user's items, projected to fields (all fields, including the payload, by default)"""
+        fields = self._validate_fields(fields or list(ITEM_API_FIELDS))
+        item = await self.item_repo.get_for_user(user_id, item_id, [ITEM_API_FIELDS[field] for field in fields])
+        return self._project(item, fields) if item is not None else None
+    
+    async def list_items(self, user_id: int, limit: int = 50, fields: Optional[List[str]] = None) -> List[ImportedItemFields]:
+        """Get a user's most recent items, projected to fields (no payload by default)"""
+        fields = self._validate_fields(fields or DEFAULT_LIST_FIELDS)
+        items = await self.item_repo.get_recent(user_id, limit, [ITEM_API_FIELDS[field] for field in fields])
+        return [self._project(item, fields) for item in items]
+    
+    @staticmethod
+    def _validate_fields(fields: List[str]) -> List[str]:
+        """Validate requested field names"""
+        unknown = [field for field in fields if field not in ITEM_API_FIELDS]
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(ITEM_API_FIELDS)}"
+            )
+        return fields
+    
+    @staticmethod
+    def _project(item, fields: List[str]) -> ImportedItemFields:
+        """Copy only the requested fields so unrequested (deferred) columns are never loaded"""
+        return ImportedItemFields(**{ITEM_API_FIELDS[field]: getattr(item, ITEM_API_FIELDS[field]) for field in fields})
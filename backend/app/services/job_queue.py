@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Optional
+
+from ..database import AsyncSessionLocal
+from ..config import settings
+from ..models import ImportJob
+from ..repositories.job_repository import AsyncJobRepository
+from .event_broker import get_event_broker
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Durable job queue on top of the import_jobs table using time-limited leases"""
+    
+    @staticmethod
+    def new_lease_owner() -> str:
+        """Unique identity for one worker slot"""
+        return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    
+    @staticmethod
+    async def claim_next(lease_owner: str) -> Optional[ImportJob]:
+        """Lease the next runnable job to lease_owner, failing any that used up their attempts"""
+        async with AsyncSessionLocal() as db:
+            repo = AsyncJobRepository(db)
+            await JobQueue._fail_exhausted(repo)
+            return await repo.claim_next(lease_owner, settings.job_lease_seconds, settings.job_max_attempts)
+    
+    @staticmethod
+    async def claim(job_id: int, lease_owner: str) -> bool:
+        """Lease a specific job to lease_owner, failing it if it used up its attempts"""
+        async with AsyncSessionLocal() as db:
+            repo = AsyncJobRepository(db)
+            await JobQueue._fail_exhausted(repo, job_id)
+            return await repo.claim(job_id, lease_owner, settings.job_lease_seconds, settings.job_max_attempts)
+    
+    @staticmethod
+    async def _fail_exhausted(repo: AsyncJobRepository, job_id: Optional[int] = None) -> None:
+        """Fail jobs that were reclaimed job_max_attempts times and tell their owners"""
+        for failed_id, user_id in await repo.fail_exhausted(settings.job_max_attempts, job_id):
+            error = f"Gave up after {settings.job_max_attempts} attempts"
+            logger.warning("Job %s failed: %s", failed_id, error)
+            await get_event_broker().publish(
+                user_id,
+                {"type": "job", "jobId": failed_id, "status": "Failed", "error": error}
+            )
+    
+    @staticmethod
+    async def release(job_id: int, lease_owner: str) -> None:
+        """Give up the lease on a job"""
+        async with AsyncSessionLocal() as db:
+            await AsyncJobRepository(db).release_lease(job_id, lease_owner)
+    
+    @staticmethod
+    async def hold_lease(job_id: int, lease_owner: str, work: "asyncio.Future") -> None:
+        """Keep renewing the lease until work finishes; cancel work if the lease is lost"""
+        interval = settings.job_lease_seconds / 3
+        lease_lost = False
+        try:
+            while not work.done():
+                await asyncio.wait({work}, timeout=interval)
+                if work.done():
+                    break
+                
+                async with AsyncSessionLocal() as db:
+                    renewed = await AsyncJobRepository(db).renew_lease(
+                        job_id, lease_owner, settings.job_lease_seconds
+                    )
+                
+                if not renewed:
+                    logger.warning("Lost lease on job %s; leaving it to its new owner", job_id)
+                    lease_lost = True
+                    work.cancel()
+                    break
+            
+            await work
+        except asyncio.CancelledError:
+            # Abandoning after a lost lease is expected; anything else (shutdown) propagates
+            if not lease_lost:
+                work.cancel()
+                raise
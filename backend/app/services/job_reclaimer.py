@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from typing import Set
+
+from .import_service import ImportService
+from .job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+async def reclaim_abandoned_jobs(stop: asyncio.Event, concurrency: int, interval: float) -> None:
+    """Run queued jobs no process is working on from inside the API, until stop is set
+    
+    With JOB_RUNNER=background a job runs in the API process that created it and dies with
+    it; nothing else polls the queue, so this picks such jobs up once their lease expires
+    (or was never taken), at startup and every interval seconds after.
+    """
+    running: Set[asyncio.Future] = set()
+    try:
+        while not stop.is_set():
+            job = None
+            if len(running) < concurrency:
+                lease_owner = JobQueue.new_lease_owner()
+                job = await JobQueue.claim_next(lease_owner)
+            if job is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            logger.info("Reclaiming job %s (attempt %s)", job.id, job.attempts)
+            task = asyncio.ensure_future(
+                ImportService.process_import_job(job.id, job.selected_sources, lease_owner=lease_owner)
+            )
+            running.add(task)
+            task.add_done_callback(running.discard)
+    finally:
+        # Cancelled jobs release their lease and are picked up again on the next start
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
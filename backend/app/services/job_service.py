@@ -1,59 +1,118 @@
-from sqlalchemy.orm import Session
-from typing import List, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
-from ..models import ImportJob
+from ..models import ImportJob, ImportJobSource
 from ..schemas import SourceProgress
-from ..repositories.job_repository import JobRepository
-from ..repositories.item_repository import ItemRepository
+from ..repositories.job_repository import AsyncJobRepository
+from ..repositories.job_source_repository import AsyncJobSourceRepository
+from .event_broker import get_event_broker
 
 
 class JobService:
     """Service for managing import jobs"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.job_repo = JobRepository(db)
-        self.item_repo = ItemRepository(db)
+        self.job_repo = AsyncJobRepository(db)
+        self.source_repo = AsyncJobSourceRepository(db)
     
-    def create_job(self, user_id: int, selected_sources: List[str], credentials: Dict) -> ImportJob:
+    async def create_job(
+        self,
+        user_id: int,
+        selected_sources: List[str],
+        credentials: Dict,
+        mode: str = "full"
+    ) -> ImportJob:
         """Create a new import job"""
         # Validate
         self._validate_sources(selected_sources)
         self._validate_credentials(selected_sources, credentials)
+        self._validate_mode(mode)
         
-        return self.job_repo.create(user_id, selected_sources, credentials)
+        job = await self.job_repo.create(user_id, selected_sources, credentials, mode)
+        await self._publish_status(job)
+        return job
     
-    def get_job(self, job_id: int) -> Optional[ImportJob]:
+    async def get_job(self, job_id: int) -> Optional[ImportJob]:
         """Get a job by ID"""
-        return self.job_repo.get_by_id(job_id)
+        return await self.job_repo.get_by_id(job_id)
     
-    def list_jobs(self, user_id: int, skip: int, limit: int) -> List[ImportJob]:
+    async def get_jobs(self, user_id: int, job_ids: List[int]) -> List[ImportJob]:
+        """Get several of a user's jobs by ID"""
+        return await self.job_repo.get_by_ids(user_id, job_ids)
+    
+    async def get_job_versions(
+        self,
+        user_id: int,
+        job_ids: Optional[List[int]] = None,
+        since: Optional[datetime] = None
+    ) -> List[Tuple[int, datetime]]:
+        """(id, updated_at) of a user's jobs selected by ID and/or last change"""
+        return await self.job_repo.get_versions(user_id, job_ids, since)
+    
+    async def list_jobs(self, user_id: int, skip: int, limit: int) -> List[ImportJob]:
         """List all jobs for a user with pagination"""
-        return self.job_repo.list_jobs(user_id, skip, limit)
+        return await self.job_repo.list_jobs(user_id, skip, limit)
+    
+    async def list_jobs_page(
+        self,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        skip: int = 0
+    ) -> Tuple[List[ImportJob], Optional[Tuple[datetime, int]]]:
+        """A page of a user's jobs and the (created_at, id) key to continue after, if there is more"""
+        # One extra row tells us whether another page exists without a COUNT
+        jobs = await self.job_repo.list_jobs(user_id, skip, limit + 1, after)
+        if len(jobs) <= limit:
+            return jobs, None
+        jobs = jobs[:limit]
+        return jobs, (jobs[-1].created_at, jobs[-1].id)
+    
+    async def resume_job(self, job: ImportJob) -> ImportJob:
+        """Requeue a failed job so it continues from its per-source checkpoints"""
+        if job.status != "Failed":
+            raise ValueError("Only failed jobs can be resumed")
+        
+        await self.job_repo.requeue(job.id)
+        job = await self.job_repo.get_by_id(job.id)
+        await self._publish_status(job)
+        return job
     
-    def calculate_progress(self, job: ImportJob) -> Dict[str, SourceProgress]:
+    async def calculate_progress(self, job: ImportJob) -> Dict[str, SourceProgress]:
         """Calculate progress for each source in a job"""
+        states = await self.source_repo.get_by_job(job.id)
+        return self._build_progress(job, states)
+    
+    async def calculate_progress_for_jobs(self, jobs: List[ImportJob]) -> Dict[int, Dict[str, SourceProgress]]:
+        """Calculate progress for a page of jobs with one query, keyed by job id"""
+        states = await self.source_repo.get_by_jobs([job.id for job in jobs])
+        return {job.id: self._build_progress(job, states[job.id]) for job in jobs}
+    
+    async def _publish_status(self, job: ImportJob) -> None:
+        """Tell the user's other open streams about a new or requeued job"""
+        await get_event_broker().publish(
+            job.user_id,
+            {"type": "job", "jobId": job.id, "status": job.status, "error": job.error_message}
+        )
+    
+    def _build_progress(self, job: ImportJob, states: Dict[str, ImportJobSource]) -> Dict[str, SourceProgress]:
+        """Progress for each source of a job from its per-source state rows"""
         progress = {}
         
         for source in job.selected_sources:
-            completed = self.item_repo.count_by_job_and_source(job.id, source)
-            total = 30 if source == "products" else 20
-            
-            # Determine source status
-            if job.status == "Completed":
-                source_status = "Completed"
-            elif job.status == "Failed":
-                source_status = "Failed"
-            elif completed > 0:
-                source_status = "Running"
-            else:
-                source_status = "Pending"
+            # Counters are maintained by the import pipeline, so nothing is recounted here.
+            # completed covers records written and records skipped as unchanged.
+            state = states.get(source)
             
             progress[source] = SourceProgress(
-                completed=completed,
-                total=total,
-                status=source_status
+                completed=state.checkpoint_offset if state else 0,
+                total=(state.total or 0) if state else 0,
+                status=state.status if state else "Pending",
+                inserted=state.inserted_count if state else 0,
+                updated=state.updated_count if state else 0,
+                unchanged=state.unchanged_count if state else 0
             )
         
         return progress
@@ -64,6 +123,11 @@ class JobService:
         if not all(source in valid_sources for source in sources):
             raise ValueError("Invalid sources. Must be one of: products, carts")
     
+    def _validate_mode(self, mode: str) -> None:
+        """Validate the import mode"""
+        if mode not in {"full", "incremental"}:
+            raise ValueError("Invalid mode. Must be one of: full, incremental")
+    
     def _validate_credentials(self, sources: List[str], credentials: Dict) -> None:
         """Validate that all sources have credentials"""
         if not credentials:
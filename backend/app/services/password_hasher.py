@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from ..config import settings
+from .auth_service import AuthService
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full; callers should answer 503"""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded thread pool so auth bursts cannot starve other requests"""
+    
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        # bcrypt releases the GIL, so threads give real parallelism without a process pool
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.in_flight = 0
+        self.counters: Counter = Counter()
+        # in_flight and counters are also updated from pool threads as work finishes
+        self._lock = threading.Lock()
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured cost"""
+        return await self._submit(AuthService.get_password_hash, password)
+    
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Check a password against its hash"""
+        return await self._submit(AuthService.verify_password, password, hashed_password)
+    
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn on the pool, or shed the request when running plus queued work is at capacity
+        
+        Work stays in flight until the pool finishes it: a request cancelled while bcrypt runs
+        does not stop the thread, so it keeps its slot until the thread is done.
+        """
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.counters["rejected"] += 1
+                raise PasswordHasherBusy("Too many authentication requests in progress")
+            self.in_flight += 1
+        
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+    
+    def _finished(self, future: Future) -> None:
+        """Free the slot of finished (or cancelled before starting) work and count its outcome"""
+        if future.cancelled():
+            outcome = "cancelled"
+        elif future.exception() is not None:
+            outcome = "failed"
+        else:
+            outcome = "completed"
+        with self._lock:
+            self.in_flight -= 1
+            self.counters[outcome] += 1
+    
+    def close(self) -> None:
+        """Stop the pool once queued work is done"""
+        self._executor.shutdown(wait=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and shed requests for metrics"""
+        return {
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "inFlight": self.in_flight,
+            "queued": max(self.in_flight - self.workers, 0),
+            "completed": self.counters["completed"],
+            "failed": self.counters["failed"],
+            "cancelled": self.counters["cancelled"],
+            "rejected": self.counters["rejected"]
+        }
+
+
+# Process-wide pool shared by every login and registration
+_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the shared hasher, creating it on first use"""
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_queue)
+    return _hasher
+
+
+def close_password_hasher() -> None:
+    """Shut down the shared hasher's pool"""
+    global _hasher
+    if _hasher is not None:
+        _hasher.close()
+        _hasher = None
+
+
+def password_hasher_stats() -> Dict[str, Any]:
+    """Stats of the shared hasher"""
+    return get_password_hasher().stats()
@@ -0,0 +1,82 @@
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..database import has_replica
+from .event_broker import EventBroker, get_event_broker
+
+
+class ReadRouter:
+    """Sends a user's reads to the primary for a short window after their data changed (read-your-writes)"""
+    
+    # Above this many tracked users, expired windows are swept on the next write
+    SWEEP_THRESHOLD = 10000
+    
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._primary_until: Dict[int, float] = {}
+        self._broker: Optional[EventBroker] = None
+        self.counters: Counter = Counter()
+    
+    def note_write(self, user_id: int) -> None:
+        """Keep the user's reads on the primary until the replica has caught up"""
+        now = time.monotonic()
+        if len(self._primary_until) > self.SWEEP_THRESHOLD:
+            self._primary_until = {uid: until for uid, until in self._primary_until.items() if until > now}
+        self._primary_until[user_id] = now + self.window_seconds
+    
+    def use_primary(self, user_id: int) -> bool:
+        """Whether the user's next read must go to the primary"""
+        self._watch_events()
+        until = self._primary_until.get(user_id)
+        if until is not None and until <= time.monotonic():
+            del self._primary_until[user_id]
+            until = None
+        primary = until is not None
+        self.counters["primaryReads" if primary else "replicaReads"] += 1
+        return primary
+    
+    def _on_event(self, user_id: int, event: Dict[str, Any]) -> None:
+        """Status changes (including a worker's) are writes the user will look for; progress ticks are not"""
+        if event.get("type") == "job":
+            self.note_write(user_id)
+    
+    def _watch_events(self) -> None:
+        """Follow the current broker"""
+        broker = get_event_broker()
+        if broker is not self._broker:
+            broker.watch(self._on_event)
+            self._broker = broker
+    
+    def stats(self) -> Dict[str, Any]:
+        """Routing decisions for metrics"""
+        return {
+            "replica": has_replica(),
+            "pinnedUsers": len(self._primary_until),
+            "primaryReads": self.counters["primaryReads"],
+            "replicaReads": self.counters["replicaReads"]
+        }
+
+
+# Process-wide router shared by every read-only request
+_router: Optional[ReadRouter] = None
+
+
+def get_read_router() -> ReadRouter:
+    """Get the shared router, creating it on first use"""
+    global _router
+    if _router is None:
+        _router = ReadRouter(settings.replica_read_your_writes_seconds)
+    return _router
+
+
+def reset_read_router() -> None:
+    """Forget the shared router (settings changes, tests)"""
+    global _router
+    _router = None
+
+
+def read_routing_stats() -> Dict[str, Any]:
+    """Stats of the shared router"""
+    return get_read_router().stats()
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying; 429 is retried but does not count against the circuit breaker
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+# How often callers re-check a breaker while a half-open probe is in flight
+_PROBE_POLL_SECONDS = 0.1
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream host"""
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, host: str, failure_threshold: int, reset_seconds: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.waiting = 0
+        self.wait_seconds = 0.0
+        self._probe_in_flight = False
+    
+    async def acquire(self) -> bool:
+        """Wait until a request may be sent; returns True if the caller holds the half-open probe slot"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            while True:
+                if self.state == self.CLOSED:
+                    return False
+                
+                if self.state == self.OPEN:
+                    remaining = self.opened_at + self.reset_seconds - time.monotonic()
+                    if remaining > 0:
+                        await asyncio.sleep(remaining)
+                        continue
+                    # Cooldown over: let exactly one request through to probe the host
+                    self.state = self.HALF_OPEN
+                    self._probe_in_flight = True
+                    return True
+                
+                if not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    return True
+                await asyncio.sleep(min(_PROBE_POLL_SECONDS, self.reset_seconds))
+        finally:
+            self.waiting -= 1
+            self.wait_seconds += time.monotonic() - started
+    
+    def record_success(self) -> None:
+        """The host answered; close the breaker"""
+        if self.state != self.CLOSED:
+            logger.info("Circuit for %s closed", self.host)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """The host failed; open the breaker after too many failures in a row or a failed probe"""
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            logger.warning(
+                "Circuit for %s opened after %s consecutive failures", self.host, self.consecutive_failures
+            )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+    
+    def release(self) -> None:
+        """Free the half-open probe slot if its request ended without an outcome (e.g. cancelled)"""
+        self._probe_in_flight = False
+    
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state for metrics"""
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.consecutive_failures,
+            "timesOpened": self.times_opened,
+            "waitingRequests": self.waiting,
+            "totalWaitSeconds": round(self.wait_seconds, 3)
+        }
+
+
+# Process-wide breakers keyed by host, so every job talking to a host shares its state
+_breakers: Dict[str, CircuitBreaker] = {}
+_retries: Counter = Counter()
+_exhausted = 0
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    """Get (or create) the breaker for a host"""
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = CircuitBreaker(host, settings.circuit_failure_threshold, settings.circuit_reset_seconds)
+        _breakers[host] = breaker
+    return breaker
+
+
+def reset_resilience() -> None:
+    """Forget all breaker state and counters"""
+    global _exhausted
+    _breakers.clear()
+    _retries.clear()
+    _exhausted = 0
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given (1-based) failed attempt"""
+    ceiling = min(
+        settings.upstream_retry_max_delay_seconds,
+        settings.upstream_retry_base_delay_seconds * 2 ** (attempt - 1)
+    )
+    return random.uniform(0, ceiling)
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+async def request_with_retry(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request through the host's circuit breaker, retrying transient failures"""
+    global _exhausted
+    breaker = get_breaker(httpx.URL(url).host)
+    attempts = max(settings.upstream_retry_attempts, 1)
+    
+    for attempt in range(1, attempts + 1):
+        probe = await breaker.acquire()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            breaker.record_failure()
+            if attempt == attempts:
+                _exhausted += 1
+                raise
+            reason = type(e).__name__
+            delay = backoff_delay(attempt)
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                breaker.record_success()
+                response.raise_for_status()
+                return response
+            
+            if response.status_code == 429:
+                # Rate limited: the host is alive, so only back off
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            if attempt == attempts:
+                _exhausted += 1
+                response.raise_for_status()
+            reason = str(response.status_code)
+            retry_after = parse_retry_after(response)
+            delay = backoff_delay(attempt) if retry_after is None else min(
+                retry_after, settings.upstream_retry_max_delay_seconds
+            )
+        finally:
+            if probe:
+                breaker.release()
+        
+        _retries[reason] += 1
+        logger.info("Retrying %s %s in %.2fs (attempt %s failed: %s)", method, url, delay, attempt, reason)
+        await asyncio.sleep(delay)
+
+
+def resilience_stats() -> Dict[str, Any]:
+    """Retry counters and per-host breaker state"""
+    return {
+        "retries": sum(_retries.values()),
+        "retriesByReason": dict(_retries),
+        "retriesExhausted": _exhausted,
+        "circuitBreakers": {host: breaker.stats() for host, breaker in _breakers.items()}
+    }
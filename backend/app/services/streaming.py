@@ -0,0 +1,37 @@
+import asyncio
+from typing import AsyncIterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def bounded_prefetch(source: AsyncIterator[T], maxsize: int) -> AsyncIterator[T]:
+    """Consume an async iterator in a background task, buffering at most maxsize items ahead of the reader"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(maxsize, 1))
+    
+    async def produce() -> None:
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(e)
+            return
+        finally:
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        await queue.put(_DONE)
+    
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,23 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from ..models import User
+from ..repositories.user_repository import AsyncUserRepository
+from .auth_service import get_auth_cache
+from .event_broker import get_event_broker
+
+
+class UserService:
+    """Service for managing user accounts"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.user_repo = AsyncUserRepository(db)
+    
+    async def set_active(self, user_id: int, is_active: bool) -> Optional[User]:
+        """Activate or deactivate a user, dropping its cached snapshot so the change applies to its next request"""
+        user = await self.user_repo.set_active(user_id, is_active)
+        get_auth_cache().invalidate_user(user_id)
+        # Other processes (API instances, when this runs from a script) drop it on this event
+        await get_event_broker().publish(user_id, {"type": "user", "userId": user_id, "isActive": is_active})
+        return user
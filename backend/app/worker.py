@@ -0,0 +1,80 @@
+"""
+Standalone import worker
+
+Claims queued import jobs from the database and runs up to N of them at once,
+so import capacity scales independently of the API.
+
+Usage:
+    python -m app.worker --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from .config import settings
+from .database import init_db
+from .http_client import start_http_client, close_http_client
+from .services.event_broker import close_event_broker
+from .services.import_service import ImportService
+from .services.job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_slot(stop: asyncio.Event, poll_interval: float) -> None:
+    """Claim and process jobs one at a time until asked to stop"""
+    lease_owner = JobQueue.new_lease_owner()
+    
+    while not stop.is_set():
+        job = await JobQueue.claim_next(lease_owner)
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        
+        logger.info("Processing job %s (attempt %s)", job.id, job.attempts)
+        await ImportService.process_import_job(job.id, job.selected_sources, lease_owner=lease_owner)
+
+
+async def run_worker(concurrency: int, poll_interval: float, stop: asyncio.Event) -> None:
+    """Run concurrency worker slots sharing one HTTP client"""
+    await start_http_client()
+    try:
+        await asyncio.gather(*(_run_slot(stop, poll_interval) for _ in range(concurrency)))
+    finally:
+        await close_http_client()
+        await close_event_broker()
+
+
+async def _main(concurrency: int, poll_interval: float) -> None:
+    """Run the worker until SIGINT/SIGTERM, letting in-flight jobs finish"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows event loops do not support signal handlers; Ctrl+C still interrupts
+            pass
+    
+    logger.info("Import worker started with %s concurrent jobs", concurrency)
+    await run_worker(concurrency, poll_interval, stop)
+
+
+def main():
+    """Worker entry point"""
+    parser = argparse.ArgumentParser(description="Run a standalone import worker")
+    parser.add_argument("--concurrency", type=int, default=settings.worker_concurrency)
+    parser.add_argument("--poll-interval", type=float, default=settings.worker_poll_interval_seconds)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_db()
+    asyncio.run(_main(args.concurrency, args.poll_interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Rebuild or verify the user_stats rollup against the jobs and items tables
+
+Usage:
+    python scripts/rebuild_user_stats.py            # rebuild every user's row
+    python scripts/rebuild_user_stats.py --verify   # report drift without writing; exits 1 if any
+    python scripts/rebuild_user_stats.py --user-id 42
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, init_db
+from app.models import User
+from app.repositories.user_stats_repository import UserStatsRepository
+
+
+def run(db, user_ids: List[int], verify: bool) -> int:
+    """Verify or rebuild the given users' rows; returns how many had drifted"""
+    repo = UserStatsRepository(db)
+    drifted = 0
+    for user_id in user_ids:
+        drift = repo.verify(user_id)
+        if not drift:
+            continue
+        drifted += 1
+        details = ", ".join(f"{column} {stored} -> {actual}" for column, (stored, actual) in drift.items())
+        print(f"user {user_id}: {details}")
+        if not verify:
+            # Rebuild in a fresh transaction: it locks the row and aggregates again
+            db.rollback()
+            repo.rebuild(user_id)
+    return drifted
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Rebuild or verify user_stats"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verify", action="store_true", help="Only report drift")
+    parser.add_argument("--user-id", type=int, action="append", help="Limit to these users (repeatable)")
+    args = parser.parse_args(argv)
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        user_ids = args.user_id or [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+        drifted = run(db, user_ids, args.verify)
+    finally:
+        db.close()
+    
+    action = "drifted" if args.verify else "rebuilt"
+    print(f"{drifted} of {len(user_ids)} users {action}")
+    return 1 if args.verify and drifted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Activate or deactivate a user account
+
+Deactivation applies to new logins at once. API processes drop their cached snapshot
+of the user when the change is published to them, which takes EVENT_BACKEND=redis;
+with in-process events they keep serving it for at most AUTH_USER_CACHE_TTL_SECONDS.
+
+Usage:
+    python scripts/set_user_active.py 42 --inactive
+    python scripts/set_user_active.py 42 --active
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import AsyncSessionLocal, async_engine, init_db
+from app.services.event_broker import close_event_broker
+from app.services.user_service import UserService
+
+
+async def run(user_id: int, is_active: bool) -> bool:
+    """Update the user; False if it does not exist"""
+    try:
+        async with AsyncSessionLocal() as db:
+            return await UserService(db).set_active(user_id, is_active) is not None
+    finally:
+        await close_event_broker()
+        await async_engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Activate or deactivate a user"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("user_id", type=int)
+    state = parser.add_mutually_exclusive_group(required=True)
+    state.add_argument("--active", dest="is_active", action="store_true")
+    state.add_argument("--inactive", dest="is_active", action="store_false")
+    args = parser.parse_args(argv)
+    
+    init_db()
+    if not asyncio.run(run(args.user_id, args.is_active)):
+        print(f"user {args.user_id} not found")
+        return 1
+    
+    print(f"user {args.user_id} {'activated' if args.is_active else 'deactivated'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
 """Shared test fixtures and configuration"""
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import sys
 from pathlib import Path
 
@@ -10,13 +12,24 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.main import app
-from app.database import Base, get_db
+from app.config import settings
+from app.database import Base, get_db, get_async_db, get_replica_db
+from app.services.dashboard_service import reset_dashboard_cache
+from app.services.auth_service import reset_auth_cache
+from app.services.read_routing import reset_read_router
 
 # Use in-memory SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async access to the same database; NullPool because each test (and each TestClient
+# request) runs on its own event loop and aiosqlite connections are bound to one loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
 def override_get_db():
     """Override database dependency for testing"""
@@ -27,6 +40,12 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    """Override async database dependency for testing"""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def test_db():
     """Create test database"""
@@ -36,9 +55,17 @@ def test_db():
 
 
 @pytest.fixture(scope="function")
-def client(test_db):
+def client(test_db, monkeypatch):
     """Create test client"""
+    # Leave created jobs queued rather than running real imports against the network
+    monkeypatch.setattr(settings, "job_runner", "worker")
+    # User IDs repeat across tests, so cached dashboards must not carry over
+    reset_dashboard_cache()
+    reset_auth_cache()
+    reset_read_router()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_replica_db] = override_get_async_db
     return TestClient(app)
 
 
@@ -50,6 +77,12 @@ def db_session(test_db):
     db.close()
 
 
+@pytest.fixture(scope="function")
+def async_session_factory(test_db):
+    """Async session factory bound to the test database, for patching AsyncSessionLocal"""
+    return TestingAsyncSessionLocal
+
+
 @pytest.fixture
 def test_user(client):
     """Create a test user and return credentials"""
@@ -68,3 +101,16 @@ def test_user(client):
 def auth_headers(test_user):
     """Get authorization headers for authenticated requests"""
     return {"Authorization": f"Bearer {test_user['token']}"}
+
+
+@pytest.fixture
+def sql_statements():
+    """Record every SQL statement the API runs against the test database"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
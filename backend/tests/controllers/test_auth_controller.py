@@ -1,6 +1,15 @@
 """Tests for auth_controller.py"""
+import asyncio
 import pytest
 
+from tests.conftest import TestingSessionLocal
+from app.config import settings
+from app.controllers import auth_controller
+from app.models import User
+from app.services.auth_service import AuthService, auth_cache_stats
+from app.services.password_hasher import PasswordHasher
+from app.services.user_service import UserService
+
 
 def test_register_user(client):
     """Test user registration"""
@@ -85,3 +94,95 @@ def test_login_nonexistent_user(client):
         "password": "password123"
     })
     assert response.status_code == 401
+
+
+def test_repeat_requests_skip_token_decode_and_user_query(client, auth_headers, sql_statements, monkeypatch):
+    """Test an authenticated request served from the auth cache neither decodes the JWT nor loads the user"""
+    assert client.get("/api/v1/import_jobs", headers=auth_headers).status_code == 200
+    
+    def fail(token):
+        raise AssertionError("token decoded again")
+    
+    monkeypatch.setattr(AuthService, "decode_access_token", fail)
+    sql_statements.clear()
+    
+    assert client.get("/api/v1/import_jobs", headers=auth_headers).status_code == 200
+    assert not [s for s in sql_statements if "FROM users" in s]
+    stats = auth_cache_stats()
+    assert stats["tokens"]["hits"] == 1
+    assert stats["users"]["hits"] == 1
+
+
+def test_deactivated_user_is_rejected(client, auth_headers, async_session_factory):
+    """Test deactivating a user invalidates its cached snapshot"""
+    me = client.get("/api/v1/import_jobs", headers=auth_headers)
+    assert me.status_code == 200
+    
+    async def deactivate():
+        async with async_session_factory() as db:
+            user = await UserService(db).set_active(1, False)
+            assert user is not None and not user.is_active
+    
+    asyncio.run(deactivate())
+    
+    response = client.get("/api/v1/import_jobs", headers=auth_headers)
+    assert response.status_code == 401
+
+
+def test_login_rehashes_when_cost_changes(client, test_user, monkeypatch):
+    """Test a successful login upgrades a hash made at an older bcrypt cost"""
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    response = client.post("/api/v1/auth/login", json={
+        "username": test_user["username"],
+        "password": test_user["password"]
+    })
+    assert response.status_code == 200
+    
+    db = TestingSessionLocal()
+    try:
+        hashed = db.query(User.hashed_password).filter(User.username == test_user["username"]).scalar()
+    finally:
+        db.close()
+    assert hashed.startswith("$2b$04$")
+
+
+def test_inactive_login_does_not_rehash(client, test_user, monkeypatch):
+    """Test a rejected inactive login leaves the stored hash untouched"""
+    db = TestingSessionLocal()
+    try:
+        user = db.query(User).filter(User.username == test_user["username"]).one()
+        user.is_active = False
+        db.commit()
+        before = user.hashed_password
+    finally:
+        db.close()
+    
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    response = client.post("/api/v1/auth/login", json={
+        "username": test_user["username"],
+        "password": test_user["password"]
+    })
+    assert response.status_code == 403
+    
+    db = TestingSessionLocal()
+    try:
+        hashed = db.query(User.hashed_password).filter(User.username == test_user["username"]).scalar()
+    finally:
+        db.close()
+    assert hashed == before
+
+
+def test_login_shed_when_hashing_pool_is_full(client, test_user, monkeypatch):
+    """Test logins get a fast 503 while the password hashing pool is saturated"""
+    saturated = PasswordHasher(workers=1, max_queue=0)
+    saturated.in_flight = 1
+    monkeypatch.setattr(auth_controller, "get_password_hasher", lambda: saturated)
+    
+    response = client.post("/api/v1/auth/login", json={
+        "username": test_user["username"],
+        "password": test_user["password"]
+    })
+    saturated.close()
+    
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -51,3 +51,42 @@ def test_dashboard_user_isolation(client, auth_headers):
     data2 = response.json()
     assert data2["totalJobs"] == 0
     assert data1["totalJobs"] == 1
+
+
+def test_repeated_dashboard_loads_are_cached(client, auth_headers, sql_statements):
+    """Test a second load between job changes runs no dashboard queries"""
+    client.get("/api/v1/dashboard", headers=auth_headers)
+    
+    sql_statements.clear()
+    response = client.get("/api/v1/dashboard", headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert not [s for s in sql_statements if "import_jobs" in s or "imported_items" in s]
+
+
+def test_dashboard_refreshes_after_job_change(client, auth_headers):
+    """Test a new job invalidates the cached dashboard"""
+    assert client.get("/api/v1/dashboard", headers=auth_headers).json()["totalJobs"] == 0
+    
+    client.post("/api/v1/import_jobs", json={
+        "selectedSources": ["products"],
+        "credentials": {"products": {"apiKey": "test"}}
+    }, headers=auth_headers)
+    
+    assert client.get("/api/v1/dashboard", headers=auth_headers).json()["totalJobs"] == 1
+
+
+def test_dashboard_reads_the_rollup(client, auth_headers, sql_statements):
+    """Test counts come from the user_stats row instead of scanning jobs"""
+    client.post("/api/v1/import_jobs", json={
+        "selectedSources": ["products"],
+        "credentials": {"products": {"apiKey": "test"}}
+    }, headers=auth_headers)
+    
+    sql_statements.clear()
+    data = client.get("/api/v1/dashboard", headers=auth_headers).json()
+    
+    assert data["totalJobs"] == 1
+    assert data["bytesImported"] == 0
+    assert any("FROM user_stats" in s for s in sql_statements)
+    assert not [s for s in sql_statements if "import_jobs" in s]
@@ -0,0 +1,115 @@
+"""Tests for item_controller.py"""
+import pytest
+
+from tests.conftest import TestingSessionLocal
+from app.repositories.item_repository import ItemRepository
+
+
+def _create_items(client, auth_headers):
+    """Create a job for the test user with one product and one cart"""
+    response = client.post("/api/v1/import_jobs", json={
+        "selectedSources": ["products", "carts"],
+        "credentials": {"products": {"apiKey": "test"}, "carts": {"apiKey": "test"}}
+    }, headers=auth_headers)
+    job_id = response.json()["jobId"]
+    
+    db = TestingSessionLocal()
+    try:
+        repo = ItemRepository(db)
+        product = repo.create(job_id, "products", 1, {"id": 1, "title": "Phone", "description": "x" * 500})
+        cart = repo.create(job_id, "carts", 2, {"id": 2, "total": 42.5, "totalProducts": 1, "products": [{"id": 1}]})
+        db.commit()
+        return product.id, cart.id
+    finally:
+        db.close()
+
+
+def test_get_item_unauthenticated(client):
+    """Test reading an item without auth fails"""
+    response = client.get("/api/v1/items/1")
+    assert response.status_code == 401
+
+
+def test_get_item_includes_payload(client, auth_headers):
+    """Test an item is returned with its full payload by default"""
+    product_id, _ = _create_items(client, auth_headers)
+    
+    response = client.get(f"/api/v1/items/{product_id}", headers=auth_headers)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source"] == "products"
+    assert data["remoteId"] == 1
+    assert data["payload"]["title"] == "Phone"
+
+
+def test_get_item_projects_fields(client, auth_headers, sql_statements):
+    """Test fields= returns only those fields and skips loading the payload"""
+    product_id, _ = _create_items(client, auth_headers)
+    
+    sql_statements.clear()
+    response = client.get(f"/api/v1/items/{product_id}?fields=id,status", headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert response.json() == {"id": product_id, "status": "Success"}
+    item_queries = [s for s in sql_statements if "FROM imported_items" in s]
+    assert item_queries and all("payload" not in s for s in item_queries)
+
+
+def test_get_item_unknown_field(client, auth_headers):
+    """Test an unknown field name is rejected"""
+    product_id, _ = _create_items(client, auth_headers)
+    
+    response = client.get(f"/api/v1/items/{product_id}?fields=id,secret", headers=auth_headers)
+    
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+
+def test_get_item_other_user(client, auth_headers):
+    """Test another user's item is not found"""
+    product_id, _ = _create_items(client, auth_headers)
+    
+    client.post("/api/v1/auth/register", json={
+        "email": "other@example.com",
+        "username": "otheruser",
+        "password": "password123"
+    })
+    login_response = client.post("/api/v1/auth/login", json={
+        "username": "otheruser",
+        "password": "password123"
+    })
+    other_headers = {"Authorization": f"Bearer {login_response.json()['accessToken']}"}
+    
+    response = client.get(f"/api/v1/items/{product_id}", headers=other_headers)
+    assert response.status_code == 404
+
+
+def test_list_items_omits_payload_by_default(client, auth_headers, sql_statements):
+    """Test listing items leaves the payload out unless it is requested"""
+    _create_items(client, auth_headers)
+    
+    sql_statements.clear()
+    response = client.get("/api/v1/items", headers=auth_headers)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["remoteId"] for item in data] == [2, 1]
+    assert all("payload" not in item for item in data)
+    assert all("payload" not in s for s in sql_statements if "FROM imported_items" in s)
+    
+    response = client.get("/api/v1/items?fields=remoteId,payload&limit=1", headers=auth_headers)
+    assert response.json() == [{"remoteId": 2, "payload": {"id": 2, "total": 42.5, "totalProducts": 1, "products": [{"id": 1}]}}]
+
+
+def test_dashboard_recent_items_are_summaries(client, auth_headers):
+    """Test the dashboard lists compact items with title/total instead of payloads"""
+    _create_items(client, auth_headers)
+    
+    response = client.get("/api/v1/dashboard", headers=auth_headers)
+    
+    recent = {item["source"]: item for item in response.json()["recentItems"]}
+    assert "payload" not in recent["products"]
+    assert recent["products"]["title"] == "Phone"
+    assert recent["carts"]["total"] == 42.5
+    assert recent["carts"]["itemCount"] == 1
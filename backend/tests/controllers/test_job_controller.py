@@ -1,5 +1,34 @@
 """Tests for job_controller.py"""
+import asyncio
+import json
+import time
+import httpx
 import pytest
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.repositories.job_repository import JobRepository
+from app.repositories.job_source_repository import JobSourceRepository
+from app.controllers.job_controller import _job_event_stream
+from app.database import get_replica_db
+from app.dependencies import get_read_db, get_stream_user
+from app.services.event_broker import get_event_broker, close_event_broker
+from app.services.read_routing import get_read_router, reset_read_router
+from app.main import app
+from tests.conftest import TestingAsyncSessionLocal, TestingSessionLocal
+
+
+def _create_jobs(client, auth_headers, count):
+    """Create count product jobs and return their IDs"""
+    return [
+        client.post("/api/v1/import_jobs", json={
+            "selectedSources": ["products"],
+            "credentials": {"products": {"apiKey": "test"}}
+        }, headers=auth_headers).json()["jobId"]
+        for _ in range(count)
+    ]
 
 
 def test_create_job_unauthenticated(client):
@@ -41,6 +70,30 @@ def test_create_job_missing_credentials(client, auth_headers):
     assert response.status_code == 400
 
 
+def test_create_incremental_job(client, auth_headers):
+    """Test creating a job in incremental mode"""
+    create_response = client.post("/api/v1/import_jobs", json={
+        "selectedSources": ["products"],
+        "credentials": {"products": {"apiKey": "test"}},
+        "mode": "incremental"
+    }, headers=auth_headers)
+    assert create_response.status_code == 201
+    
+    job_id = create_response.json()["jobId"]
+    response = client.get(f"/api/v1/import_jobs/{job_id}", headers=auth_headers)
+    assert response.json()["mode"] == "incremental"
+
+
+def test_create_job_invalid_mode(client, auth_headers):
+    """Test creating job with an unknown mode fails"""
+    response = client.post("/api/v1/import_jobs", json={
+        "selectedSources": ["products"],
+        "credentials": {"products": {"apiKey": "test"}},
+        "mode": "sometimes"
+    }, headers=auth_headers)
+    assert response.status_code == 400
+
+
 def test_get_job_success(client, auth_headers):
     """Test getting a job by ID"""
     # Create job first
@@ -126,6 +179,80 @@ def test_list_jobs_pagination(client, auth_headers):
     assert len(response.json()) == 2
 
 
+def test_list_jobs_cursor_pagination(client, auth_headers, sql_statements):
+    """Test following X-Next-Cursor returns every job once, seeking by key"""
+    job_ids = _create_jobs(client, auth_headers, 5)
+    
+    seen = []
+    params = {"limit": 2}
+    sql_statements.clear()
+    while True:
+        response = client.get("/api/v1/import_jobs", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        seen.extend(job["jobId"] for job in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "cursor": cursor}
+    
+    assert seen == list(reversed(job_ids))
+    # Later pages seek past the cursor key rather than skipping rows
+    listings = [s for s in sql_statements if "FROM import_jobs" in s and "ORDER BY import_jobs.created_at" in s]
+    assert len(listings) == 3
+    assert all("(import_jobs.created_at, import_jobs.id) <" in s for s in listings[1:])
+
+
+def test_list_jobs_last_page_has_no_cursor(client, auth_headers):
+    """Test a page that reaches the end carries no next cursor"""
+    _create_jobs(client, auth_headers, 2)
+    
+    response = client.get("/api/v1/import_jobs", params={"limit": 2}, headers=auth_headers)
+    
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_list_jobs_invalid_cursor(client, auth_headers):
+    """Test malformed cursors and mixing cursor with skip are rejected"""
+    response = client.get("/api/v1/import_jobs", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
+    
+    _create_jobs(client, auth_headers, 2)
+    cursor = client.get("/api/v1/import_jobs", params={"limit": 1}, headers=auth_headers).headers["X-Next-Cursor"]
+    response = client.get("/api/v1/import_jobs", params={"cursor": cursor, "skip": 1}, headers=auth_headers)
+    assert response.status_code == 400
+
+def test_list_jobs_query_count_is_independent_of_page_size(client, auth_headers, sql_statements):
+    """Test listing a bigger page does not run more queries (no per-job progress lookups)"""
+    job_ids = []
+    for i in range(12):
+        response = client.post("/api/v1/import_jobs", json={
+            "selectedSources": ["products", "carts"],
+            "credentials": {"products": {"apiKey": "test"}, "carts": {"apiKey": "test"}}
+        }, headers=auth_headers)
+        job_ids.append(response.json()["jobId"])
+    
+    db = TestingSessionLocal()
+    try:
+        source_repo = JobSourceRepository(db)
+        for job_id in job_ids:
+            source_repo.ensure_sources(job_id, ["products", "carts"])
+            source_repo.save_checkpoint(job_id, "products", 10, 10, inserted=10)
+    finally:
+        db.close()
+    
+    query_counts = {}
+    for limit in (2, 12):
+        sql_statements.clear()
+        response = client.get(f"/api/v1/import_jobs?limit={limit}", headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        assert all(job["progress"]["products"]["completed"] == 10 for job in response.json())
+        query_counts[limit] = len(sql_statements)
+    
+    assert query_counts[2] == query_counts[12]
+
+
 def test_list_jobs_user_isolation(client, auth_headers):
     """Test users only see their own jobs"""
     # Create job with first user
@@ -151,3 +278,342 @@ def test_list_jobs_user_isolation(client, auth_headers):
     response = client.get("/api/v1/import_jobs", headers=other_headers)
     assert response.status_code == 200
     assert len(response.json()) == 0
+
+
+def test_resume_job_requires_failed_status(client, auth_headers):
+    """Test only failed jobs can be resumed"""
+    create_response = client.post("/api/v1/import_jobs", json={
+        "selectedSources": ["products"],
+        "credentials": {"products": {"apiKey": "test"}}
+    }, headers=auth_headers)
+    job_id = create_response.json()["jobId"]
+    
+    response = client.post(f"/api/v1/import_jobs/{job_id}/resume", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_resume_failed_job(client, auth_headers):
+    """Test resuming a failed job puts it back in the queue"""
+    create_response = client.post("/api/v1/import_jobs", json={
+        "selectedSources": ["products"],
+        "credentials": {"products": {"apiKey": "test"}}
+    }, headers=auth_headers)
+    job_id = create_response.json()["jobId"]
+    
+    db = TestingSessionLocal()
+    try:
+        JobRepository(db).update_status(job_id, "Failed", "upstream timeout")
+    finally:
+        db.close()
+    
+    response = client.post(f"/api/v1/import_jobs/{job_id}/resume", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "Pending"
+    
+    job = client.get(f"/api/v1/import_jobs/{job_id}", headers=auth_headers).json()
+    assert job["status"] == "Pending"
+    assert job["error"] is None
+
+
+def test_resume_job_not_found(client, auth_headers):
+    """Test resuming a nonexistent job fails"""
+    response = client.post("/api/v1/import_jobs/99999/resume", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_job_statuses_returns_requested_jobs_with_etag(client, auth_headers):
+    """Test the batch status endpoint returns each requested job and an ETag"""
+    job_ids = _create_jobs(client, auth_headers, 3)
+    
+    response = client.get(
+        "/api/v1/import_jobs/status",
+        params={"ids": f"{job_ids[0]},{job_ids[2]}"},
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"')
+    data = response.json()
+    assert [job["jobId"] for job in data] == [job_ids[0], job_ids[2]]
+    assert data[0]["progress"]["products"]["status"] == "Pending"
+
+
+def test_job_statuses_not_modified(client, auth_headers, sql_statements):
+    """Test an unchanged poll gets a 304 from a single version query"""
+    job_ids = _create_jobs(client, auth_headers, 2)
+    params = {"ids": ",".join(str(job_id) for job_id in job_ids)}
+    etag = client.get("/api/v1/import_jobs/status", params=params, headers=auth_headers).headers["ETag"]
+    
+    sql_statements.clear()
+    response = client.get(
+        "/api/v1/import_jobs/status",
+        params=params,
+        headers={**auth_headers, "If-None-Match": etag}
+    )
+    
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    job_queries = [s for s in sql_statements if "FROM import_jobs" in s]
+    assert len(job_queries) == 1
+    assert "import_job_sources" not in " ".join(sql_statements)
+
+
+def test_job_statuses_etag_changes_with_job(client, auth_headers):
+    """Test a status change produces a new ETag and a full response"""
+    job_id, = _create_jobs(client, auth_headers, 1)
+    params = {"ids": str(job_id)}
+    etag = client.get("/api/v1/import_jobs/status", params=params, headers=auth_headers).headers["ETag"]
+    
+    db = TestingSessionLocal()
+    try:
+        JobRepository(db).update_status(job_id, "Failed", "upstream timeout")
+    finally:
+        db.close()
+    
+    response = client.get(
+        "/api/v1/import_jobs/status",
+        params=params,
+        headers={**auth_headers, "If-None-Match": etag}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["status"] == "Failed"
+
+
+def test_job_statuses_since(client, auth_headers):
+    """Test since returns only jobs changed after a previous updatedAt"""
+    first_id, second_id = _create_jobs(client, auth_headers, 2)
+    since = client.get(f"/api/v1/import_jobs/{second_id}", headers=auth_headers).json()["updatedAt"]
+    
+    db = TestingSessionLocal()
+    try:
+        JobRepository(db).touch(first_id)
+    finally:
+        db.close()
+    
+    response = client.get("/api/v1/import_jobs/status", params={"since": since}, headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert [job["jobId"] for job in response.json()] == [first_id]
+
+
+def test_job_statuses_user_isolation(client, auth_headers):
+    """Test other users' jobs are never returned"""
+    job_id, = _create_jobs(client, auth_headers, 1)
+    client.post("/api/v1/auth/register", json={
+        "email": "other@example.com",
+        "username": "other",
+        "password": "password123"
+    })
+    token = client.post("/api/v1/auth/login", json={
+        "username": "other",
+        "password": "password123"
+    }).json()["accessToken"]
+    
+    response = client.get(
+        "/api/v1/import_jobs/status",
+        params={"ids": str(job_id)},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_job_statuses_invalid_request(client, auth_headers):
+    """Test malformed or missing filters are rejected"""
+    assert client.get("/api/v1/import_jobs/status", headers=auth_headers).status_code == 400
+    assert client.get("/api/v1/import_jobs/status", params={"ids": "1,x"}, headers=auth_headers).status_code == 400
+    too_many = ",".join(str(n) for n in range(1, 102))
+    assert client.get("/api/v1/import_jobs/status", params={"ids": too_many}, headers=auth_headers).status_code == 400
+
+
+async def test_get_job_wait_returns_when_pipeline_publishes(client, auth_headers):
+    """Test a long-poll is released by the job's event, not by the timeout"""
+    job_id, = _create_jobs(client, auth_headers, 1)
+    version = client.get(f"/api/v1/import_jobs/{job_id}", headers=auth_headers).json()["updatedAt"]
+    await close_event_broker()
+    
+    async def change_job():
+        await asyncio.sleep(0.2)
+        db = TestingSessionLocal()
+        try:
+            JobRepository(db).update_status(job_id, "Running")
+        finally:
+            db.close()
+        await get_event_broker().publish(1, {"type": "job", "jobId": job_id, "status": "Running"})
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+        started = time.monotonic()
+        response, _ = await asyncio.gather(
+            async_client.get(
+                f"/api/v1/import_jobs/{job_id}",
+                params={"wait": 10, "version": version},
+                headers=auth_headers
+            ),
+            change_job()
+        )
+        elapsed = time.monotonic() - started
+    await close_event_broker()
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "Running"
+    assert response.json()["updatedAt"] != version
+    assert elapsed < 5
+
+
+def test_get_job_wait_times_out_unchanged(client, auth_headers):
+    """Test a long-poll with no change returns the same version after the wait"""
+    job_id, = _create_jobs(client, auth_headers, 1)
+    version = client.get(f"/api/v1/import_jobs/{job_id}", headers=auth_headers).json()["updatedAt"]
+    
+    started = time.monotonic()
+    response = client.get(
+        f"/api/v1/import_jobs/{job_id}",
+        params={"wait": 0.3, "version": version},
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["updatedAt"] == version
+    assert time.monotonic() - started >= 0.3
+
+
+def test_get_job_wait_returns_immediately_for_stale_version(client, auth_headers):
+    """Test a client behind the current version is answered without waiting"""
+    job_id, = _create_jobs(client, auth_headers, 1)
+    
+    started = time.monotonic()
+    response = client.get(
+        f"/api/v1/import_jobs/{job_id}",
+        params={"wait": 10, "version": "2000-01-01T00:00:00"},
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 200
+    assert time.monotonic() - started < 5
+
+
+def test_get_job_wait_is_capped(client, auth_headers):
+    """Test waits beyond the configured maximum are rejected"""
+    job_id, = _create_jobs(client, auth_headers, 1)
+    response = client.get(f"/api/v1/import_jobs/{job_id}", params={"wait": 3600}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_event_stream_requires_token(client):
+    """Test the event stream rejects unauthenticated clients"""
+    response = client.get("/api/v1/import_jobs/events")
+    assert response.status_code == 401
+    
+    response = client.get("/api/v1/import_jobs/events?token=not-a-token")
+    assert response.status_code == 401
+
+
+def test_event_stream_rejects_access_token_in_query(client, auth_headers):
+    """Test the long-lived access token is not accepted in the stream URL"""
+    access_token = auth_headers["Authorization"].split(" ", 1)[1]
+    response = client.get("/api/v1/import_jobs/events", params={"token": access_token})
+    assert response.status_code == 401
+
+
+def test_stream_token_is_scoped_to_the_event_stream(client, auth_headers, async_session_factory):
+    """Test a stream token opens the event stream but cannot call the rest of the API"""
+    response = client.post("/api/v1/import_jobs/events/token", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["expiresIn"] == 60
+    
+    stream_headers = {"Authorization": f"Bearer {data['token']}"}
+    assert client.get("/api/v1/import_jobs", headers=stream_headers).status_code == 401
+    
+    async def stream_user():
+        async with async_session_factory() as db:
+            return await get_stream_user(token=data["token"], credentials=None, db=db)
+    
+    assert asyncio.run(stream_user()).username == "testuser"
+
+
+async def test_event_stream_forwards_the_users_events():
+    """Test published job events are written to the stream as SSE messages"""
+    await close_event_broker()
+    request = Mock(is_disconnected=AsyncMock(return_value=False))
+    stream = _job_event_stream(request, user_id=1)
+    try:
+        assert await anext(stream) == "retry: 3000\n\n"
+        
+        broker = get_event_broker()
+        await broker.publish(2, {"type": "job", "jobId": 9, "status": "Running"})
+        await broker.publish(1, {"type": "progress", "jobId": 4, "source": "products", "completed": 10})
+        message = await asyncio.wait_for(anext(stream), timeout=1)
+        
+        event_line, data_line = message.strip().split("\n")
+        assert event_line == "event: progress"
+        assert json.loads(data_line[len("data: "):]) == {
+            "type": "progress", "jobId": 4, "source": "products", "completed": 10
+        }
+    finally:
+        await stream.aclose()
+        await close_event_broker()
+
+
+async def test_event_stream_sends_heartbeats(monkeypatch):
+    """Test an idle stream emits keepalive comments"""
+    monkeypatch.setattr("app.controllers.job_controller.settings.event_stream_heartbeat_seconds", 0.01)
+    request = Mock(is_disconnected=AsyncMock(side_effect=[False, True]))
+    
+    messages = [message async for message in _job_event_stream(request, user_id=1)]
+    
+    assert messages == ["retry: 3000\n\n", ": keepalive\n\n"]
+
+
+@pytest.fixture
+def replica_statements():
+    """Serve the replica dependency from its own engine on the test database and record its SQL"""
+    replica_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+    ReplicaSession = async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    statements = []
+    event.listen(
+        replica_engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    
+    async def override_get_replica_db():
+        async with ReplicaSession() as db:
+            yield db
+    
+    app.dependency_overrides[get_replica_db] = override_get_replica_db
+    yield statements
+
+
+async def test_replica_reads_release_the_primary_connection(test_db):
+    """Test routing a read to the replica returns the connection authentication took on the primary"""
+    reset_read_router()
+    async with TestingAsyncSessionLocal() as primary, TestingAsyncSessionLocal() as replica:
+        await primary.execute(text("SELECT 1"))
+        assert primary.in_transaction()
+        
+        assert await get_read_db(Mock(id=1), replica, primary) is replica
+        assert not primary.in_transaction()
+
+
+def test_reads_go_to_replica_except_right_after_a_write(client, auth_headers, replica_statements, sql_statements):
+    """Test polling reads use the replica, but the user's reads just after creating a job use the primary"""
+    job_id = _create_jobs(client, auth_headers, 1)[0]
+    
+    # Read-your-writes: the new job is read back from the primary
+    response = client.get("/api/v1/import_jobs", headers=auth_headers)
+    assert [job["jobId"] for job in response.json()] == [job_id]
+    assert replica_statements == []
+    
+    # Once the window has passed, polling reads touch only the replica
+    get_read_router()._primary_until.clear()
+    sql_statements.clear()
+    for path in ("/api/v1/import_jobs", f"/api/v1/import_jobs/{job_id}", "/api/v1/dashboard"):
+        assert client.get(path, headers=auth_headers).status_code == 200
+    assert any("FROM import_jobs" in s for s in replica_statements)
+    assert any("FROM user_stats" in s for s in replica_statements)
+    assert sql_statements == []
@@ -0,0 +1,61 @@
+"""Tests for dashboard_repository.py"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.repositories.dashboard_repository import DashboardRepository, AsyncDashboardRepository
+from app.repositories.item_repository import ItemRepository
+from app.repositories.job_repository import JobRepository
+from app.models import User
+
+
+@pytest.fixture
+def users(db_session):
+    """Create two users"""
+    users = [
+        User(email=f"user{n}@example.com", username=f"user{n}", hashed_password="hashed")
+        for n in range(2)
+    ]
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+
+def test_get_counts_groups_jobs_and_items(db_session, users):
+    """Test job statuses and item sources are counted for the user only"""
+    user, other = users
+    jobs = JobRepository(db_session)
+    items = ItemRepository(db_session)
+    
+    completed = jobs.create(user.id, ["products", "carts"], {})
+    jobs.update_status(completed.id, "Completed")
+    failed = jobs.create(user.id, ["products"], {})
+    jobs.update_status(failed.id, "Failed", "boom")
+    jobs.create(user.id, ["products"], {})
+    other_job = jobs.create(other.id, ["products"], {})
+    
+    items.upsert(user.id, completed.id, "products", [{"id": n} for n in range(3)])
+    items.upsert(user.id, completed.id, "carts", [{"id": 1}])
+    items.upsert(other.id, other_job.id, "products", [{"id": 1}])
+    
+    assert DashboardRepository(db_session).get_counts(user.id) == {
+        "jobs": {"Completed": 1, "Failed": 1, "Pending": 1},
+        "items": {"products": 3, "carts": 1}
+    }
+
+
+def test_get_counts_for_user_without_history(db_session, users):
+    """Test a new user gets empty counts"""
+    assert DashboardRepository(db_session).get_counts(users[0].id) == {"jobs": {}, "items": {}}
+
+
+async def test_async_repository_matches_sync(db_session, users, async_session_factory):
+    """Test the async repository returns the same counts"""
+    JobRepository(db_session).create(users[0].id, ["products"], {})
+    
+    async with async_session_factory() as db:
+        counts = await AsyncDashboardRepository(db).get_counts(users[0].id)
+    
+    assert counts == DashboardRepository(db_session).get_counts(users[0].id)
@@ -0,0 +1,96 @@
+"""Tests for database.py engine profiles"""
+import pytest
+import sys
+from pathlib import Path
+
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+from app.database import create_async_db_engine, create_db_engine, engine_options, engine_profile
+
+
+def _pragmas(connection) -> dict:
+    """Read back the pragmas the sqlite profile sets"""
+    return {
+        name: connection.execute(text(f"PRAGMA {name}")).scalar()
+        for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size")
+    }
+
+
+def test_auto_profile_follows_the_backend(monkeypatch):
+    """Test "auto" picks the profile matching the URL"""
+    monkeypatch.setattr(settings, "db_engine_profile", "auto")
+    
+    assert engine_profile("sqlite:///./x.db") == "sqlite"
+    assert engine_profile("postgresql://user@localhost/db") == "postgres"
+    assert engine_profile("postgresql+asyncpg://user@localhost/db") == "postgres"
+
+
+def test_unknown_profile(monkeypatch):
+    """Test a misspelled profile is rejected"""
+    monkeypatch.setattr(settings, "db_engine_profile", "fast")
+    
+    with pytest.raises(ValueError):
+        engine_profile("sqlite:///./x.db")
+
+
+def test_sqlite_profile_sets_pragmas(tmp_path, monkeypatch):
+    """Test every sqlite connection gets WAL and the tuned pragmas"""
+    monkeypatch.setattr(settings, "db_engine_profile", "sqlite")
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    try:
+        with engine.connect() as connection:
+            pragmas = _pragmas(connection)
+    finally:
+        engine.dispose()
+    
+    assert pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "cache_size": -settings.sqlite_cache_size_kib,
+        "mmap_size": settings.sqlite_mmap_size_bytes
+    }
+
+
+async def test_sqlite_profile_applies_to_async_engines(tmp_path, monkeypatch):
+    """Test aiosqlite connections get the same pragmas"""
+    monkeypatch.setattr(settings, "db_engine_profile", "sqlite")
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}")
+    try:
+        async with engine.connect() as connection:
+            pragmas = await connection.run_sync(lambda sync_connection: _pragmas(sync_connection))
+    finally:
+        await engine.dispose()
+    
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["busy_timeout"] == settings.sqlite_busy_timeout_ms
+
+
+def test_default_profile_keeps_stock_settings(tmp_path, monkeypatch):
+    """Test the default profile leaves SQLite in rollback-journal mode"""
+    monkeypatch.setattr(settings, "db_engine_profile", "default")
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    finally:
+        engine.dispose()
+
+
+def test_postgres_profile_pool_options(monkeypatch):
+    """Test the postgres profile sizes the pool and statement caches from settings"""
+    monkeypatch.setattr(settings, "db_engine_profile", "auto")
+    
+    options = engine_options("postgresql://user@localhost/db")
+    async_options = engine_options("postgresql+asyncpg://user@localhost/db", is_async=True)
+    
+    assert options["pool_size"] == settings.db_pool_size
+    assert options["max_overflow"] == settings.db_max_overflow
+    assert options["pool_pre_ping"] is settings.db_pool_pre_ping
+    assert options["pool_recycle"] == settings.db_pool_recycle_seconds
+    assert options["query_cache_size"] == settings.db_compiled_cache_size
+    assert "connect_args" not in options
+    assert async_options["connect_args"] == {"prepared_statement_cache_size": settings.db_statement_cache_size}
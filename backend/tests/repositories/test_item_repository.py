@@ -1,12 +1,20 @@
 """Tests for item_repository.py"""
+import os
 import pytest
 import sys
 from pathlib import Path
 
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.repositories.item_repository import ItemRepository
-from app.models import User, ImportJob
+from app.database import Base, to_async_url
+from app.repositories.item_repository import AsyncItemRepository, ItemRepository, UpsertResult, content_hash, supports_copy
+from app.repositories.user_stats_repository import UserStatsRepository
+from app.models import User, ImportJob, ImportedItem
 
 
 @pytest.fixture
@@ -140,3 +148,219 @@ def test_get_recent_items_ordering(db_session, test_user_obj, test_job):
     assert items[0].remote_id == 3
     assert items[1].remote_id == 2
     assert items[2].remote_id == 1
+
+
+def test_create_item_derives_owner_from_job(db_session, test_user_obj, test_job):
+    """Test items belong to the job's user and store a content hash"""
+    repo = ItemRepository(db_session)
+    
+    item = repo.create(test_job.id, "products", 1, {"b": 2, "a": 1})
+    db_session.commit()
+    
+    assert item.user_id == test_user_obj.id
+    assert item.content_hash == content_hash({"a": 1, "b": 2})
+
+
+def test_upsert_inserts_new_records(db_session, test_user_obj, test_job):
+    """Test a chunk of new records is inserted"""
+    repo = ItemRepository(db_session)
+    
+    records = [{"id": i, "title": f"Product {i}"} for i in range(1, 6)]
+    result = repo.upsert(test_user_obj.id, test_job.id, "products", records)
+    
+    assert result == UpsertResult(inserted=5, updated=0, unchanged=0)
+    assert repo.count_by_job_and_source(test_job.id, "products") == 5
+    items = repo.get_recent(test_user_obj.id, limit=10)
+    assert sorted(item.remote_id for item in items) == [1, 2, 3, 4, 5]
+    assert all(item.status == "Success" for item in items)
+
+
+def test_upsert_skips_unchanged_and_updates_changed(db_session, test_user_obj, test_job):
+    """Test re-importing only writes records whose payload changed"""
+    repo = ItemRepository(db_session)
+    repo.upsert(test_user_obj.id, test_job.id, "products", [{"id": 1, "price": 10}, {"id": 2, "price": 20}])
+    
+    second_job = ImportJob(user_id=test_user_obj.id, selected_sources=["products"], credentials={}, status="Running")
+    db_session.add(second_job)
+    db_session.commit()
+    
+    result = repo.upsert(
+        test_user_obj.id,
+        second_job.id,
+        "products",
+        [{"id": 1, "price": 10}, {"id": 2, "price": 25}, {"id": 3, "price": 30}]
+    )
+    db_session.expire_all()
+    
+    assert result == UpsertResult(inserted=1, updated=1, unchanged=1)
+    assert repo.count_by_source_and_user(test_user_obj.id, "products") == 3
+    items = {item.remote_id: item for item in repo.get_recent(test_user_obj.id, limit=10)}
+    assert items[1].job_id == test_job.id
+    assert items[2].job_id == second_job.id
+    assert items[2].payload == {"id": 2, "price": 25}
+
+
+def test_upsert_is_scoped_per_user(db_session, test_user_obj, test_job):
+    """Test the same remote record imported by two users is stored for each"""
+    repo = ItemRepository(db_session)
+    other_user = User(email="other@example.com", username="other", hashed_password="h")
+    db_session.add(other_user)
+    db_session.commit()
+    other_job = ImportJob(user_id=other_user.id, selected_sources=["products"], credentials={}, status="Running")
+    db_session.add(other_job)
+    db_session.commit()
+    
+    repo.upsert(test_user_obj.id, test_job.id, "products", [{"id": 1}])
+    result = repo.upsert(other_user.id, other_job.id, "products", [{"id": 1}])
+    
+    assert result.inserted == 1
+    assert repo.count_by_source_and_user(other_user.id, "products") == 1
+
+
+def test_upsert_repeated_record_in_chunk(db_session, test_user_obj, test_job):
+    """Test a record repeated within one chunk is written once, last copy winning"""
+    repo = ItemRepository(db_session)
+    
+    result = repo.upsert(test_user_obj.id, test_job.id, "products", [{"id": 1, "v": 1}, {"id": 1, "v": 2}])
+    
+    assert result == UpsertResult(inserted=1, updated=0, unchanged=1)
+    assert repo.get_recent(test_user_obj.id)[0].payload == {"id": 1, "v": 2}
+
+
+def test_upsert_empty(db_session, test_user_obj, test_job):
+    """Test upserting no records is a no-op"""
+    repo = ItemRepository(db_session)
+    
+    assert repo.upsert(test_user_obj.id, test_job.id, "products", []) == UpsertResult()
+    assert repo.count_by_job_and_source(test_job.id, "products") == 0
+
+
+def test_get_recent_defers_payload(db_session, test_user_obj, test_job):
+    """Test recent items only load the payload when it is asked for"""
+    repo = ItemRepository(db_session)
+    user_id = test_user_obj.id
+    repo.create(test_job.id, "products", 1, {"id": 1, "title": "Phone"})
+    db_session.commit()
+    db_session.expunge_all()
+    
+    item = repo.get_recent(user_id, fields=["id", "remote_id"])[0]
+    assert "payload" not in item.__dict__
+    assert item.remote_id == 1
+    
+    db_session.expunge_all()
+    item = repo.get_recent(user_id, fields=["id", "payload"])[0]
+    assert item.__dict__["payload"] == {"id": 1, "title": "Phone"}
+
+
+def test_get_recent_unknown_field(db_session, test_user_obj):
+    """Test projecting to an unknown column is rejected"""
+    with pytest.raises(ValueError):
+        ItemRepository(db_session).get_recent(test_user_obj.id, fields=["hashed_password"])
+
+
+def test_get_for_user(db_session, test_user_obj, test_job):
+    """Test fetching one item is scoped to its owner"""
+    repo = ItemRepository(db_session)
+    item = repo.create(test_job.id, "products", 1, {"id": 1})
+    db_session.commit()
+    
+    assert repo.get_for_user(test_user_obj.id, item.id).payload == {"id": 1}
+    assert repo.get_for_user(test_user_obj.id + 1, item.id) is None
+
+
+def test_get_recent_summaries(db_session, test_user_obj, test_job):
+    """Test summaries carry the product title and cart total without the payload"""
+    repo = ItemRepository(db_session)
+    repo.create(test_job.id, "products", 1, {"id": 1, "title": "Phone", "description": "long"})
+    repo.create(test_job.id, "carts", 2, {"id": 2, "total": 19.5, "totalProducts": 3})
+    db_session.commit()
+    
+    cart, product = repo.get_recent_summaries(test_user_obj.id)
+    
+    assert (product.remote_id, product.title, product.total) == (1, "Phone", None)
+    assert (cart.remote_id, cart.title, cart.total, cart.item_count) == (2, None, 19.5, 3)
+    assert not hasattr(product, "payload")
+
+
+def test_supports_copy_by_driver():
+    """Test COPY is only used on Postgres drivers that expose it"""
+    assert supports_copy(sqlite.dialect()) is False
+    assert supports_copy(postgresql.asyncpg.dialect()) is True
+    assert supports_copy(postgresql.psycopg2.dialect()) is True
+    assert supports_copy(postgresql.pg8000.dialect()) is False
+
+
+def test_upsert_copy_falls_back_on_sqlite(db_session, test_user_obj, test_job):
+    """Test a chunk over the COPY threshold is written with the multi-row INSERT on SQLite"""
+    repo = ItemRepository(db_session)
+    records = [{"id": i, "title": f"Product {i}"} for i in range(1, 6)]
+    
+    assert repo.upsert(test_user_obj.id, test_job.id, "products", records, copy_min_rows=1) == UpsertResult(inserted=5)
+    records[0]["title"] = "changed"
+    assert repo.upsert(test_user_obj.id, test_job.id, "products", records, copy_min_rows=1) == UpsertResult(updated=1, unchanged=4)
+
+
+@pytest.fixture
+def postgres_engine():
+    """A Postgres schema from TEST_POSTGRES_URL, for the COPY path"""
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def _seed_job(db) -> tuple:
+    """Create a user and job on a fresh database"""
+    user = User(email="copy@example.com", username="copy", hashed_password="x")
+    db.add(user)
+    db.commit()
+    job = ImportJob(user_id=user.id, selected_sources=["products"], credentials={}, status="Running")
+    db.add(job)
+    db.commit()
+    return user.id, job.id
+
+
+def test_upsert_copy_on_postgres(postgres_engine):
+    """Test the COPY path (CSV through psycopg2) inserts, updates and skips like the INSERT path"""
+    db = sessionmaker(bind=postgres_engine)()
+    try:
+        user_id, job_id = _seed_job(db)
+        repo = ItemRepository(db)
+        records = [{"id": i, "title": f"Product \"{i}\", with, commas"} for i in range(1, 6)]
+        
+        assert repo.upsert(user_id, job_id, "products", records, copy_min_rows=1) == UpsertResult(inserted=5)
+        records[0]["title"] = "changed"
+        assert repo.upsert(user_id, job_id, "products", records, copy_min_rows=1) == UpsertResult(updated=1, unchanged=4)
+        
+        stored = dict(db.query(ImportedItem.remote_id, ImportedItem.payload).filter(ImportedItem.user_id == user_id))
+        assert stored[1] == {"id": 1, "title": "changed"}
+        assert stored[2] == records[1]
+        assert repo.count_by_source_and_user(user_id, "products") == 5
+        assert UserStatsRepository(db).verify(user_id) == {}
+    finally:
+        db.close()
+
+
+async def test_upsert_copy_on_postgres_asyncpg(postgres_engine):
+    """Test the binary COPY path through asyncpg"""
+    url = postgres_engine.url.render_as_string(hide_password=False)
+    with sessionmaker(bind=postgres_engine)() as db:
+        user_id, job_id = _seed_job(db)
+    
+    async_engine = create_async_engine(to_async_url(url))
+    try:
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            repo = AsyncItemRepository(db)
+            records = [{"id": i, "title": f"Product {i}"} for i in range(1, 1001)]
+            
+            result = await repo.upsert(user_id, job_id, "products", records, copy_min_rows=100)
+            
+            assert result == UpsertResult(inserted=1000)
+            assert await repo.count_by_source_and_user(user_id, "products") == 1000
+    finally:
+        await async_engine.dispose()
@@ -5,7 +5,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.repositories.job_repository import JobRepository
+from app.repositories.job_repository import JobRepository, AsyncJobRepository
 from app.models import User
 
 
@@ -88,6 +88,26 @@ def test_list_jobs_pagination(db_session, test_user_obj):
     assert len(jobs) == 2
 
 
+def test_list_jobs_keyset_pages(db_session, test_user_obj):
+    """Test seeking after (created_at, id) walks every job once, even with equal timestamps"""
+    repo = JobRepository(db_session)
+    jobs = [repo.create(test_user_obj.id, ["products"], {}) for _ in range(5)]
+    # Two jobs created in the same instant must still be ordered and paged by id
+    jobs[3].created_at = jobs[2].created_at
+    db_session.commit()
+    
+    seen = []
+    after = None
+    while True:
+        page = repo.list_jobs(test_user_obj.id, limit=2, after=after)
+        if not page:
+            break
+        seen.extend(job.id for job in page)
+        after = (page[-1].created_at, page[-1].id)
+    
+    expected = sorted(jobs, key=lambda job: (job.created_at, job.id), reverse=True)
+    assert seen == [job.id for job in expected]
+
 def test_update_job(db_session, test_user_obj):
     """Test updating job status"""
     repo = JobRepository(db_session)
@@ -138,3 +158,136 @@ def test_count_all_jobs(db_session, test_user_obj):
     
     count = repo.count_all(test_user_obj.id)
     assert count == 2
+
+
+def test_claim_next_leases_oldest_pending_job(db_session, test_user_obj):
+    """Test workers claim jobs in creation order and never share one"""
+    repo = JobRepository(db_session)
+    
+    first = repo.create(test_user_obj.id, ["products"], {})
+    second = repo.create(test_user_obj.id, ["carts"], {})
+    
+    claimed_a = repo.claim_next("worker-a", lease_seconds=60)
+    claimed_b = repo.claim_next("worker-b", lease_seconds=60)
+    
+    assert claimed_a.id == first.id
+    assert claimed_a.lease_owner == "worker-a"
+    assert claimed_a.attempts == 1
+    assert claimed_b.id == second.id
+    assert repo.claim_next("worker-c", lease_seconds=60) is None
+
+
+def test_claim_next_skips_finished_jobs(db_session, test_user_obj):
+    """Test completed and failed jobs are never claimed"""
+    repo = JobRepository(db_session)
+    
+    done = repo.create(test_user_obj.id, ["products"], {})
+    failed = repo.create(test_user_obj.id, ["products"], {})
+    repo.update_status(done.id, "Completed")
+    repo.update_status(failed.id, "Failed", "boom")
+    
+    assert repo.claim_next("worker-a", lease_seconds=60) is None
+
+
+def test_expired_lease_can_be_reclaimed(db_session, test_user_obj):
+    """Test a job whose worker stopped renewing is picked up again"""
+    repo = JobRepository(db_session)
+    
+    job = repo.create(test_user_obj.id, ["products"], {})
+    assert repo.claim(job.id, "dead-worker", lease_seconds=-1)
+    
+    reclaimed = repo.claim_next("worker-b", lease_seconds=60)
+    
+    assert reclaimed.id == job.id
+    assert reclaimed.lease_owner == "worker-b"
+    assert reclaimed.attempts == 2
+    assert not repo.renew_lease(job.id, "dead-worker", lease_seconds=60)
+
+
+def test_claim_respects_live_lease(db_session, test_user_obj):
+    """Test a specific job cannot be claimed while another worker holds it"""
+    repo = JobRepository(db_session)
+    
+    job = repo.create(test_user_obj.id, ["products"], {})
+    
+    assert repo.claim(job.id, "worker-a", lease_seconds=60)
+    assert not repo.claim(job.id, "worker-b", lease_seconds=60)
+    assert repo.renew_lease(job.id, "worker-a", lease_seconds=60)
+    
+    repo.release_lease(job.id, "worker-a")
+    assert repo.claim(job.id, "worker-b", lease_seconds=60)
+
+
+def test_job_out_of_attempts_is_failed_not_reclaimed(db_session, test_user_obj):
+    """Test a job whose workers keep dying is failed once it has been leased max_attempts times"""
+    repo = JobRepository(db_session)
+    
+    job = repo.create(test_user_obj.id, ["products"], {})
+    assert repo.claim(job.id, "dead-worker-1", lease_seconds=-1, max_attempts=2)
+    assert repo.claim(job.id, "dead-worker-2", lease_seconds=-1, max_attempts=2)
+    
+    assert repo.claim_next("worker-b", lease_seconds=60, max_attempts=2) is None
+    assert not repo.claim(job.id, "worker-b", lease_seconds=60, max_attempts=2)
+    assert repo.fail_exhausted(2) == [(job.id, test_user_obj.id)]
+    assert repo.fail_exhausted(2) == []
+    
+    db_session.refresh(job)
+    assert job.status == "Failed"
+    assert job.error_message == "Gave up after 2 attempts"
+    assert repo.count_by_status(test_user_obj.id, "Failed") == 1
+
+
+def test_requeue_resets_attempts(db_session, test_user_obj):
+    """Test a resumed job gets a fresh set of attempts"""
+    repo = JobRepository(db_session)
+    
+    job = repo.create(test_user_obj.id, ["products"], {})
+    assert repo.claim(job.id, "dead-worker", lease_seconds=-1, max_attempts=1)
+    repo.fail_exhausted(1)
+    repo.requeue(job.id)
+    
+    claimed = repo.claim_next("worker-b", lease_seconds=60, max_attempts=1)
+    assert claimed.id == job.id
+    assert claimed.attempts == 1
+
+
+def test_get_versions_filters_by_ids_and_since(db_session, test_user_obj):
+    """Test job versions are scoped to the user, the requested IDs and the since cutoff"""
+    repo = JobRepository(db_session)
+    
+    first = repo.create(test_user_obj.id, ["products"], {})
+    second = repo.create(test_user_obj.id, ["carts"], {})
+    cutoff = second.updated_at
+    repo.touch(first.id)
+    
+    assert [job_id for job_id, _ in repo.get_versions(test_user_obj.id)] == [first.id, second.id]
+    assert [job_id for job_id, _ in repo.get_versions(test_user_obj.id, [second.id])] == [second.id]
+    assert [job_id for job_id, _ in repo.get_versions(test_user_obj.id, since=cutoff)] == [first.id]
+    assert repo.get_versions(test_user_obj.id + 1) == []
+
+
+def test_lease_renewal_does_not_change_version(db_session, test_user_obj):
+    """Test lease bookkeeping leaves updated_at alone so polling clients see no change"""
+    repo = JobRepository(db_session)
+    
+    job = repo.create(test_user_obj.id, ["products"], {})
+    (_, before), = repo.get_versions(test_user_obj.id, [job.id])
+    
+    assert repo.claim(job.id, "worker-a", lease_seconds=60)
+    assert repo.renew_lease(job.id, "worker-a", lease_seconds=60)
+    repo.release_lease(job.id, "worker-a")
+    
+    assert repo.get_versions(test_user_obj.id, [job.id]) == [(job.id, before)]
+
+
+async def test_async_repository_matches_sync(db_session, test_user_obj, async_session_factory):
+    """Test the async variant runs the same queries through the asyncio driver"""
+    async with async_session_factory() as session:
+        repo = AsyncJobRepository(session)
+        
+        job = await repo.create(test_user_obj.id, ["products"], {})
+        await repo.update_status(job.id, "Completed")
+        
+        assert (await repo.get_by_id(job.id)).status == "Completed"
+        assert await repo.count_by_status(test_user_obj.id, "Completed") == 1
+        assert [j.id for j in await repo.list_jobs(test_user_obj.id)] == [job.id]
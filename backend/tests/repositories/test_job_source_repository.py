@@ -0,0 +1,79 @@
+"""Tests for job_source_repository.py"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.repositories.job_source_repository import JobSourceRepository
+from app.models import User, ImportJob
+
+
+@pytest.fixture
+def test_job(db_session):
+    """Create a job for a test user"""
+    user = User(email="test@example.com", username="testuser", hashed_password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    job = ImportJob(user_id=user.id, selected_sources=["products", "carts"], credentials={}, status="Pending")
+    db_session.add(job)
+    db_session.commit()
+    db_session.refresh(job)
+    return job
+
+
+def test_ensure_sources_creates_rows_at_zero(db_session, test_job):
+    """Test every source starts with an empty checkpoint"""
+    repo = JobSourceRepository(db_session)
+    
+    states = repo.ensure_sources(test_job.id, ["products", "carts"])
+    
+    assert set(states) == {"products", "carts"}
+    assert all(state.checkpoint_offset == 0 for state in states.values())
+    assert all(state.checkpoint_remote_id is None for state in states.values())
+
+
+def test_ensure_sources_keeps_existing_checkpoints(db_session, test_job):
+    """Test re-running a job does not reset its checkpoints"""
+    repo = JobSourceRepository(db_session)
+    repo.ensure_sources(test_job.id, ["products"])
+    repo.save_checkpoint(test_job.id, "products", 20, 20)
+    
+    states = repo.ensure_sources(test_job.id, ["products", "carts"])
+    
+    assert states["products"].checkpoint_offset == 20
+    assert states["carts"].checkpoint_offset == 0
+
+
+def test_save_checkpoint(db_session, test_job):
+    """Test a checkpoint records offset and last remote id"""
+    repo = JobSourceRepository(db_session)
+    repo.ensure_sources(test_job.id, ["carts"])
+    
+    repo.save_checkpoint(test_job.id, "carts", 15, 42)
+    db_session.expire_all()
+    
+    state = repo.get(test_job.id, "carts")
+    assert state.checkpoint_offset == 15
+    assert state.checkpoint_remote_id == 42
+
+
+def test_get_baseline_is_latest_completed_job(db_session, test_job):
+    """Test the baseline is the user's most recent completed job covering the source"""
+    repo = JobSourceRepository(db_session)
+    older = ImportJob(user_id=test_job.user_id, selected_sources=["products"], credentials={}, status="Completed")
+    failed = ImportJob(user_id=test_job.user_id, selected_sources=["products"], credentials={}, status="Failed")
+    db_session.add_all([older, failed])
+    db_session.commit()
+    for job, max_remote_id in ((older, 30), (failed, 50)):
+        repo.ensure_sources(job.id, ["products"])
+        repo.save_checkpoint(job.id, "products", max_remote_id, max_remote_id, max_remote_id=max_remote_id)
+    
+    latest = ImportJob(user_id=test_job.user_id, selected_sources=["products"], credentials={}, status="Pending")
+    db_session.add(latest)
+    db_session.commit()
+    
+    baseline = repo.get_baseline(test_job.user_id, "products", latest.id)
+    assert baseline.job_id == older.id
+    assert baseline.max_remote_id == 30
+    assert repo.get_baseline(test_job.user_id, "carts", latest.id) is None
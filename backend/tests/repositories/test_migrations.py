@@ -0,0 +1,107 @@
+"""Tests for migrations.py"""
+import json
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrations import LATEST_VERSION, current_version, migrate
+
+# The tables as the original schema created them
+BASELINE_DDL = [
+    """CREATE TABLE users (
+        id INTEGER NOT NULL PRIMARY KEY, email VARCHAR(255) NOT NULL UNIQUE,
+        username VARCHAR(100) NOT NULL UNIQUE, hashed_password VARCHAR(255) NOT NULL,
+        is_active BOOLEAN NOT NULL, created_at DATETIME
+    )""",
+    """CREATE TABLE import_jobs (
+        id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES users (id),
+        status VARCHAR(50) NOT NULL, selected_sources JSON NOT NULL, credentials JSON,
+        error_message TEXT, created_at DATETIME, updated_at DATETIME
+    )""",
+    "CREATE INDEX ix_import_jobs_user_id ON import_jobs (user_id)",
+    """CREATE TABLE imported_items (
+        id INTEGER NOT NULL PRIMARY KEY, job_id INTEGER NOT NULL REFERENCES import_jobs (id),
+        source VARCHAR(50) NOT NULL, remote_id INTEGER NOT NULL, payload JSON NOT NULL,
+        status VARCHAR(50) NOT NULL, created_at DATETIME
+    )""",
+    "CREATE INDEX ix_imported_items_job_id ON imported_items (job_id)",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """An empty SQLite database file"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_fresh_database_is_stamped_latest(engine):
+    """Test a new database is built from the models without running migrations"""
+    assert migrate(engine) == LATEST_VERSION
+    
+    with engine.connect() as connection:
+        assert current_version(connection) == LATEST_VERSION
+    index_names = {index["name"] for index in inspect(engine).get_indexes("imported_items")}
+    assert {"ix_imported_items_job_source", "ix_imported_items_user_created"} <= index_names
+
+
+def test_baseline_database_is_upgraded(engine):
+    """Test a database from the original schema is migrated with its data intact"""
+    with engine.begin() as connection:
+        for statement in BASELINE_DDL:
+            connection.execute(text(statement))
+        connection.execute(text(
+            "INSERT INTO users VALUES (1, 'a@example.com', 'a', 'x', 1, '2024-01-01 00:00:00')"
+        ))
+        connection.execute(
+            text("INSERT INTO import_jobs VALUES (1, 1, 'Completed', :sources, '{}', NULL, :at, :at)"),
+            {"sources": json.dumps(["products"]), "at": "2024-01-01 00:00:00"}
+        )
+        # The original schema allowed the same record twice; the newest copy is kept
+        for item_id, remote_id, title in ((1, 1, "old"), (2, 2, "b"), (3, 1, "new")):
+            connection.execute(
+                text("INSERT INTO imported_items VALUES (:id, 1, 'products', :remote_id, :payload, 'Success', :at)"),
+                {
+                    "id": item_id,
+                    "remote_id": remote_id,
+                    "payload": json.dumps({"id": remote_id, "title": title}),
+                    "at": "2024-01-01 00:00:00"
+                }
+            )
+    
+    assert migrate(engine) == LATEST_VERSION
+    
+    with engine.connect() as connection:
+        items = connection.execute(text(
+            "SELECT id, user_id, content_hash IS NOT NULL FROM imported_items ORDER BY id"
+        )).all()
+        job = connection.execute(text("SELECT mode, attempts FROM import_jobs")).one()
+        sources = connection.execute(text(
+            "SELECT source, status, checkpoint_offset FROM import_job_sources"
+        )).all()
+        stats = connection.execute(text(
+            "SELECT jobs_total, jobs_completed, items_products FROM user_stats WHERE user_id = 1"
+        )).one()
+    
+    assert items == [(2, 1, 1), (3, 1, 1)]
+    assert tuple(job) == ("full", 0)
+    assert sources == [("products", "Completed", 2)]
+    assert tuple(stats) == (1, 1, 2)
+    index_names = {index["name"] for index in inspect(engine).get_indexes("imported_items")}
+    assert "ix_imported_items_job_id" not in index_names
+    assert "uq_imported_items_user_source_remote" in index_names
+
+
+def test_migrate_is_a_no_op_when_current(engine):
+    """Test running migrations again changes nothing"""
+    migrate(engine)
+    
+    assert migrate(engine) == LATEST_VERSION
+    with engine.connect() as connection:
+        versions = connection.execute(text("SELECT COUNT(*) FROM schema_version")).scalar()
+    assert versions == len(range(1, LATEST_VERSION + 1))
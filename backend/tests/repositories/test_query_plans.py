@@ -0,0 +1,229 @@
+"""Query-plan regression tests: no repository query may fall back to a full table scan
+
+Every public method of every repository is run against seeded data while its SQL is
+captured, and each SELECT/UPDATE/DELETE is EXPLAINed. SQLite always runs; set
+TEST_POSTGRES_URL to also check Postgres (with sequential scans disabled, so the planner
+reports a Seq Scan only when no index can serve the query).
+"""
+import inspect
+import json
+import os
+import re
+import pytest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import ImportedItem, User
+from app.repositories import (
+    DashboardRepository,
+    ItemRepository,
+    JobRepository,
+    JobSourceRepository,
+    UserStatsRepository
+)
+from app.repositories.user_repository import UserRepository
+from tests.conftest import engine as sqlite_engine
+
+REPOSITORIES = [
+    DashboardRepository,
+    ItemRepository,
+    JobRepository,
+    JobSourceRepository,
+    UserRepository,
+    UserStatsRepository
+]
+
+# Queries that read every row on purpose
+FULL_SCAN_ALLOWED = {
+    "ItemRepository.count_by_source": "Cross-user total; not on any request path",
+}
+
+TABLES = set(Base.metadata.tables)
+
+
+def _calls(data):
+    """(label, call) for every repository method, run against the seeded data"""
+    user_id, job_id, other_job_id = data["user_id"], data["job_id"], data["other_job_id"]
+    since = datetime.utcnow() - timedelta(days=1)
+    return [
+        ("DashboardRepository.get_counts", lambda db: DashboardRepository(db).get_counts(user_id)),
+        ("ItemRepository.create", lambda db: ItemRepository(db).create(job_id, "carts", 900, {"id": 900})),
+        ("ItemRepository.bulk_create", lambda db: ItemRepository(db).bulk_create([
+            ImportedItem(user_id=user_id, job_id=job_id, source="carts", remote_id=901, payload={"id": 901})
+        ])),
+        ("ItemRepository.upsert", lambda db: ItemRepository(db).upsert(
+            user_id, job_id, "products", [{"id": 1, "title": "changed"}, {"id": 500}]
+        )),
+        ("ItemRepository.count_by_job_and_source", lambda db: ItemRepository(db).count_by_job_and_source(job_id, "products")),
+        ("ItemRepository.count_by_source", lambda db: ItemRepository(db).count_by_source("products")),
+        ("ItemRepository.count_by_source_and_user", lambda db: ItemRepository(db).count_by_source_and_user(user_id, "products")),
+        ("ItemRepository.get_recent", lambda db: ItemRepository(db).get_recent(user_id)),
+        ("ItemRepository.get_recent_summaries", lambda db: ItemRepository(db).get_recent_summaries(user_id)),
+        ("ItemRepository.get_for_user", lambda db: ItemRepository(db).get_for_user(user_id, 1)),
+        ("ItemRepository.delete_by_job", lambda db: ItemRepository(db).delete_by_job(other_job_id)),
+        ("JobRepository.create", lambda db: JobRepository(db).create(user_id, ["products"], {})),
+        ("JobRepository.claim_next", lambda db: JobRepository(db).claim_next("worker-a", 60)),
+        ("JobRepository.claim", lambda db: JobRepository(db).claim(job_id, "worker-b", 60)),
+        ("JobRepository.fail_exhausted", lambda db: JobRepository(db).fail_exhausted(1)),
+        ("JobRepository.renew_lease", lambda db: JobRepository(db).renew_lease(job_id, "worker-b", 60)),
+        ("JobRepository.release_lease", lambda db: JobRepository(db).release_lease(job_id, "worker-b")),
+        ("JobRepository.get_by_id", lambda db: JobRepository(db).get_by_id(job_id)),
+        ("JobRepository.get_by_ids", lambda db: JobRepository(db).get_by_ids(user_id, [job_id, other_job_id])),
+        ("JobRepository.get_versions", lambda db: (
+            JobRepository(db).get_versions(user_id, [job_id]),
+            JobRepository(db).get_versions(user_id, since=since)
+        )),
+        ("JobRepository.touch", lambda db: JobRepository(db).touch(job_id)),
+        ("JobRepository.list_jobs", lambda db: (
+            JobRepository(db).list_jobs(user_id, limit=5),
+            JobRepository(db).list_jobs(user_id, limit=5, after=(datetime.utcnow(), job_id))
+        )),
+        ("JobRepository.update_status", lambda db: JobRepository(db).update_status(other_job_id, "Failed", "boom")),
+        ("JobRepository.requeue", lambda db: JobRepository(db).requeue(other_job_id)),
+        ("JobRepository.count_by_status", lambda db: JobRepository(db).count_by_status(user_id, "Completed")),
+        ("JobRepository.count_all", lambda db: JobRepository(db).count_all(user_id)),
+        ("JobSourceRepository.ensure_sources", lambda db: JobSourceRepository(db).ensure_sources(job_id, ["products", "carts"])),
+        ("JobSourceRepository.get_by_job", lambda db: JobSourceRepository(db).get_by_job(job_id)),
+        ("JobSourceRepository.get_by_jobs", lambda db: JobSourceRepository(db).get_by_jobs([job_id, other_job_id])),
+        ("JobSourceRepository.get", lambda db: JobSourceRepository(db).get(job_id, "products")),
+        ("JobSourceRepository.get_baseline", lambda db: JobSourceRepository(db).get_baseline(user_id, "products", job_id + 100)),
+        ("JobSourceRepository.update_progress", lambda db: JobSourceRepository(db).update_progress(job_id, "products", "Running", 100)),
+        ("JobSourceRepository.fail_unfinished", lambda db: JobSourceRepository(db).fail_unfinished(job_id)),
+        ("JobSourceRepository.save_checkpoint", lambda db: JobSourceRepository(db).save_checkpoint(job_id, "products", 20, 20)),
+        ("UserRepository.create", lambda db: UserRepository(db).create("new@example.com", "new", "x")),
+        ("UserRepository.get_by_id", lambda db: UserRepository(db).get_by_id(user_id)),
+        ("UserRepository.get_by_username", lambda db: UserRepository(db).get_by_username("user0")),
+        ("UserRepository.get_by_email", lambda db: UserRepository(db).get_by_email("user0@example.com")),
+        ("UserRepository.exists_by_username", lambda db: UserRepository(db).exists_by_username("user0")),
+        ("UserRepository.exists_by_email", lambda db: UserRepository(db).exists_by_email("user0@example.com")),
+        ("UserRepository.set_active", lambda db: UserRepository(db).set_active(user_id, True)),
+        ("UserRepository.update_password", lambda db: UserRepository(db).update_password(user_id, "x")),
+        ("UserStatsRepository.get", lambda db: UserStatsRepository(db).get(user_id)),
+        ("UserStatsRepository.record_job_status", lambda db: UserStatsRepository(db).record_job_status(user_id, "Pending", "Running")),
+        ("UserStatsRepository.record_items", lambda db: UserStatsRepository(db).record_items(user_id, "products", 1, 10, datetime.utcnow())),
+        ("UserStatsRepository.compute", lambda db: UserStatsRepository(db).compute(user_id)),
+        ("UserStatsRepository.verify", lambda db: UserStatsRepository(db).verify(user_id)),
+        ("UserStatsRepository.rebuild", lambda db: UserStatsRepository(db).rebuild(user_id)),
+    ]
+
+
+def _seed(db):
+    """Two users with a few jobs, sources and items each"""
+    users = [User(email=f"user{n}@example.com", username=f"user{n}", hashed_password="x") for n in range(2)]
+    db.add_all(users)
+    db.commit()
+    jobs = JobRepository(db)
+    items = ItemRepository(db)
+    job_ids = []
+    for user in users:
+        for status in ("Completed", "Failed", "Pending"):
+            job = jobs.create(user.id, ["products", "carts"], {})
+            jobs.update_status(job.id, status)
+            JobSourceRepository(db).ensure_sources(job.id, ["products", "carts"])
+            items.upsert(user.id, job.id, "products", [{"id": n} for n in range(10)])
+            job_ids.append(job.id)
+    return {"user_id": users[0].id, "job_id": job_ids[0], "other_job_id": job_ids[1]}
+
+
+def _sqlite_full_scans(connection, statement, parameters):
+    """Tables the SQLite plan reads in full"""
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).all()
+    scans = []
+    for row in rows:
+        match = re.match(r"SCAN (\w+)", row[-1])
+        if match and match.group(1) in TABLES:
+            scans.append(row[-1])
+    return scans
+
+
+def _postgres_full_scans(connection, statement, parameters):
+    """Tables the Postgres plan reads with a sequential scan"""
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+    
+    def walk(node):
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in TABLES:
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        for child in node.get("Plans", []):
+            walk(child)
+    
+    walk(plan[0]["Plan"])
+    return scans
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_engine(request, test_db):
+    """Engine with the schema and seed data, per dialect"""
+    if request.param == "sqlite":
+        yield sqlite_engine
+        return
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def test_every_repository_method_is_checked():
+    """Test new repository methods cannot skip the plan check"""
+    covered = {label for label, _ in _calls({"user_id": 0, "job_id": 0, "other_job_id": 0})}
+    public = {
+        f"{repository.__name__}.{name}"
+        for repository in REPOSITORIES
+        for name, member in inspect.getmembers(repository, inspect.isfunction)
+        if not name.startswith("_")
+    }
+    assert public - covered == set()
+
+
+def test_repository_queries_use_indexes(plan_engine):
+    """Test no repository query reads a whole table"""
+    Session = sessionmaker(bind=plan_engine, autoflush=False)
+    db = Session()
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            statements.append((statement, parameters))
+    
+    try:
+        data = _seed(db)
+        full_scans = {}
+        for label, call in _calls(data):
+            statements.clear()
+            event.listen(plan_engine, "before_cursor_execute", record)
+            try:
+                call(db)
+                db.commit()
+            finally:
+                event.remove(plan_engine, "before_cursor_execute", record)
+            
+            if label in FULL_SCAN_ALLOWED:
+                continue
+            with plan_engine.connect() as connection:
+                if plan_engine.dialect.name == "postgresql":
+                    connection.exec_driver_sql("SET enable_seqscan = off")
+                    explain = _postgres_full_scans
+                else:
+                    explain = _sqlite_full_scans
+                for statement, parameters in statements:
+                    scans = explain(connection, statement, parameters)
+                    if scans:
+                        full_scans.setdefault(label, []).extend(scans)
+    finally:
+        db.close()
+    
+    assert full_scans == {}
@@ -0,0 +1,151 @@
+"""Tests for user_stats_repository.py"""
+import pytest
+import sys
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.repositories.user_stats_repository import UserStatsRepository, AsyncUserStatsRepository
+from app.repositories.item_repository import ItemRepository, canonical_json
+from app.repositories.job_repository import JobRepository
+from app.models import ImportedItem, User, UserStats
+
+
+@pytest.fixture
+def test_user_obj(db_session):
+    """Create a test user object"""
+    user = User(email="test@example.com", username="testuser", hashed_password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+def test_job_status_changes_move_counters(db_session, test_user_obj):
+    """Test creating, finishing, failing and requeueing jobs keeps status counts current"""
+    jobs = JobRepository(db_session)
+    first = jobs.create(test_user_obj.id, ["products"], {})
+    second = jobs.create(test_user_obj.id, ["carts"], {})
+    jobs.update_status(first.id, "Running")
+    jobs.update_status(first.id, "Completed")
+    jobs.update_status(second.id, "Failed", "boom")
+    jobs.requeue(second.id)
+    
+    stats = UserStatsRepository(db_session).get(test_user_obj.id)
+    db_session.refresh(stats)
+    
+    assert (stats.jobs_total, stats.jobs_pending, stats.jobs_running, stats.jobs_completed, stats.jobs_failed) == (2, 1, 0, 1, 0)
+
+
+def test_upserts_count_new_items_and_stored_bytes(db_session, test_user_obj):
+    """Test only inserts add to item counts while bytes follow the stored payload size"""
+    job = JobRepository(db_session).create(test_user_obj.id, ["products"], {})
+    items = ItemRepository(db_session)
+    
+    items.upsert(test_user_obj.id, job.id, "products", [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}])
+    items.upsert(test_user_obj.id, job.id, "products", [{"id": 1, "title": "longer title"}, {"id": 2, "title": "b"}])
+    items.upsert(test_user_obj.id, job.id, "carts", [{"id": 1}])
+    
+    stats = UserStatsRepository(db_session).get(test_user_obj.id)
+    db_session.refresh(stats)
+    expected_bytes = sum(len(canonical_json(p)) for p in (
+        {"id": 1, "title": "longer title"}, {"id": 2, "title": "b"}, {"id": 1}
+    ))
+    
+    assert (stats.items_products, stats.items_carts) == (2, 1)
+    assert stats.bytes_imported == expected_bytes
+    assert stats.last_import_at is not None
+    assert UserStatsRepository(db_session).verify(test_user_obj.id) == {}
+
+
+def test_rolled_back_chunk_is_not_counted(db_session, test_user_obj):
+    """Test the rollup shares the chunk's transaction"""
+    job = JobRepository(db_session).create(test_user_obj.id, ["products"], {})
+    
+    ItemRepository(db_session).upsert(test_user_obj.id, job.id, "products", [{"id": 1}], commit=False)
+    db_session.rollback()
+    
+    stats = UserStatsRepository(db_session).get(test_user_obj.id)
+    assert stats.items_products == 0
+    assert stats.bytes_imported == 0
+
+
+def test_verify_reports_drift_and_rebuild_repairs_it(db_session, test_user_obj):
+    """Test drift between the rollup and the source tables is found and fixed"""
+    jobs = JobRepository(db_session)
+    job = jobs.create(test_user_obj.id, ["products"], {})
+    ItemRepository(db_session).upsert(test_user_obj.id, job.id, "products", [{"id": 1}, {"id": 2}])
+    db_session.query(UserStats).filter(UserStats.user_id == test_user_obj.id).update(
+        {"items_products": 7, "jobs_pending": 0}
+    )
+    db_session.commit()
+    repo = UserStatsRepository(db_session)
+    
+    assert repo.verify(test_user_obj.id) == {"jobs_pending": (0, 1), "items_products": (7, 2)}
+    
+    repo.rebuild(test_user_obj.id)
+    
+    assert repo.verify(test_user_obj.id) == {}
+
+
+def test_rebuild_holds_the_row_while_aggregating(db_session, test_user_obj):
+    """Test a delta from another transaction cannot land between the rebuild's aggregation and its write"""
+    repo = UserStatsRepository(db_session)
+    other_engine = create_engine("sqlite:///./test.db", connect_args={"timeout": 0.1})
+    compute = repo.compute
+    blocked = []
+    
+    def compute_while_importing(user_id):
+        values = compute(user_id)
+        with Session(other_engine) as other:
+            try:
+                JobRepository(other).create(user_id, ["products"], {})
+            except OperationalError:
+                blocked.append(True)
+        return values
+    
+    repo.compute = compute_while_importing
+    repo.rebuild(test_user_obj.id)
+    other_engine.dispose()
+    
+    assert blocked == [True]
+    assert UserStatsRepository(db_session).verify(test_user_obj.id) == {}
+
+
+def test_bulk_create_and_delete_by_job_keep_the_rollup_current(db_session, test_user_obj):
+    """Test every item write path moves the rollup with it"""
+    job = JobRepository(db_session).create(test_user_obj.id, ["products", "carts"], {})
+    items = ItemRepository(db_session)
+    repo = UserStatsRepository(db_session)
+    
+    items.bulk_create([
+        ImportedItem(user_id=test_user_obj.id, job_id=job.id, source="products", remote_id=1, payload={"id": 1}),
+        ImportedItem(user_id=test_user_obj.id, job_id=job.id, source="carts", remote_id=1, payload={"id": 1})
+    ])
+    stats = repo.get(test_user_obj.id)
+    db_session.refresh(stats)
+    assert (stats.items_products, stats.items_carts) == (1, 1)
+    assert repo.verify(test_user_obj.id) == {}
+    
+    items.delete_by_job(job.id)
+    db_session.refresh(stats)
+    assert (stats.items_products, stats.items_carts, stats.bytes_imported) == (0, 0, 0)
+
+
+def test_verify_user_without_row(db_session, test_user_obj):
+    """Test a user with no history needs no row"""
+    assert UserStatsRepository(db_session).verify(test_user_obj.id) == {}
+
+
+async def test_async_repository_matches_sync(db_session, test_user_obj, async_session_factory):
+    """Test the async repository reads the same row"""
+    JobRepository(db_session).create(test_user_obj.id, ["products"], {})
+    
+    async with async_session_factory() as db:
+        stats = await AsyncUserStatsRepository(db).get(test_user_obj.id)
+    
+    assert stats.jobs_total == 1
+    assert stats.jobs_pending == 1
@@ -1,13 +1,22 @@
 """Tests for auth_service.py"""
+import asyncio
 import pytest
+from fastapi import HTTPException
 from unittest.mock import patch
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.services.auth_service import AuthService
+from app.config import settings
+from app.models import User
+from app.schemas import TokenData
+from app.dependencies import authenticate
+from app.services.auth_service import AuthCache, AuthService, TtlCache, reset_auth_cache
+from app.services.event_broker import EventBroker
+from app.services.user_service import UserService
+from tests.services.test_event_broker import RelayBackend
 
 
 def test_hash_password():
@@ -86,3 +95,106 @@ def test_decode_access_token_expired():
         # Token should be expired
         decoded = AuthService.decode_access_token(token)
         assert decoded is None
+
+
+def test_decode_access_token_carries_expiry():
+    """Test decoded claims include the token's expiry"""
+    token = AuthService.create_access_token({"user_id": 1, "username": "u"}, expires_delta=timedelta(minutes=5))
+    
+    decoded = AuthService.decode_access_token(token)
+    
+    assert decoded.expires_at is not None
+    assert timedelta(minutes=4) < decoded.expires_at - datetime.utcnow() <= timedelta(minutes=5)
+
+
+def test_auth_cache_never_outlives_the_token():
+    """Test a token close to expiry is cached only until it expires"""
+    cache = AuthCache(token_ttl_seconds=300, user_ttl_seconds=30, max_entries=10)
+    
+    cache.put_token("expired", TokenData(user_id=1, username="u", expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    cache.put_token("valid", TokenData(user_id=1, username="u", expires_at=datetime.utcnow() + timedelta(hours=1)))
+    
+    assert cache.get_token("expired") is None
+    assert cache.get_token("valid").user_id == 1
+
+
+def test_auth_cache_user_snapshots():
+    """Test users are cached as detached copies without the password hash, and only while active"""
+    cache = AuthCache(token_ttl_seconds=300, user_ttl_seconds=30, max_entries=10)
+    user = User(id=1, email="a@example.com", username="a", hashed_password="secret", is_active=True)
+    
+    cache.put_user(user, cache.generation(1))
+    cached = cache.get_user(1)
+    
+    assert cached is not user
+    assert (cached.id, cached.username, cached.hashed_password) == (1, "a", None)
+    
+    cache.put_user(User(id=2, email="b@example.com", username="b", is_active=False), cache.generation(2))
+    assert cache.get_user(2) is None
+
+
+def test_auth_cache_drops_users_loaded_across_an_invalidation():
+    """Test a user read before a deactivation is not cached after it"""
+    cache = AuthCache(token_ttl_seconds=300, user_ttl_seconds=30, max_entries=10)
+    user = User(id=1, email="a@example.com", username="a", is_active=True)
+    
+    generation = cache.generation(1)
+    cache.invalidate_user(1)
+    cache.put_user(user, generation)
+    
+    assert cache.get_user(1) is None
+
+
+async def test_user_deactivated_in_another_process_is_rejected(db_session, async_session_factory):
+    """Test a deactivation published by another process drops the user this process has cached"""
+    user = User(email="a@example.com", username="a", hashed_password="h", is_active=True)
+    db_session.add(user)
+    db_session.commit()
+    token = AuthService.create_access_token(data={"user_id": user.id, "username": user.username})
+    
+    # Two brokers on one relay stand in for the API process and, say, the admin script
+    relay = RelayBackend()
+    api_broker, script_broker = EventBroker(relay), EventBroker(relay)
+    reset_auth_cache()
+    with patch("app.services.event_broker._broker", api_broker):
+        async with async_session_factory() as db:
+            assert (await authenticate(token, db)).id == user.id
+        
+        with patch("app.services.user_service.get_event_broker", lambda: script_broker), \
+                patch("app.services.user_service.get_auth_cache", lambda: AuthCache(300, 30, 10)):
+            async with async_session_factory() as db:
+                await UserService(db).set_active(user.id, False)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        
+        async with async_session_factory() as db:
+            with pytest.raises(HTTPException) as error:
+                await authenticate(token, db)
+        await api_broker.close()
+    reset_auth_cache()
+    
+    assert error.value.status_code == 401
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test the cache stays within max_entries"""
+    cache = TtlCache(max_entries=2)
+    cache.put("a", 1, 60)
+    cache.put("b", 2, 60)
+    cache.get("a")
+    cache.put("c", 3, 60)
+    
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_needs_rehash_when_cost_changes(monkeypatch):
+    """Test hashes made at another cost are flagged for rehashing"""
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    hashed = AuthService.get_password_hash("secret123")
+    
+    assert AuthService.needs_rehash(hashed) is False
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+    assert AuthService.needs_rehash(hashed) is True
+    assert AuthService.needs_rehash("not-a-bcrypt-hash") is True
@@ -0,0 +1,64 @@
+"""Tests for batch_writer.py"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.batch_writer import BatchWriter
+
+
+class RecordingFlush:
+    """Collects the chunks handed to the writer's flush callback"""
+    
+    def __init__(self):
+        self.batches = []
+    
+    async def __call__(self, batch):
+        self.batches.append(list(batch))
+
+
+async def test_flushes_by_row_count():
+    """Test chunks are cut at max_rows"""
+    flush = RecordingFlush()
+    writer = BatchWriter(flush, max_rows=2, max_bytes=1_000_000)
+    
+    for i in range(5):
+        await writer.add({"id": i})
+    await writer.flush()
+    
+    assert [len(batch) for batch in flush.batches] == [2, 2, 1]
+    assert writer.rows_written == 5
+    assert writer.batches_written == 3
+
+
+async def test_flushes_by_byte_size():
+    """Test chunks are cut before exceeding max_bytes"""
+    flush = RecordingFlush()
+    writer = BatchWriter(flush, max_rows=100, max_bytes=60)
+    
+    for i in range(4):
+        await writer.add({"id": i, "title": "x" * 20})
+    await writer.flush()
+    
+    assert [len(batch) for batch in flush.batches] == [1, 1, 1, 1]
+    assert writer.rows_written == 4
+
+
+async def test_flush_without_pending_records_is_noop():
+    """Test flushing an empty writer does not call the callback"""
+    flush = RecordingFlush()
+    writer = BatchWriter(flush, max_rows=10, max_bytes=1000)
+    
+    await writer.flush()
+    
+    assert flush.batches == []
+    assert writer.batches_written == 0
+
+
+def test_invalid_limits():
+    """Test writer rejects non-positive chunk limits"""
+    with pytest.raises(ValueError):
+        BatchWriter(RecordingFlush(), max_rows=0, max_bytes=100)
+    with pytest.raises(ValueError):
+        BatchWriter(RecordingFlush(), max_rows=10, max_bytes=0)
@@ -0,0 +1,75 @@
+"""Tests for dashboard_service.py"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.schemas import DashboardStats
+from app.services.dashboard_service import DashboardCache
+from app.services.event_broker import close_event_broker, get_event_broker
+
+
+def make_stats(total_jobs: int) -> DashboardStats:
+    """Build stats with a recognisable job count"""
+    return DashboardStats(
+        totalJobs=total_jobs,
+        completedJobs=0,
+        failedJobs=0,
+        totalProducts=0,
+        totalCarts=0,
+        recentItems=[]
+    )
+
+
+@pytest.fixture
+async def broker():
+    """A fresh in-process event broker"""
+    await close_event_broker()
+    yield get_event_broker()
+    await close_event_broker()
+
+
+async def test_cache_serves_until_the_users_job_event(broker):
+    """Test stats stay cached until an event for that user arrives"""
+    cache = DashboardCache(ttl_seconds=60, max_users=10)
+    assert cache.get(1) is None
+    cache.put(1, make_stats(1), cache.generation(1))
+    cache.put(2, make_stats(2), cache.generation(2))
+    
+    assert cache.get(1).total_jobs == 1
+    
+    await broker.publish(1, {"type": "job", "jobId": 5, "status": "Completed"})
+    
+    assert cache.get(1) is None
+    assert cache.get(2).total_jobs == 2
+
+
+async def test_cache_drops_results_computed_across_an_event(broker):
+    """Test stats computed while a job changed are not stored"""
+    cache = DashboardCache(ttl_seconds=60, max_users=10)
+    cache.get(1)
+    generation = cache.generation(1)
+    
+    await broker.publish(1, {"type": "job", "jobId": 5, "status": "Running"})
+    cache.put(1, make_stats(1), generation)
+    
+    assert cache.get(1) is None
+
+
+def test_cache_expires_and_evicts(monkeypatch):
+    """Test entries expire after the TTL and the least recently used user is evicted"""
+    now = [1000.0]
+    monkeypatch.setattr("app.services.dashboard_service.time.monotonic", lambda: now[0])
+    cache = DashboardCache(ttl_seconds=10, max_users=2)
+    
+    for user_id in (1, 2):
+        cache.put(user_id, make_stats(user_id), cache.generation(user_id))
+    cache.get(1)
+    cache.put(3, make_stats(3), cache.generation(3))
+    
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    
+    now[0] += 11
+    assert cache.get(1) is None
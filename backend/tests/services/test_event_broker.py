@@ -0,0 +1,102 @@
+"""Tests for event_broker.py"""
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.event_broker import EventBroker, create_event_broker
+
+
+class RelayBackend:
+    """Cross-process backend double: publishes go through listen(), like a real pub/sub server"""
+    
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+    
+    async def publish(self, user_id: int, message: str) -> None:
+        await self.messages.put((user_id, message))
+    
+    async def listen(self, deliver) -> None:
+        while True:
+            deliver(*await self.messages.get())
+    
+    async def close(self) -> None:
+        self.closed = True
+
+
+async def test_events_reach_only_the_users_subscribers():
+    """Test subscribers only receive their own user's events"""
+    broker = EventBroker()
+    
+    async with broker.subscribe(1) as first, broker.subscribe(1) as second, broker.subscribe(2) as other:
+        await broker.publish(1, {"type": "job", "jobId": 7, "status": "Running"})
+        
+        assert first.get_nowait()["jobId"] == 7
+        assert second.get_nowait()["jobId"] == 7
+        assert other.empty()
+    
+    assert broker.stats()["subscribers"] == 0
+
+
+async def test_slow_subscriber_drops_oldest_events():
+    """Test a full subscriber queue keeps the newest events instead of blocking publishers"""
+    broker = EventBroker(queue_size=2)
+    
+    async with broker.subscribe(1) as queue:
+        for completed in (10, 20, 30):
+            await broker.publish(1, {"type": "progress", "completed": completed})
+        
+        assert [queue.get_nowait()["completed"] for _ in range(2)] == [20, 30]
+    assert broker.stats()["dropped"] == 1
+
+
+async def test_publish_without_subscribers_is_a_no_op():
+    """Test publishing for a user nobody is watching does nothing"""
+    broker = EventBroker()
+    
+    await broker.publish(1, {"type": "job"})
+    
+    assert broker.stats()["published"] == 1
+    assert broker.stats()["delivered"] == 0
+
+
+async def test_backend_relays_events_to_local_subscribers():
+    """Test events published through a cross-process backend reach subscribers of this process"""
+    backend = RelayBackend()
+    broker = EventBroker(backend)
+    
+    async with broker.subscribe(1) as queue:
+        await broker.publish(1, {"type": "job", "jobId": 3, "status": "Completed"})
+        event = await asyncio.wait_for(queue.get(), timeout=1)
+    
+    assert event == {"type": "job", "jobId": 3, "status": "Completed"}
+    await broker.close()
+    assert backend.closed
+
+
+async def test_watchers_see_every_users_events():
+    """Test watchers receive events for all users, including ones relayed by the backend"""
+    backend = RelayBackend()
+    broker = EventBroker(backend)
+    seen = []
+    
+    broker.watch(lambda user_id, event: seen.append((user_id, event["jobId"])))
+    await broker.publish(1, {"type": "job", "jobId": 3})
+    await broker.publish(2, {"type": "job", "jobId": 4})
+    for _ in range(20):
+        if len(seen) == 2:
+            break
+        await asyncio.sleep(0.01)
+    
+    assert seen == [(1, 3), (2, 4)]
+    await broker.close()
+
+def test_redis_backend_falls_back_without_url(monkeypatch):
+    """Test the broker stays in-process when Redis is not configured"""
+    monkeypatch.setattr("app.services.event_broker.settings.event_backend", "redis")
+    monkeypatch.setattr("app.services.event_broker.settings.redis_url", None)
+    
+    assert create_event_broker().stats()["backend"] == "memory"
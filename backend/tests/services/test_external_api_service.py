@@ -0,0 +1,92 @@
+"""Tests for external_api_service.py"""
+import httpx
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.external_api_service import ExternalApiService
+from app.http_client import close_http_client, http_pool_stats
+
+
+def paginated_upstream(total: int, requests: list):
+    """Mock transport emulating dummyjson's skip/limit pagination"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        skip = int(request.url.params.get("skip", 0))
+        limit = int(request.url.params.get("limit", 30))
+        requests.append((skip, limit))
+        if request.url.params.get("order") == "desc":
+            requests.append(request.url.params.get("sortBy"))
+        items = [{"id": i} for i in range(skip + 1, min(skip + limit, total) + 1)]
+        return httpx.Response(200, json={"products": items, "total": total, "skip": skip, "limit": limit})
+    return httpx.MockTransport(handler)
+
+
+async def collect(pages):
+    """Drain an async page iterator"""
+    return [page async for page in pages]
+
+
+@pytest.fixture
+def upstream():
+    """Record requests made against a mock paginated upstream"""
+    return []
+
+
+@pytest.fixture
+def service(upstream):
+    """Service wired to the mock upstream through an injected client"""
+    client = httpx.AsyncClient(transport=paginated_upstream(total=25, requests=upstream))
+    return ExternalApiService(client=client)
+
+
+async def test_iter_pages_walks_until_total(service, upstream):
+    """Test pagination stops once the upstream total is reached"""
+    pages = await collect(service.iter_products(page_size=10))
+    
+    assert [len(page.items) for page in pages] == [10, 10, 5]
+    assert [page.skip for page in pages] == [0, 10, 20]
+    assert all(page.total == 25 for page in pages)
+    assert upstream == [(0, 10), (10, 10), (20, 10)]
+
+
+async def test_iter_pages_respects_max_items(service, upstream):
+    """Test max_items caps both the requests and the reported total"""
+    pages = await collect(service.iter_products(page_size=10, max_items=12))
+    
+    assert [len(page.items) for page in pages] == [10, 2]
+    assert all(page.total == 12 for page in pages)
+    assert upstream == [(0, 10), (10, 2)]
+
+
+async def test_iter_pages_starts_at_skip(service, upstream):
+    """Test iteration can begin part way through a source"""
+    pages = await collect(service.iter_pages("products", skip=20, page_size=10))
+    
+    assert [page.items[0]["id"] for page in pages] == [21]
+    assert upstream == [(20, 10)]
+
+
+async def test_iter_pages_newest_first(service, upstream):
+    """Test newest-first listing asks the upstream to sort by id descending"""
+    await collect(service.iter_pages("products", page_size=10, max_items=10, newest_first=True))
+    
+    assert upstream == [(0, 10), "id"]
+    assert service.supports_newest_first("products")
+    assert not service.supports_newest_first("carts")
+
+
+async def test_services_share_the_pooled_client():
+    """Test every service instance reuses the process-wide client"""
+    await close_http_client()
+    try:
+        first = ExternalApiService()
+        second = ExternalApiService()
+        
+        assert first.client is second.client
+        assert http_pool_stats()["started"] is True
+    finally:
+        await close_http_client()
+    
+    assert http_pool_stats()["started"] is False
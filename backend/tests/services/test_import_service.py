@@ -1,4 +1,6 @@
 """Tests for import_service.py"""
+import asyncio
+import time
 import pytest
 from unittest.mock import Mock, patch
 import sys
@@ -6,7 +8,16 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.config import settings
 from app.services.import_service import ImportService
+from app.services.external_api_service import Page
+from app.repositories.item_repository import ItemRepository
+from app.repositories.job_repository import JobRepository
+from app.repositories.job_source_repository import JobSourceRepository
+from app.services.event_broker import get_event_broker
+from app.models import User, ImportJob
 
 
 def test_import_service_exists():
@@ -15,6 +26,364 @@ def test_import_service_exists():
     assert callable(getattr(ImportService, 'process_import_job'))
 
 
-# Note: Full testing of process_import_job would require mocking SessionLocal, 
-# asyncio, and external API calls. These are better tested as integration tests
-# through the job controller endpoints.
+@pytest.fixture
+def running_job(db_session):
+    """Create a pending job covering both sources"""
+    user = User(email="test@example.com", username="testuser", hashed_password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    job = ImportJob(
+        user_id=user.id,
+        selected_sources=["products", "carts"],
+        credentials={},
+        status="Pending"
+    )
+    db_session.add(job)
+    db_session.commit()
+    db_session.refresh(job)
+    return job
+
+
+def fake_source(
+    count: int,
+    delay: float = 0.0,
+    error: Exception = None,
+    page_size: int = 10,
+    fail_at: int = None,
+    changes: dict = None
+):
+    """Describe how a stubbed upstream source behaves; error is raised at fail_at (default: upfront)
+    
+    Records are {"id": n} plus any fields given for n in changes.
+    """
+    return {
+        "count": count,
+        "delay": delay,
+        "error": error,
+        "page_size": page_size,
+        "fail_at": fail_at or 0,
+        "changes": changes or {},
+        "requested_skips": []
+    }
+
+
+def fake_iter_pages(sources: dict):
+    """Build an iter_pages stub that streams pages for each described source"""
+    async def iter_pages(
+        source: str,
+        skip: int = 0,
+        page_size: int = None,
+        max_items: int = None,
+        newest_first: bool = False
+    ):
+        spec = sources[source]
+        spec["requested_skips"].append(skip)
+        spec["newest_first"] = newest_first
+        # Like the real client, a cap limits how far into the listing order paging goes
+        end = min(spec["count"], max_items) if max_items else spec["count"]
+        await asyncio.sleep(spec["delay"])
+        while skip < end:
+            if spec["error"] and skip >= spec["fail_at"]:
+                raise spec["error"]
+            positions = range(skip, min(skip + spec["page_size"], end))
+            ids = [spec["count"] - p if newest_first else p + 1 for p in positions]
+            yield Page(items=[{"id": i, **spec["changes"].get(i, {})} for i in ids], skip=skip, total=end)
+            skip += len(ids)
+    return iter_pages
+
+
+async def run_job(session_factory, job, limits=None, append_only=("products",), **sources):
+    """Run process_import_job against the test database with a stubbed upstream
+    
+    Sources are uncapped unless limits says otherwise; append_only lists the sources an
+    incremental job may stop early on.
+    """
+    with patch("app.services.import_service.AsyncSessionLocal", session_factory), \
+            patch("app.services.job_queue.AsyncSessionLocal", session_factory), \
+            patch("app.services.import_service.settings.import_source_limits", limits or {}), \
+            patch("app.services.import_service.settings.import_append_only_sources", list(append_only)), \
+            patch("app.services.import_service.random.randint", return_value=10), \
+            patch("app.services.import_service.settings.simulate_delay_seconds", 0), \
+            patch("app.services.import_service.ExternalApiService") as api_cls:
+        api_cls.return_value = Mock(
+            iter_pages=fake_iter_pages(sources),
+            supports_newest_first=lambda source: source == "products"
+        )
+        await ImportService.process_import_job(job.id, job.selected_sources)
+
+
+async def test_sources_are_fetched_concurrently(db_session, async_session_factory, running_job):
+    """Test a multi-source job takes roughly as long as its slowest source"""
+    start = time.perf_counter()
+    await run_job(
+        async_session_factory,
+        running_job,
+        products=fake_source(30, delay=0.3),
+        carts=fake_source(20, delay=0.3)
+    )
+    elapsed = time.perf_counter() - start
+    
+    db_session.expire_all()
+    assert db_session.get(ImportJob, running_job.id).status == "Completed"
+    item_repo = ItemRepository(db_session)
+    assert item_repo.count_by_job_and_source(running_job.id, "products") == 30
+    assert item_repo.count_by_job_and_source(running_job.id, "carts") == 20
+    assert elapsed < 0.55
+
+
+async def test_source_failure_fails_job(db_session, async_session_factory, running_job):
+    """Test one failing source cancels the others and marks the job Failed"""
+    await run_job(
+        async_session_factory,
+        running_job,
+        products=fake_source(30),
+        carts=fake_source(20, delay=0.1, error=RuntimeError("carts upstream down"))
+    )
+    
+    db_session.expire_all()
+    job = db_session.get(ImportJob, running_job.id)
+    assert job.status == "Failed"
+    assert job.error_message == "carts upstream down"
+    assert ItemRepository(db_session).count_by_job_and_source(running_job.id, "carts") == 0
+
+
+async def test_progress_counters_track_upstream_totals(db_session, async_session_factory, running_job):
+    """Test the pipeline records each source's upstream total and status as it goes"""
+    with patch("app.services.import_service.settings.import_batch_size", 10):
+        await run_job(
+            async_session_factory,
+            running_job,
+            products=fake_source(30),
+            carts=fake_source(20, delay=0.2, error=RuntimeError("connection reset"), fail_at=10)
+        )
+    
+    db_session.expire_all()
+    states = JobSourceRepository(db_session).get_by_job(running_job.id)
+    assert (states["products"].status, states["products"].checkpoint_offset, states["products"].total) == (
+        "Completed", 30, 30
+    )
+    assert (states["carts"].status, states["carts"].checkpoint_offset, states["carts"].total) == ("Failed", 10, 20)
+
+
+async def test_source_is_streamed_in_pages(db_session, async_session_factory, running_job):
+    """Test every page of a multi-page source is written"""
+    with patch("app.services.import_service.settings.import_batch_size", 7):
+        await run_job(
+            async_session_factory,
+            running_job,
+            products=fake_source(30, page_size=4),
+            carts=fake_source(20, page_size=6)
+        )
+    
+    item_repo = ItemRepository(db_session)
+    assert item_repo.count_by_job_and_source(running_job.id, "products") == 30
+    assert item_repo.count_by_job_and_source(running_job.id, "carts") == 20
+
+
+async def test_job_leased_elsewhere_is_not_processed(db_session, async_session_factory, running_job):
+    """Test the background path skips a job a queue worker already holds"""
+    JobRepository(db_session).claim(running_job.id, "queue-worker", lease_seconds=60)
+    
+    await run_job(async_session_factory, running_job, products=fake_source(30), carts=fake_source(20))
+    
+    db_session.expire_all()
+    assert db_session.get(ImportJob, running_job.id).status == "Pending"
+    assert ItemRepository(db_session).count_by_job_and_source(running_job.id, "products") == 0
+
+
+async def test_lease_is_released_after_processing(db_session, async_session_factory, running_job):
+    """Test a finished job no longer carries a lease"""
+    await run_job(async_session_factory, running_job, products=fake_source(30), carts=fake_source(20))
+    
+    db_session.expire_all()
+    job = db_session.get(ImportJob, running_job.id)
+    assert job.status == "Completed"
+    assert job.lease_owner is None
+    assert job.lease_expires_at is None
+
+
+async def test_failure_keeps_committed_chunks_and_checkpoint(db_session, async_session_factory, running_job):
+    """Test a mid-stream failure keeps everything committed before it"""
+    with patch("app.services.import_service.settings.import_batch_size", 10):
+        await run_job(
+            async_session_factory,
+            running_job,
+            products=fake_source(30),
+            carts=fake_source(20, error=RuntimeError("connection reset"), fail_at=10)
+        )
+    
+    db_session.expire_all()
+    assert db_session.get(ImportJob, running_job.id).status == "Failed"
+    assert ItemRepository(db_session).count_by_job_and_source(running_job.id, "carts") == 10
+    checkpoint = JobSourceRepository(db_session).get(running_job.id, "carts")
+    assert checkpoint.checkpoint_offset == 10
+    assert checkpoint.checkpoint_remote_id == 10
+
+
+async def test_resume_continues_from_checkpoint(db_session, async_session_factory, running_job):
+    """Test a resumed job only fetches and writes what was not committed yet"""
+    with patch("app.services.import_service.settings.import_batch_size", 10):
+        # carts fails only after products has finished, so products is fully checkpointed
+        await run_job(
+            async_session_factory,
+            running_job,
+            products=fake_source(30),
+            carts=fake_source(20, delay=0.2, error=RuntimeError("connection reset"), fail_at=10)
+        )
+        db_session.expire_all()
+        JobRepository(db_session).requeue(running_job.id)
+        
+        products, carts = fake_source(30), fake_source(20)
+        await run_job(async_session_factory, running_job, products=products, carts=carts)
+    
+    db_session.expire_all()
+    job = db_session.get(ImportJob, running_job.id)
+    assert (job.status, job.error_message) == ("Completed", None)
+    assert carts["requested_skips"] == [10]
+    assert products["requested_skips"] == [30]
+    item_repo = ItemRepository(db_session)
+    assert item_repo.count_by_job_and_source(running_job.id, "products") == 30
+    assert item_repo.count_by_job_and_source(running_job.id, "carts") == 20
+
+
+async def test_reimport_reports_upsert_counts(db_session, async_session_factory, running_job):
+    """Test a second job over the same data writes only what changed"""
+    await run_job(async_session_factory, running_job, products=fake_source(30), carts=fake_source(20))
+    
+    second_job = ImportJob(
+        user_id=running_job.user_id,
+        selected_sources=["products"],
+        credentials={},
+        status="Pending"
+    )
+    db_session.add(second_job)
+    db_session.commit()
+    await run_job(async_session_factory, second_job, products=fake_source(35))
+    
+    db_session.expire_all()
+    state = JobSourceRepository(db_session).get(second_job.id, "products")
+    assert state.checkpoint_offset == 35
+    assert (state.inserted_count, state.updated_count, state.unchanged_count) == (5, 0, 30)
+    assert ItemRepository(db_session).count_by_source_and_user(running_job.user_id, "products") == 35
+
+
+async def test_incremental_import_stops_at_baseline(db_session, async_session_factory, running_job):
+    """Test an incremental job only pages through records added since the last completed job"""
+    await run_job(async_session_factory, running_job, products=fake_source(30), carts=fake_source(20))
+    
+    job = ImportJob(
+        user_id=running_job.user_id,
+        selected_sources=["products", "carts"],
+        credentials={},
+        mode="incremental",
+        status="Pending"
+    )
+    db_session.add(job)
+    db_session.commit()
+    products = fake_source(45)
+    carts = fake_source(20, changes={3: {"total": 99}})
+    await run_job(async_session_factory, job, products=products, carts=carts)
+    
+    db_session.expire_all()
+    assert db_session.get(ImportJob, job.id).status == "Completed"
+    assert products["newest_first"] is True
+    # ids 45..36, then 35..26 reaches the baseline's highest id (30); 25..1 are never written
+    states = JobSourceRepository(db_session).get_by_job(job.id)
+    assert (states["products"].inserted_count, states["products"].unchanged_count) == (15, 5)
+    assert states["products"].max_remote_id == 45
+    
+    # carts cannot be listed newest first, so it is read in full and only the change is written
+    assert carts["newest_first"] is False
+    assert (states["carts"].inserted_count, states["carts"].updated_count, states["carts"].unchanged_count) == (0, 1, 19)
+
+
+async def test_incremental_import_of_capped_source_keeps_the_window(db_session, async_session_factory, running_job):
+    """Test a capped source is read in the same order as the baseline, so nothing unrelated is written"""
+    limits = {"products": 30}
+    await run_job(async_session_factory, running_job, limits=limits, products=fake_source(194), carts=fake_source(20))
+    
+    job = ImportJob(
+        user_id=running_job.user_id,
+        selected_sources=["products"],
+        credentials={},
+        mode="incremental",
+        status="Pending"
+    )
+    db_session.add(job)
+    db_session.commit()
+    products = fake_source(194, changes={7: {"title": "edited"}})
+    await run_job(async_session_factory, job, limits=limits, products=products)
+    
+    db_session.expire_all()
+    assert products["newest_first"] is False
+    state = JobSourceRepository(db_session).get(job.id, "products")
+    assert (state.inserted_count, state.updated_count, state.unchanged_count) == (0, 1, 29)
+    assert ItemRepository(db_session).count_by_source_and_user(running_job.user_id, "products") == 30
+
+
+async def test_incremental_import_of_mutable_source_reads_everything(db_session, async_session_factory, running_job):
+    """Test a source not marked append-only is read in full so edits below the last highest id are written"""
+    await run_job(async_session_factory, running_job, append_only=(), products=fake_source(30), carts=fake_source(20))
+    
+    job = ImportJob(
+        user_id=running_job.user_id,
+        selected_sources=["products"],
+        credentials={},
+        mode="incremental",
+        status="Pending"
+    )
+    db_session.add(job)
+    db_session.commit()
+    products = fake_source(35, changes={3: {"title": "edited"}})
+    await run_job(async_session_factory, job, append_only=(), products=products)
+    
+    db_session.expire_all()
+    assert products["newest_first"] is False
+    state = JobSourceRepository(db_session).get(job.id, "products")
+    assert (state.inserted_count, state.updated_count, state.unchanged_count) == (5, 1, 29)
+
+
+async def test_incremental_import_without_baseline_reads_everything(db_session, async_session_factory, running_job):
+    """Test the first incremental job has nothing to stop at"""
+    running_job.mode = "incremental"
+    db_session.commit()
+    products = fake_source(30)
+    
+    await run_job(async_session_factory, running_job, products=products, carts=fake_source(20))
+    
+    db_session.expire_all()
+    state = JobSourceRepository(db_session).get(running_job.id, "products")
+    assert (state.checkpoint_offset, state.inserted_count) == (30, 30)
+
+
+async def test_pipeline_publishes_status_and_progress(db_session, async_session_factory, running_job):
+    """Test subscribers see the job start, each committed chunk and the outcome"""
+    with patch("app.services.import_service.settings.import_batch_size", 10):
+        async with get_event_broker().subscribe(running_job.user_id) as queue:
+            await run_job(async_session_factory, running_job, products=fake_source(20), carts=fake_source(10))
+            events = [queue.get_nowait() for _ in range(queue.qsize())]
+    
+    assert events[0] == {"type": "job", "jobId": running_job.id, "status": "Running", "error": None}
+    assert events[-1]["status"] == "Completed" and events[-1]["type"] == "job"
+    products = [event for event in events if event.get("source") == "products"]
+    assert [event["completed"] for event in products if event["status"] == "Running"][-1] == 20
+    assert products[-1] == {
+        "type": "progress", "jobId": running_job.id, "source": "products",
+        "completed": 20, "total": 20, "status": "Completed"
+    }
+
+
+def test_source_writer_uses_copy_sized_chunks_on_postgres(monkeypatch):
+    """Test the pipeline writes bigger chunks where they can be bulk-loaded with COPY"""
+    monkeypatch.setattr(settings, "import_batch_size", 100)
+    monkeypatch.setattr(settings, "import_copy_batch_size", 5000)
+    monkeypatch.setattr(settings, "import_copy_min_rows", 1000)
+    postgres_db, sqlite_db = Mock(), Mock()
+    postgres_db.get_bind.return_value.dialect = postgresql.asyncpg.dialect()
+    sqlite_db.get_bind.return_value.dialect = sqlite.aiosqlite.dialect()
+    
+    assert ImportService._source_writer(postgres_db, 1, 1, "products", 0).max_rows == 5000
+    assert ImportService._source_writer(sqlite_db, 1, 1, "products", 0).max_rows == 100
+    
+    monkeypatch.setattr(settings, "import_copy_min_rows", 0)
+    assert ImportService._source_writer(postgres_db, 1, 1, "products", 0).max_rows == 100
@@ -0,0 +1,76 @@
+"""Tests for job_queue.py"""
+import asyncio
+import pytest
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.event_broker import close_event_broker, get_event_broker
+from app.services.job_queue import JobQueue
+from app.repositories.job_repository import JobRepository
+from app.models import User
+
+
+@pytest.fixture
+def queued_job(db_session, async_session_factory):
+    """Create a pending job and point the queue at the test database"""
+    user = User(email="test@example.com", username="testuser", hashed_password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    job = JobRepository(db_session).create(user.id, ["products"], {})
+    
+    with patch("app.services.job_queue.AsyncSessionLocal", async_session_factory):
+        yield job
+
+
+def test_lease_owners_are_unique():
+    """Test every worker slot gets its own identity"""
+    assert JobQueue.new_lease_owner() != JobQueue.new_lease_owner()
+
+
+async def test_hold_lease_renews_until_work_finishes(db_session, queued_job):
+    """Test the lease is extended while the job is still running"""
+    assert await JobQueue.claim(queued_job.id, "worker-a")
+    db_session.refresh(queued_job)
+    first_expiry = queued_job.lease_expires_at
+    
+    with patch("app.services.job_queue.settings.job_lease_seconds", 0.3):
+        work = asyncio.ensure_future(asyncio.sleep(0.25))
+        await JobQueue.hold_lease(queued_job.id, "worker-a", work)
+    
+    db_session.refresh(queued_job)
+    assert work.done() and not work.cancelled()
+    assert queued_job.lease_expires_at != first_expiry
+
+
+async def test_hold_lease_abandons_work_when_lease_is_lost(queued_job):
+    """Test the job is cancelled once another worker takes the lease over"""
+    assert await JobQueue.claim(queued_job.id, "worker-a")
+    await JobQueue.release(queued_job.id, "worker-a")
+    assert await JobQueue.claim(queued_job.id, "worker-b")
+    
+    with patch("app.services.job_queue.settings.job_lease_seconds", 0.15):
+        work = asyncio.ensure_future(asyncio.sleep(5))
+        await JobQueue.hold_lease(queued_job.id, "worker-a", work)
+    
+    assert work.cancelled()
+
+
+async def test_claim_fails_job_out_of_attempts(db_session, queued_job):
+    """Test a job reclaimed job_max_attempts times is failed and its owner told so"""
+    await close_event_broker()
+    with patch("app.services.job_queue.settings.job_max_attempts", 1):
+        async with get_event_broker().subscribe(queued_job.user_id) as events:
+            assert await JobQueue.claim(queued_job.id, "worker-a")
+            await JobQueue.release(queued_job.id, "worker-a")
+            
+            assert not await JobQueue.claim(queued_job.id, "worker-b")
+            assert await JobQueue.claim_next("worker-b") is None
+            event = events.get_nowait()
+    await close_event_broker()
+    
+    db_session.refresh(queued_job)
+    assert queued_job.status == "Failed"
+    assert event == {"type": "job", "jobId": queued_job.id, "status": "Failed", "error": "Gave up after 1 attempts"}
@@ -0,0 +1,60 @@
+"""Tests for job_reclaimer.py"""
+import asyncio
+import pytest
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.models import User
+from app.repositories.job_repository import JobRepository
+from app.services.job_reclaimer import reclaim_abandoned_jobs
+
+
+@pytest.fixture
+def queue_repo(db_session, async_session_factory):
+    """Job repository on the test database, with the queue pointed at it too"""
+    user = User(email="test@example.com", username="testuser", hashed_password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    
+    with patch("app.services.job_queue.AsyncSessionLocal", async_session_factory):
+        yield JobRepository(db_session), user.id
+
+
+async def test_job_abandoned_by_a_dead_process_is_resumed(queue_repo):
+    """Test a running job whose lease expired is picked up again and run to its end"""
+    repo, user_id = queue_repo
+    job = repo.create(user_id, ["products"], {})
+    assert repo.claim(job.id, "dead-api", lease_seconds=-1)
+    repo.update_status(job.id, "Running")
+    
+    processed = []
+    
+    async def process(job_id, sources, lease_owner=None):
+        processed.append((job_id, sources, lease_owner))
+        stop.set()
+    
+    stop = asyncio.Event()
+    with patch("app.services.job_reclaimer.ImportService.process_import_job", process):
+        await asyncio.wait_for(reclaim_abandoned_jobs(stop, concurrency=2, interval=0.05), timeout=5)
+    
+    assert [(job_id, sources) for job_id, sources, _ in processed] == [(job.id, ["products"])]
+    assert processed[0][2] not in (None, "dead-api")
+
+
+async def test_live_lease_is_left_alone(queue_repo):
+    """Test a job another process is still running is not taken over"""
+    repo, user_id = queue_repo
+    job = repo.create(user_id, ["products"], {})
+    assert repo.claim(job.id, "live-api", lease_seconds=60)
+    
+    stop = asyncio.Event()
+    with patch("app.services.job_reclaimer.ImportService.process_import_job") as process:
+        task = asyncio.ensure_future(reclaim_abandoned_jobs(stop, concurrency=2, interval=0.05))
+        await asyncio.sleep(0.2)
+        stop.set()
+        await task
+    
+    assert not process.called
@@ -1,6 +1,6 @@
 """Tests for job_service.py"""
 import pytest
-from unittest.mock import Mock
+from unittest.mock import Mock, AsyncMock
 import sys
 from pathlib import Path
 
@@ -21,9 +21,9 @@ def job_service(mock_db):
     return JobService(mock_db)
 
 
-def test_create_job_valid_sources(job_service):
+async def test_create_job_valid_sources(job_service):
     """Test creating job with valid sources"""
-    job_service.job_repo.create = Mock(return_value=Mock(id=1, status="Pending"))
+    job_service.job_repo.create = AsyncMock(return_value=Mock(id=1, status="Pending"))
     
     selected_sources = ["products", "carts"]
     credentials = {
@@ -31,53 +31,77 @@ def test_create_job_valid_sources(job_service):
         "carts": {"apiKey": "test456"}
     }
     
-    job = job_service.create_job(user_id=1, selected_sources=selected_sources, credentials=credentials)
+    job = await job_service.create_job(user_id=1, selected_sources=selected_sources, credentials=credentials)
     
     # Should create job
-    job_service.job_repo.create.assert_called_once()
+    job_service.job_repo.create.assert_awaited_once()
     assert job.id == 1
     assert job.status == "Pending"
 
 
-def test_create_job_invalid_source(job_service):
+async def test_create_job_invalid_source(job_service):
     """Test creating job with invalid source fails"""
     selected_sources = ["invalid"]
     credentials = {"invalid": {"apiKey": "test"}}
     
     with pytest.raises(ValueError, match="Invalid source"):
-        job_service.create_job(user_id=1, selected_sources=selected_sources, credentials=credentials)
+        await job_service.create_job(user_id=1, selected_sources=selected_sources, credentials=credentials)
 
 
-def test_create_job_missing_credentials(job_service):
+async def test_create_job_missing_credentials(job_service):
     """Test creating job without required credentials fails"""
     selected_sources = ["products"]
     credentials = {}
     
     with pytest.raises(ValueError, match="Credentials are required"):
-        job_service.create_job(user_id=1, selected_sources=selected_sources, credentials=credentials)
+        await job_service.create_job(user_id=1, selected_sources=selected_sources, credentials=credentials)
 
 
-def test_list_jobs(job_service):
+async def test_create_job_invalid_mode(job_service):
+    """Test creating job with an unknown mode fails"""
+    with pytest.raises(ValueError, match="Invalid mode"):
+        await job_service.create_job(
+            user_id=1,
+            selected_sources=["products"],
+            credentials={"products": {"apiKey": "test"}},
+            mode="sometimes"
+        )
+
+
+async def test_list_jobs(job_service):
     """Test listing jobs"""
     mock_jobs = [
         Mock(id=1, status="Completed"),
         Mock(id=2, status="Pending")
     ]
-    job_service.job_repo.list_jobs = Mock(return_value=mock_jobs)
+    job_service.job_repo.list_jobs = AsyncMock(return_value=mock_jobs)
     
-    jobs = job_service.list_jobs(user_id=1, skip=0, limit=10)
+    jobs = await job_service.list_jobs(user_id=1, skip=0, limit=10)
     
-    job_service.job_repo.list_jobs.assert_called_once_with(1, 0, 10)
+    job_service.job_repo.list_jobs.assert_awaited_once_with(1, 0, 10)
     assert len(jobs) == 2
     assert jobs[0].id == 1
 
 
-def test_get_job(job_service):
+async def test_get_job(job_service):
     """Test getting job by ID"""
     mock_job = Mock(id=1, status="Completed", user_id=1)
-    job_service.job_repo.get_by_id = Mock(return_value=mock_job)
+    job_service.job_repo.get_by_id = AsyncMock(return_value=mock_job)
     
-    job = job_service.get_job(job_id=1)
+    job = await job_service.get_job(job_id=1)
     
-    job_service.job_repo.get_by_id.assert_called_once_with(1)
+    job_service.job_repo.get_by_id.assert_awaited_once_with(1)
     assert job.id == 1
+
+
+async def test_calculate_progress_reads_materialized_counters(job_service):
+    """Test progress comes straight from the per-source state rows"""
+    job_service.source_repo.get_by_job = AsyncMock(return_value={
+        "products": Mock(checkpoint_offset=40, total=194, status="Running", inserted_count=40, updated_count=0, unchanged_count=0)
+    })
+    job = Mock(id=1, selected_sources=["products", "carts"], status="Running")
+    
+    progress = await job_service.calculate_progress(job)
+    
+    assert (progress["products"].completed, progress["products"].total, progress["products"].status) == (40, 194, "Running")
+    assert (progress["carts"].completed, progress["carts"].total, progress["carts"].status) == (0, 0, "Pending")
@@ -0,0 +1,75 @@
+"""Tests for password_hasher.py"""
+import asyncio
+import threading
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.config import settings
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    """A small hasher at the cheapest bcrypt cost"""
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    yield hasher
+    hasher.close()
+
+
+async def test_hash_and_verify(hasher):
+    """Test hashing runs on the pool at the configured cost"""
+    hashed = await hasher.hash("secret123")
+    
+    assert hashed.startswith("$2b$04$")
+    assert await hasher.verify("secret123", hashed) is True
+    assert await hasher.verify("wrong", hashed) is False
+    assert hasher.stats()["completed"] == 3
+
+
+async def test_full_queue_sheds_requests(hasher):
+    """Test requests beyond workers plus queue are rejected at once instead of waiting"""
+    release = threading.Event()
+    blocked = [asyncio.ensure_future(hasher._submit(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    
+    assert hasher.stats()["queued"] == 1
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("secret123")
+    
+    release.set()
+    await asyncio.gather(*blocked)
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["inFlight"] == 0
+
+
+async def test_failures_are_counted_apart_from_completions(hasher):
+    """Test a call that raises is reported as failed, not completed"""
+    with pytest.raises(ValueError):
+        await hasher.verify("secret123", "not-a-bcrypt-hash")
+    
+    assert hasher.stats()["failed"] == 1
+    assert hasher.stats()["completed"] == 0
+    assert hasher.stats()["inFlight"] == 0
+
+
+async def test_cancelled_request_keeps_its_slot_until_bcrypt_finishes(hasher):
+    """Test abandoning a request does not free capacity while its thread is still busy"""
+    release = threading.Event()
+    running = asyncio.ensure_future(hasher._submit(release.wait))
+    queued = asyncio.ensure_future(hasher._submit(release.wait))
+    await asyncio.sleep(0.05)
+    
+    running.cancel()
+    await asyncio.sleep(0.05)
+    assert hasher.stats()["inFlight"] == 2
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("secret123")
+    
+    release.set()
+    await queued
+    await asyncio.sleep(0.05)
+    assert hasher.stats()["inFlight"] == 0
@@ -0,0 +1,47 @@
+"""Tests for read_routing.py"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services import read_routing
+from app.services.event_broker import close_event_broker, get_event_broker
+from app.services.read_routing import ReadRouter
+
+
+@pytest.fixture
+async def broker():
+    """A fresh in-process event broker"""
+    await close_event_broker()
+    yield get_event_broker()
+    await close_event_broker()
+
+
+def test_reads_stay_on_primary_within_the_window(monkeypatch):
+    """Test a user's reads go to the primary only until the window after their write ends"""
+    now = [1000.0]
+    monkeypatch.setattr(read_routing.time, "monotonic", lambda: now[0])
+    router = ReadRouter(window_seconds=5)
+    
+    router.note_write(1)
+    
+    assert router.use_primary(1) is True
+    assert router.use_primary(2) is False
+    now[0] += 5
+    assert router.use_primary(1) is False
+    assert router.stats()["primaryReads"] == 1
+    assert router.stats()["replicaReads"] == 2
+    assert router.stats()["pinnedUsers"] == 0
+
+
+async def test_status_events_pin_reads_but_progress_does_not(broker):
+    """Test job status changes seen on the broker route the user to the primary, progress ticks do not"""
+    router = ReadRouter(window_seconds=60)
+    assert router.use_primary(1) is False
+    
+    await broker.publish(1, {"type": "progress", "jobId": 5, "source": "products", "completed": 10})
+    assert router.use_primary(1) is False
+    
+    await broker.publish(1, {"type": "job", "jobId": 5, "status": "Completed"})
+    assert router.use_primary(1) is True
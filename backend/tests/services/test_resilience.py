@@ -0,0 +1,159 @@
+"""Tests for resilience.py"""
+import time
+import httpx
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services import resilience
+from app.services.resilience import (
+    CircuitBreaker,
+    get_breaker,
+    parse_retry_after,
+    request_with_retry,
+    resilience_stats
+)
+
+URL = "https://upstream.test/products"
+
+
+def scripted_upstream(*outcomes, calls: list):
+    """Mock transport replaying a status code or exception per request"""
+    remaining = list(outcomes)
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        outcome = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        status, headers = outcome if isinstance(outcome, tuple) else (outcome, {})
+        return httpx.Response(status, headers=headers, json={"products": []})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """Start every test with closed breakers and no recorded sleeps"""
+    resilience.reset_resilience()
+    sleeps = []
+    
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+    
+    with patch("app.services.resilience.settings.upstream_retry_attempts", 3), \
+            patch("app.services.resilience.settings.circuit_failure_threshold", 3), \
+            patch("app.services.resilience.settings.circuit_reset_seconds", 0.05), \
+            patch("app.services.resilience.asyncio.sleep", fake_sleep):
+        yield sleeps
+    resilience.reset_resilience()
+
+
+async def test_retries_transient_status_then_succeeds(fresh_state):
+    """Test a 503 is retried with backoff and the request eventually succeeds"""
+    calls = []
+    client = scripted_upstream(503, 200, calls=calls)
+    
+    response = await request_with_retry(client, "GET", URL)
+    
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert len(fresh_state) == 1
+    assert resilience_stats()["retriesByReason"] == {"503": 1}
+
+
+async def test_honors_retry_after(fresh_state):
+    """Test the server's Retry-After wins over the computed backoff"""
+    calls = []
+    client = scripted_upstream((429, {"Retry-After": "7"}), 200, calls=calls)
+    
+    await request_with_retry(client, "GET", URL)
+    
+    assert fresh_state == [7.0]
+    assert get_breaker("upstream.test").consecutive_failures == 0
+
+
+async def test_retries_connection_errors(fresh_state):
+    """Test timeouts and connection resets are retried"""
+    calls = []
+    client = scripted_upstream(httpx.ConnectError("reset"), httpx.ReadTimeout("slow"), 200, calls=calls)
+    
+    response = await request_with_retry(client, "GET", URL)
+    
+    assert response.status_code == 200
+    assert resilience_stats()["retriesByReason"] == {"ConnectError": 1, "ReadTimeout": 1}
+
+
+async def test_gives_up_after_max_attempts(fresh_state):
+    """Test the last failure is raised once the attempts run out"""
+    calls = []
+    client = scripted_upstream(502, calls=calls)
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        await request_with_retry(client, "GET", URL)
+    
+    assert len(calls) == 3
+    assert resilience_stats()["retriesExhausted"] == 1
+
+
+async def test_client_errors_are_not_retried(fresh_state):
+    """Test a 4xx fails immediately"""
+    calls = []
+    client = scripted_upstream(404, calls=calls)
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        await request_with_retry(client, "GET", URL)
+    
+    assert len(calls) == 1
+    assert resilience_stats()["retries"] == 0
+
+
+async def test_backoff_grows_exponentially_and_is_capped():
+    """Test full jitter stays under an exponential ceiling bounded by the max delay"""
+    with patch("app.services.resilience.random.uniform", side_effect=lambda low, high: high), \
+            patch("app.services.resilience.settings.upstream_retry_base_delay_seconds", 1.0), \
+            patch("app.services.resilience.settings.upstream_retry_max_delay_seconds", 5.0):
+        assert [resilience.backoff_delay(n) for n in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_parse_retry_after_http_date():
+    """Test Retry-After given as an HTTP date"""
+    response = httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    assert parse_retry_after(response) == 0.0
+    assert parse_retry_after(httpx.Response(503)) is None
+
+
+async def test_breaker_opens_after_repeated_failures(fresh_state):
+    """Test the breaker opens and makes the next request wait out the cooldown"""
+    client = scripted_upstream(503, 503, 503, 200, calls=[])
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        await request_with_retry(client, "GET", URL)
+    breaker = get_breaker("upstream.test")
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 1
+    
+    fresh_state.clear()
+    response = await request_with_retry(client, "GET", URL)
+    
+    assert response.status_code == 200
+    assert fresh_state and fresh_state[0] > 0
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_half_open_probe_failure_reopens():
+    """Test a failed probe re-opens the breaker and lets one caller through at a time"""
+    breaker = CircuitBreaker("upstream.test", failure_threshold=1, reset_seconds=0.01)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    time.sleep(0.02)
+    assert await breaker.acquire() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    assert breaker.stats()["state"] == "open"
@@ -0,0 +1,45 @@
+"""Tests for streaming.py"""
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.streaming import bounded_prefetch
+
+
+async def numbers(count: int, produced: list, error: Exception = None):
+    """Async source that records how far it has been consumed"""
+    for i in range(count):
+        produced.append(i)
+        yield i
+    if error:
+        raise error
+
+
+async def test_yields_every_item_in_order():
+    """Test prefetching preserves the source sequence"""
+    produced = []
+    items = [item async for item in bounded_prefetch(numbers(5, produced), maxsize=2)]
+    assert items == [0, 1, 2, 3, 4]
+
+
+async def test_producer_stays_bounded():
+    """Test the producer never runs more than maxsize items ahead of the reader"""
+    produced = []
+    stream = bounded_prefetch(numbers(100, produced), maxsize=2)
+    
+    assert await stream.__anext__() == 0
+    await asyncio.sleep(0.01)
+    # One item handed to the reader, two buffered, one blocked on a full queue
+    assert len(produced) <= 4
+    await stream.aclose()
+
+
+async def test_source_errors_reach_the_reader():
+    """Test an exception in the source is re-raised to the consumer"""
+    produced = []
+    with pytest.raises(RuntimeError, match="page fetch failed"):
+        async for _ in bounded_prefetch(numbers(3, produced, RuntimeError("page fetch failed")), maxsize=1):
+            pass
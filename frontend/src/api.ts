@@ -64,6 +64,7 @@ export interface ImportJob {
   jobId: number;
   status: string;
   selectedSources: string[];
+  mode?: string;
   progress: Record<string, SourceProgress>;
   error: string | null;
   createdAt: string;
@@ -74,11 +75,42 @@ export interface SourceProgress {
   completed: number;
   total: number;
   status: string;
+  inserted?: number;
+  updated?: number;
+  unchanged?: number;
+}
+
+// Pushed on the job event stream
+export interface JobStatusEvent {
+  type: 'job';
+  jobId: number;
+  status: string;
+  error: string | null;
+}
+
+export interface JobProgressEvent {
+  type: 'progress';
+  jobId: number;
+  source: string;
+  completed: number;
+  total: number;
+  status: string;
+}
+
+export interface JobStatusesResponse {
+  jobs: ImportJob[];
+  etag?: string;
+}
+
+export interface StreamTokenResponse {
+  token: string;
+  expiresIn: number;
 }
 
 export interface CreateJobRequest {
   selectedSources: string[];
   credentials: Record<string, Record<string, string>>;
+  mode?: 'full' | 'incremental';
 }
 
 export interface CreateJobResponse {
@@ -96,13 +128,26 @@ export interface ImportedItem {
   payload: any;
 }
 
+export interface ImportedItemSummary {
+  id: number;
+  source: string;
+  remoteId: number;
+  status: string;
+  createdAt: string;
+  title?: string | null;
+  total?: number | null;
+  itemCount?: number | null;
+}
+
 export interface DashboardStats {
   totalJobs: number;
   completedJobs: number;
   failedJobs: number;
   totalProducts: number;
   totalCarts: number;
-  recentItems: ImportedItem[];
+  bytesImported?: number;
+  lastImportAt?: string | null;
+  recentItems: ImportedItemSummary[];
 }
 
 export const api = {
@@ -199,6 +244,70 @@ export const api = {
     return response.json();
   },
 
+  // Several jobs in one request; with the ETag of the previous answer, null means none changed
+  async getJobStatuses(jobIds: number[], etag?: string): Promise<JobStatusesResponse | null> {
+    const headers = new Headers(getAuthHeaders());
+    if (etag) {
+      headers.set('If-None-Match', etag);
+    }
+    const response = await fetch(`${API_BASE_URL}/import_jobs/status?${new URLSearchParams({ ids: jobIds.join(',') })}`, {
+      headers,
+    });
+    
+    if (response.status === 304) {
+      return null;
+    }
+    
+    if (!response.ok) {
+      if (response.status === 401) {
+        authUtils.removeToken();
+        window.location.href = '/login';
+      }
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to get job statuses');
+    }
+    
+    return { jobs: await response.json(), etag: response.headers.get('ETag') || undefined };
+  },
+
+  // EventSource cannot send an Authorization header, so the stream URL carries a short-lived
+  // token scoped to the stream instead of the access token
+  async jobEventsUrl(): Promise<string> {
+    const response = await fetch(`${API_BASE_URL}/import_jobs/events/token`, {
+      method: 'POST',
+      headers: getAuthHeaders(),
+    });
+    
+    if (!response.ok) {
+      if (response.status === 401) {
+        authUtils.removeToken();
+        window.location.href = '/login';
+      }
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to open job events');
+    }
+    
+    const data: StreamTokenResponse = await response.json();
+    return `${API_BASE_URL}/import_jobs/events?token=${encodeURIComponent(data.token)}`;
+  },
+
+  async getItem(itemId: number): Promise<ImportedItem> {
+    const response = await fetch(`${API_BASE_URL}/items/${itemId}`, {
+      headers: getAuthHeaders(),
+    });
+    
+    if (!response.ok) {
+      if (response.status === 401) {
+        authUtils.removeToken();
+        window.location.href = '/login';
+      }
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to get item');
+    }
+    
+    return response.json();
+  },
+
   async getDashboard(): Promise<DashboardStats> {
     const response = await fetch(`${API_BASE_URL}/dashboard`, {
       headers: getAuthHeaders(),
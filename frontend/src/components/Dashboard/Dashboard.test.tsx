@@ -1,4 +1,4 @@
-import { render, screen, waitFor } from '@testing-library/react';
+import { render, screen, waitFor, fireEvent } from '@testing-library/react';
 import { BrowserRouter } from 'react-router-dom';
 import Dashboard from './Dashboard';
 import { api } from '../../api';
@@ -7,6 +7,7 @@ import { api } from '../../api';
 jest.mock('../../api', () => ({
   api: {
     getDashboard: jest.fn(),
+    getItem: jest.fn(),
   },
 }));
 
@@ -21,7 +22,7 @@ const mockDashboardData = {
       id: 1,
       source: 'products',
       remoteId: 123,
-      payload: { title: 'Product 1', price: 29.99 },
+      title: 'Product 1',
       status: 'Success',
       createdAt: '2024-01-15T10:00:00Z',
     },
@@ -29,7 +30,8 @@ const mockDashboardData = {
       id: 2,
       source: 'carts',
       remoteId: 456,
-      payload: { products: ['item1', 'item2'] },
+      total: 59.98,
+      itemCount: 2,
       status: 'Success',
       createdAt: '2024-01-15T09:30:00Z',
     },
@@ -102,6 +104,28 @@ describe('Dashboard Component', () => {
     expect(screen.getByText('2 items')).toBeInTheDocument();
   });
 
+  test('fetches an item payload only when it is opened', async () => {
+    (api.getDashboard as jest.Mock).mockResolvedValue(mockDashboardData);
+    (api.getItem as jest.Mock).mockResolvedValue({
+      ...mockDashboardData.recentItems[0],
+      payload: { title: 'Product 1', price: 29.99 },
+    });
+    
+    renderDashboard();
+
+    await waitFor(() => {
+      expect(screen.getByText('Recent Imports')).toBeInTheDocument();
+    });
+    expect(api.getItem).not.toHaveBeenCalled();
+
+    fireEvent.click(screen.getAllByText('View')[0]);
+
+    await waitFor(() => {
+      expect(screen.getByText(/"price": 29.99/)).toBeInTheDocument();
+    });
+    expect(api.getItem).toHaveBeenCalledWith(1);
+  });
+
   test('displays error message on failure', async () => {
     (api.getDashboard as jest.Mock).mockRejectedValue(new Error('Failed to load dashboard'));
     
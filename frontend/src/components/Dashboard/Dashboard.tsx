@@ -1,11 +1,14 @@
 import React, { useEffect, useState } from 'react';
-import { api, DashboardStats } from '../../api';
+import { api, DashboardStats, ImportedItemSummary } from '../../api';
 import './Dashboard.css';
 
 const Dashboard: React.FC = () => {
   const [stats, setStats] = useState<DashboardStats | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [openItemId, setOpenItemId] = useState<number | null>(null);
+  const [payloads, setPayloads] = useState<Record<number, any>>({});
+  const [payloadError, setPayloadError] = useState<string | null>(null);
 
   const loadDashboard = async () => {
     try {
@@ -23,6 +26,32 @@ const Dashboard: React.FC = () => {
     loadDashboard();
   }, []);
 
+  // The dashboard only carries summaries; fetch an item's payload when it is opened
+  const togglePayload = async (itemId: number) => {
+    if (openItemId === itemId) {
+      setOpenItemId(null);
+      return;
+    }
+    setOpenItemId(itemId);
+    setPayloadError(null);
+    if (payloads[itemId] !== undefined) return;
+    try {
+      const item = await api.getItem(itemId);
+      setPayloads(prev => ({ ...prev, [itemId]: item.payload }));
+    } catch (err: any) {
+      setPayloadError(err.message || 'Failed to load item');
+    }
+  };
+
+  const describeItem = (item: ImportedItemSummary) => {
+    if (item.title) return truncateText(item.title, 50);
+    if (item.source === 'carts') {
+      if (item.itemCount != null) return `${item.itemCount} items`;
+      if (item.total != null) return `$${item.total.toFixed(2)}`;
+    }
+    return 'N/A';
+  };
+
   const formatDate = (dateString: string) => {
     return new Date(dateString).toLocaleString();
   };
@@ -114,31 +143,45 @@ const Dashboard: React.FC = () => {
                   <th>Status</th>
                   <th>Title</th>
                   <th>Imported At</th>
+                  <th></th>
                 </tr>
               </thead>
               <tbody>
                 {stats.recentItems.map(item => (
-                  <tr key={item.id}>
-                    <td>{item.id}</td>
-                    <td>
-                      <span className="source-tag">{item.source}</span>
-                    </td>
-                    <td>{item.remoteId}</td>
-                    <td>
-                      <span className={`status-badge status-${item.status.toLowerCase()}`}>
-                        {item.status}
-                      </span>
-                    </td>
-                    <td className="item-detail">
-                      {item.payload.title 
-                        ? truncateText(item.payload.title, 50)
-                        : item.source === 'carts' 
-                          ? `${item.payload.products?.length || 0} items`
-                          : 'N/A'
-                      }
-                    </td>
-                    <td className="timestamp">{formatDate(item.createdAt)}</td>
-                  </tr>
+                  <React.Fragment key={item.id}>
+                    <tr>
+                      <td>{item.id}</td>
+                      <td>
+                        <span className="source-tag">{item.source}</span>
+                      </td>
+                      <td>{item.remoteId}</td>
+                      <td>
+                        <span className={`status-badge status-${item.status.toLowerCase()}`}>
+                          {item.status}
+                        </span>
+                      </td>
+                      <td className="item-detail">{describeItem(item)}</td>
+                      <td className="timestamp">{formatDate(item.createdAt)}</td>
+                      <td>
+                        <button className="btn-secondary" onClick={() => togglePayload(item.id)}>
+                          {openItemId === item.id ? 'Hide' : 'View'}
+                        </button>
+                      </td>
+                    </tr>
+                    {openItemId === item.id && (
+                      <tr>
+                        <td colSpan={7}>
+                          {payloadError ? (
+                            <div className="error-message">{payloadError}</div>
+                          ) : payloads[item.id] === undefined ? (
+                            <div className="loading">Loading item...</div>
+                          ) : (
+                            <pre className="item-payload">{JSON.stringify(payloads[item.id], null, 2)}</pre>
+                          )}
+                        </td>
+                      </tr>
+                    )}
+                  </React.Fragment>
                 ))}
               </tbody>
             </table>
@@ -1,4 +1,4 @@
-import { render, screen, waitFor } from '@testing-library/react';
+import { act, render, screen, waitFor } from '@testing-library/react';
 import { BrowserRouter } from 'react-router-dom';
 import JobsList from './JobsList';
 import { api } from '../../api';
@@ -8,9 +8,38 @@ jest.mock('../../api', () => ({
   api: {
     listJobs: jest.fn(),
     getJob: jest.fn(),
+    jobEventsUrl: jest.fn(() => '/api/v1/import_jobs/events?token=test'),
   },
 }));
 
+// Minimal EventSource stand-in that lets tests push server events
+class MockEventSource {
+  static instances: MockEventSource[] = [];
+  url: string;
+  onopen: (() => void) | null = null;
+  closed = false;
+  private listeners: Record<string, ((message: MessageEvent) => void)[]> = {};
+
+  constructor(url: string) {
+    this.url = url;
+    MockEventSource.instances.push(this);
+  }
+
+  addEventListener(type: string, listener: (message: MessageEvent) => void) {
+    (this.listeners[type] ||= []).push(listener);
+  }
+
+  close() {
+    this.closed = true;
+  }
+
+  emit(type: string, data: object) {
+    (this.listeners[type] || []).forEach(listener =>
+      listener({ data: JSON.stringify(data) } as MessageEvent)
+    );
+  }
+}
+
 const mockJobs = [
   {
     jobId: 1,
@@ -52,11 +81,14 @@ describe('JobsList Component', () => {
   beforeEach(() => {
     jest.clearAllMocks();
     jest.useFakeTimers();
+    MockEventSource.instances = [];
+    (window as any).EventSource = MockEventSource;
   });
 
   afterEach(() => {
     jest.runOnlyPendingTimers();
     jest.useRealTimers();
+    delete (window as any).EventSource;
   });
 
   const renderJobsList = () => {
@@ -125,14 +157,8 @@ describe('JobsList Component', () => {
     });
   });
 
-  test('polls active jobs', async () => {
-    const runningJob = {
-      ...mockJobs[1],
-      status: 'Running',
-    };
-    
-    (api.listJobs as jest.Mock).mockResolvedValue([runningJob]);
-    (api.getJob as jest.Mock).mockResolvedValue(runningJob);
+  test('does not poll active jobs', async () => {
+    (api.listJobs as jest.Mock).mockResolvedValue([mockJobs[1]]);
     
     renderJobsList();
 
@@ -140,18 +166,36 @@ describe('JobsList Component', () => {
       expect(screen.getByText('Job #2')).toBeInTheDocument();
     });
 
-    // Clear initial calls
-    (api.getJob as jest.Mock).mockClear();
+    jest.advanceTimersByTime(10000);
+
+    expect(api.getJob).not.toHaveBeenCalled();
+    expect(MockEventSource.instances).toHaveLength(1);
+  });
 
-    // Advance timers to trigger polling
-    jest.advanceTimersByTime(2000);
+  test('applies pushed progress', async () => {
+    (api.listJobs as jest.Mock).mockResolvedValue([mockJobs[1]]);
+    
+    renderJobsList();
 
     await waitFor(() => {
-      expect(api.getJob).toHaveBeenCalledWith(2);
+      expect(screen.getByText('15 / 30')).toBeInTheDocument();
     });
+
+    act(() => {
+      MockEventSource.instances[0].emit('progress', {
+        type: 'progress',
+        jobId: 2,
+        source: 'products',
+        completed: 25,
+        total: 30,
+        status: 'Running',
+      });
+    });
+
+    expect(screen.getByText('25 / 30')).toBeInTheDocument();
   });
 
-  test('stops polling when job completes', async () => {
+  test('fetches a job once when it finishes', async () => {
     const runningJob = {
       ...mockJobs[1],
       status: 'Running',
@@ -170,17 +214,24 @@ describe('JobsList Component', () => {
       expect(screen.getByText('Running')).toBeInTheDocument();
     });
 
-    // Advance time and verify polling happens
-    jest.advanceTimersByTime(2000);
-    
-    await waitFor(() => {
-      expect(api.getJob).toHaveBeenCalled();
+    act(() => {
+      MockEventSource.instances[0].emit('job', { type: 'job', jobId: 2, status: 'Completed', error: null });
     });
 
-    // After job completes, verify it shows as completed
     await waitFor(() => {
       expect(screen.getByText('Completed')).toBeInTheDocument();
     });
+    expect(api.getJob).toHaveBeenCalledTimes(1);
+    expect(api.getJob).toHaveBeenCalledWith(2);
+  });
+
+  test('closes the event stream on unmount', async () => {
+    (api.listJobs as jest.Mock).mockResolvedValue(mockJobs);
+    
+    const { unmount } = renderJobsList();
+    unmount();
+
+    expect(MockEventSource.instances[0].closed).toBe(true);
   });
 
   test('shows empty state when no jobs', async () => {
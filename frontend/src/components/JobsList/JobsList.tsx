@@ -1,71 +1,169 @@
-import React, { useEffect, useState, useCallback } from 'react';
-import { api, ImportJob } from '../../api';
+import React, { useEffect, useState, useCallback, useRef } from 'react';
+import { api, ImportJob, JobProgressEvent, JobStatusEvent } from '../../api';
 import './JobsList.css';
 
+// Slow safety-net poll for changes the event stream never delivers, and how long an open
+// stream may go without events while jobs are unfinished before it counts as quiet
+const FALLBACK_POLL_INTERVAL_MS = 15000;
+const STREAM_QUIET_MS = 30000;
+
+// Delay before reopening the event stream after it gave up
+const STREAM_RETRY_MS = 3000;
+
+const isActive = (job: ImportJob) => job.status === 'Pending' || job.status === 'Running';
+
 const JobsList: React.FC = () => {
   const [jobs, setJobs] = useState<ImportJob[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
-  const [activeJobIds, setActiveJobIds] = useState<number[]>([]);
+  const streamOpenRef = useRef(false);
+  const lastStreamEventRef = useRef(0);
 
-  const loadJobs = async () => {
+  const mergeJobs = useCallback((updates: ImportJob[]) => {
+    setJobs(prevJobs => {
+      const byId = new Map(updates.map(update => [update.jobId, update]));
+      const merged = prevJobs.map(job => byId.get(job.jobId) ?? job);
+      const added = updates.filter(update => !prevJobs.some(job => job.jobId === update.jobId));
+      return [...added, ...merged];
+    });
+  }, []);
+
+  const loadJobs = useCallback(async () => {
     try {
       const jobsList = await api.listJobs();
       setJobs(jobsList);
       setError(null);
-
-      // Identify jobs that need polling (Running or Pending)
-      const active = jobsList
-        .filter(job => job.status === 'Running' || job.status === 'Pending')
-        .map(job => job.jobId);
-      
-      setActiveJobIds(active);
     } catch (err: any) {
       setError(err.message || 'Failed to load jobs');
     } finally {
       setLoading(false);
     }
-  };
+  }, []);
 
-  const pollActiveJobs = useCallback(async () => {
-    if (activeJobIds.length === 0) return;
-    
+  const refreshJob = useCallback(async (jobId: number) => {
     try {
-      // Only fetch active jobs
-      const updates = await Promise.all(
-        activeJobIds.map(id => api.getJob(id))
-      );
-      
-      // Update jobs list with fresh data for active jobs
-      setJobs(prevJobs => 
-        prevJobs.map(job => {
-          const update = updates.find(u => u.jobId === job.jobId);
-          return update || job;
-        })
-      );
-      
-      // Recalculate which jobs are still active
-      const stillActive = updates
-        .filter(job => job.status === 'Running' || job.status === 'Pending')
-        .map(job => job.jobId);
-      
-      setActiveJobIds(stillActive);
+      mergeJobs([await api.getJob(jobId)]);
     } catch (err) {
-      console.error('Polling error:', err);
+      console.error('Failed to refresh job:', err);
     }
-  }, [activeJobIds]);
+  }, [mergeJobs]);
 
   useEffect(() => {
     loadJobs();
-  }, []);
+  }, [loadJobs]);
 
+  // Job changes are pushed by the server instead of polling every active job
   useEffect(() => {
-    if (activeJobIds.length === 0) return;
+    if (typeof EventSource === 'undefined') return;
+
+    let events: EventSource | null = null;
+    let retryTimer: number | undefined;
+    let closed = false;
+
+    const connect = async () => {
+      let url: string;
+      try {
+        url = await api.jobEventsUrl();
+      } catch (err) {
+        console.error('Failed to open job events:', err);
+        if (!closed) retryTimer = window.setTimeout(connect, STREAM_RETRY_MS);
+        return;
+      }
+      if (closed) return;
+
+      const source = new EventSource(url);
+      events = source;
+
+      // Reload every time the stream opens, the first time included: changes published
+      // before the subscription existed (e.g. during the initial load) are never replayed
+      source.onopen = () => {
+        streamOpenRef.current = true;
+        lastStreamEventRef.current = Date.now();
+        loadJobs();
+      };
+
+      // The browser retries a dropped stream with the same URL; once its token has expired that
+      // retry is refused and the source gives up, so reconnect with a fresh token
+      source.onerror = () => {
+        streamOpenRef.current = false;
+        if (source.readyState !== EventSource.CLOSED || closed) return;
+        retryTimer = window.setTimeout(connect, STREAM_RETRY_MS);
+      };
+
+      source.addEventListener('progress', message => {
+        const event: JobProgressEvent = JSON.parse((message as MessageEvent).data);
+        lastStreamEventRef.current = Date.now();
+        setJobs(prevJobs =>
+          prevJobs.map(job =>
+            job.jobId === event.jobId
+              ? {
+                  ...job,
+                  progress: {
+                    ...job.progress,
+                    [event.source]: {
+                      ...job.progress[event.source],
+                      completed: event.completed,
+                      total: event.total,
+                      status: event.status,
+                    },
+                  },
+                }
+              : job
+          )
+        );
+      });
+
+      source.addEventListener('job', message => {
+        const event: JobStatusEvent = JSON.parse((message as MessageEvent).data);
+        lastStreamEventRef.current = Date.now();
+        if (event.status === 'Running') {
+          setJobs(prevJobs =>
+            prevJobs.map(job =>
+              job.jobId === event.jobId ? { ...job, status: event.status, error: event.error } : job
+            )
+          );
+        } else {
+          // New, finished and requeued jobs are fetched once for their full state
+          refreshJob(event.jobId);
+        }
+      });
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      window.clearTimeout(retryTimer);
+      events?.close();
+    };
+  }, [loadJobs, refreshJob]);
+
+  // Events only reach this page if the process running the job can publish to this API
+  // instance (workers need the shared event backend). While jobs are unfinished and the stream
+  // has errored or gone quiet, poll just those jobs, conditionally, until events flow again
+  const activeJobIds = jobs.filter(isActive).map(job => job.jobId).join(',');
+  useEffect(() => {
+    if (!activeJobIds) return;
+
+    // The status endpoint takes at most 100 ids per request
+    const jobIds = activeJobIds.split(',').map(Number).slice(0, 100);
+    let etag: string | undefined;
 
-    const interval = setInterval(pollActiveJobs, 2000);
+    const timer = window.setInterval(async () => {
+      const quiet = Date.now() - lastStreamEventRef.current > STREAM_QUIET_MS;
+      if (streamOpenRef.current && !quiet) return;
+      try {
+        const changed = await api.getJobStatuses(jobIds, etag);
+        if (changed === null) return;
+        etag = changed.etag;
+        mergeJobs(changed.jobs);
+      } catch (err) {
+        console.error('Failed to poll job statuses:', err);
+      }
+    }, FALLBACK_POLL_INTERVAL_MS);
 
-    return () => clearInterval(interval);
-  }, [activeJobIds, pollActiveJobs]);
+    return () => window.clearInterval(timer);
+  }, [activeJobIds, mergeJobs]);
 
   const formatDate = (dateString: string) => {
     return new Date(dateString).toLocaleString();
@@ -149,7 +247,7 @@ const JobsList: React.FC = () => {
                     <div
                       className={`progress-fill ${progress.status === 'Completed' ? 'completed' : ''}`}
                       style={{
-                        width: `${(progress.completed / progress.total) * 100}%`
+                        width: `${progress.total ? (progress.completed / progress.total) * 100 : 0}%`
                       }}
                     />
                   </div>